@@ -0,0 +1,142 @@
+"""
+bench_extract_fight_data.py — Parity check + micro-benchmark for the decision page extractor.
+
+Runs scrape_mmadecisions.extract_fight_data (streaming html.parser extractor) against the
+previous full-BeautifulSoup implementation on a directory of saved decision pages, asserts
+both return identical rows for every page, and reports pages/sec for each.
+
+The bundled fixtures are synthetic: hand-written pages in the mmadecisions.com layout with
+invented fighters, judges, referees, events and scores (the site could not be fetched when
+they were made). Files are named after the decision URL slug (e.g. Arlo-Alpha-vs-Bram-Bravo.html)
+so the URL-slug fighter-name fallback is exercised too. Parity on real saved pages is
+unverified — point --dir at a directory of them before trusting the extractor on live markup.
+
+Usage:
+  python bench_extract_fight_data.py
+  python bench_extract_fight_data.py --dir path/to/pages --repeat 50
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from scrape_mmadecisions import extract_fight_data
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'mmadecisions'
+
+
+# ---------------------------------------------------------------------------
+# Reference implementation (full soup) — kept verbatim for parity checks
+# ---------------------------------------------------------------------------
+
+def extract_fight_data_soup(html_content, url, bout_display=None):
+    if not html_content: return None
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    event_block = soup.find("td", class_="decision-top2")
+    event_lines = [line.strip() for line in event_block.text.splitlines() if line.strip()] if event_block else []
+    event = event_lines[0] if event_lines else 'N/A'
+    date = event_lines[1] if len(event_lines) > 1 else 'N/A'
+
+    referee_block = soup.find("td", class_="decision-bottom2")
+    referee = referee_block.get_text(strip=True).replace('REFEREE:', '').strip() if referee_block else 'N/A'
+
+    if bout_display and ' vs ' in bout_display:
+        f1_name, f2_name = [f.strip() for f in bout_display.split(' vs ', 1)]
+    else:
+        fight_name_raw = url.split('/')[-1].replace('-', ' ').strip()
+        try:
+            f1_name, f2_name = [f.strip() for f in fight_name_raw.split(' vs ')]
+        except ValueError:
+            f1_name = f2_name = 'Unknown'
+
+    data = []
+    judge_tables = soup.find_all("table", style="border-spacing: 1px; width: 100%")
+    for table in judge_tables:
+        try:
+            judge = table.find("a").get_text(strip=True).replace("\xa0", " ").strip()
+        except AttributeError: continue
+
+        for round_row in table.find_all("tr", class_="decision"):
+            cols = round_row.find_all("td", class_="list")
+            if len(cols) < 3 or not cols[1].text.strip() or cols[1].text.strip() == "-": continue
+
+            bout_name = f"{f1_name} vs {f2_name}"
+            common_fields = {
+                'event': event.strip(),
+                'bout': bout_name,
+                'date': date.strip(),
+                'judge': judge,
+                'round': int(cols[0].text.strip()),
+                'referee': referee
+            }
+            data.append({**common_fields, 'fighter': f1_name, 'score': cols[1].text.strip()})
+            data.append({**common_fields, 'fighter': f2_name, 'score': cols[2].text.strip()})
+
+    return {'data': data} if data else None
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def load_pages(page_dir):
+    pages = []
+    for path in sorted(Path(page_dir).glob('*.html')):
+        pages.append((f"decision/0/{path.stem}", path.read_text(encoding='utf-8', errors='replace')))
+    return pages
+
+def time_parser(fn, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url, html in pages:
+            fn(html, url)
+    elapsed = time.perf_counter() - start
+    return len(pages) * repeat / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the mmadecisions decision page extractor")
+    parser.add_argument('--dir', default=str(FIXTURE_DIR), help="Directory of saved decision pages (*.html)")
+    parser.add_argument('--repeat', type=int, default=20, help="Passes over the page set per parser")
+    args = parser.parse_args()
+
+    pages = load_pages(args.dir)
+    if not pages:
+        print(f"[ERROR] No *.html pages found in {args.dir}")
+        sys.exit(1)
+    print(f"Loaded {len(pages)} pages from {args.dir}")
+
+    # 1. Parity — every page must produce identical rows
+    mismatches = 0
+    total_rows = 0
+    for url, html in pages:
+        expected = extract_fight_data_soup(html, url)
+        actual = extract_fight_data(html, url)
+        if expected != actual:
+            mismatches += 1
+            print(f"  [ERROR] Output differs for {url}")
+        total_rows += len(expected['data']) if expected else 0
+    if mismatches:
+        print(f"[ERROR] {mismatches}/{len(pages)} pages differ — not benchmarking")
+        sys.exit(1)
+    print(f"[OK] Identical output on all {len(pages)} pages ({total_rows} rows)")
+
+    # 2. Throughput (one warm-up pass each)
+    time_parser(extract_fight_data_soup, pages, 1)
+    time_parser(extract_fight_data, pages, 1)
+    soup_rate = time_parser(extract_fight_data_soup, pages, args.repeat)
+    stream_rate = time_parser(extract_fight_data, pages, args.repeat)
+
+    print(f"\n{'Parser':<28} {'pages/sec':>10}")
+    print(f"{'full soup (previous)':<28} {soup_rate:>10.1f}")
+    print(f"{'streaming extractor':<28} {stream_rate:>10.1f}")
+    print(f"Speedup: {stream_rate / soup_rate:.2f}x")
+
+if __name__ == "__main__":
+    main()
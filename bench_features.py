@@ -0,0 +1,247 @@
+"""
+bench_features.py — Parity check + benchmark for the vectorized feature pipeline.
+
+Compares scoring_model/features.py (whole-column NumPy over the columnar store) with the
+per-row Python code it replaced in train_scoring_model.py / compare_models.py /
+analyze_10_8_thresholds.py:
+
+  1. Features: feature_matrix == compute_features for every labelled row, bit for bit
+     (float64 bit patterns compared, so -0.0 vs 0.0 or 1-ulp drift fails).
+  2. Augmentation: augment(X, y) == the list-based mirror, bit for bit.
+  3. Confidence: lr_probability == compute_confidence (scoring_model.json) bit for bit.
+  4. Timing: rows/sec, per-row (CSV dicts) vs vectorized (memory-mapped store).
+
+Without --csv a synthetic ml_dataset.csv is generated (empty stat cells, draws, missing
+judge scores, pre/post-2016 dates) in a temp directory.
+
+Usage:
+  python bench_features.py
+  python bench_features.py --rows 200000
+  python bench_features.py --csv scoring_model/ml_dataset.csv
+"""
+
+import sys
+import csv
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / 'scoring_model'))
+from dataset_store import load_dataset, write_columns
+from features import DIFF_COLS, RATIO_COLS, feature_matrix, labels, augment, lr_probability
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+MODEL_PATH = Path(__file__).parent / 'scoring_model' / 'scoring_model.json'
+
+STAT_SHORT = [
+    'kd', 'sig_landed', 'sig_attempted', 'sig_pct', 'total_landed', 'total_attempted',
+    'td_landed', 'td_attempted', 'td_pct', 'sub_attempts', 'reversals', 'ctrl_sec',
+    'head_landed', 'head_attempted', 'body_landed', 'body_attempted', 'leg_landed',
+    'leg_attempted', 'dist_landed', 'dist_attempted', 'clinch_landed', 'clinch_attempted',
+    'ground_landed', 'ground_attempted',
+]
+FIELDNAMES = (
+    ['fight_url', 'event_name', 'event_date', 'weight_class', 'round', 'judge', 'f1_name', 'f2_name']
+    + [f'f1_{s}' for s in STAT_SHORT]
+    + [f'f2_{s}' for s in STAT_SHORT]
+    + ['judge_f1_score', 'judge_f2_score', 'judge_winner', 'is_10_8', 'rules_winner', 'rules_agrees']
+)
+
+
+# ---------------------------------------------------------------------------
+# Reference implementation (per-row) — kept verbatim for parity checks
+# ---------------------------------------------------------------------------
+
+def safe_float(v, default=0.0):
+    try:
+        f = float(v)
+        return f if math.isfinite(f) else default
+    except (TypeError, ValueError):
+        return default
+
+def compute_features(row):
+    # Stat differentials
+    diffs = []
+    for col in DIFF_COLS:
+        f1 = safe_float(row.get(f'f1_{col}'))
+        f2 = safe_float(row.get(f'f2_{col}'))
+        diffs.append(f1 - f2)
+
+    # Ratio features
+    ratios = []
+    for col in RATIO_COLS:
+        f1 = safe_float(row.get(f'f1_{col}'))
+        f2 = safe_float(row.get(f'f2_{col}'))
+        ratios.append(f1 / (f1 + f2 + 1.0))
+
+    # Era flag
+    event_date = row.get('event_date', '')
+    post_2016 = 1.0 if event_date >= '2016-01-01' else 0.0
+
+    features = diffs + ratios + [post_2016]
+
+    # Label
+    winner = row.get('judge_winner', '')
+    label = 1 if winner == 'f1' else (0 if winner == 'f2' else None)
+    return features, label
+
+def augment_rows(X, y):
+    n_diff = len(DIFF_COLS)
+    n_ratio = len(RATIO_COLS)
+
+    X_mirror = []
+    y_mirror = []
+    for feat, label in zip(X, y):
+        mirrored = (
+            [-f for f in feat[:n_diff]]           # negate diffs
+            + [1.0 - r for r in feat[n_diff:n_diff + n_ratio]]  # flip ratios
+            + [feat[-1]]                           # post_2016 unchanged
+        )
+        X_mirror.append(mirrored)
+        y_mirror.append(1 - label)
+
+    X_aug = X + X_mirror
+    y_aug = y + y_mirror
+    return X_aug, y_aug
+
+def compute_confidence(features, model):
+    COEFFICIENTS = model['coefficients']
+    INTERCEPT    = model['intercept']
+    SCALER_MEAN  = model['scaler_mean']
+    SCALER_STD   = model['scaler_std']
+    scaled = [(features[i] - SCALER_MEAN[i]) / SCALER_STD[i] for i in range(len(features))]
+    logit  = sum(COEFFICIENTS[i] * scaled[i] for i in range(len(scaled))) + INTERCEPT
+    return 1 / (1 + math.exp(-logit))
+
+def per_row_pipeline(csv_path):
+    with open(csv_path, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    X, y = [], []
+    for row in rows:
+        feats, label = compute_features(row)
+        if label is None:
+            continue
+        X.append(feats)
+        y.append(label)
+    return X, y
+
+def vectorized_pipeline(csv_path):
+    ds = load_dataset(csv_path)
+    y_all = labels(ds)
+    rows = np.flatnonzero(y_all >= 0)
+    return feature_matrix(ds, rows), y_all[rows]
+
+# ---------------------------------------------------------------------------
+# Synthetic dataset
+# ---------------------------------------------------------------------------
+
+def write_synthetic_csv(path, n_rows, seed=7):
+    """ml_dataset.csv-shaped file: 3 judges per round, ~5% one-sided empty stats,
+    ~1% rows without judge scores, draws, dates 2008-2025 (some empty)."""
+    rng = random.Random(seed)
+    weight_classes = ['Lightweight', 'Welterweight', 'Middleweight', 'Heavyweight',
+                      "Women's Strawweight", '']
+    judges = [f'Judge {i}' for i in range(40)]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        n, fight = 0, 0
+        while n < n_rows:
+            fight += 1
+            year = rng.randint(2008, 2025)
+            event_date = '' if rng.random() < 0.005 else f'{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+            wc = rng.choice(weight_classes)
+            for rnd in range(1, rng.choice((3, 3, 5)) + 1):
+                base1 = {s: rng.randint(0, 60) for s in STAT_SHORT}
+                base2 = {s: rng.randint(0, 60) for s in STAT_SHORT}
+                base1['sig_pct'] = round(rng.uniform(0, 100), 1)
+                base2['td_pct'] = round(rng.uniform(0, 100), 2)
+                missing = rng.random() < 0.05
+                for judge in rng.sample(judges, 3):
+                    row = {'fight_url': f'http://ufcstats.com/fight-details/{fight:08x}',
+                           'event_name': f'UFC {fight // 12}', 'event_date': event_date,
+                           'weight_class': wc, 'round': rnd, 'judge': judge,
+                           'f1_name': f'Fighter {fight}a', 'f2_name': f'Fighter {fight}b'}
+                    for s in STAT_SHORT:
+                        row[f'f1_{s}'] = '' if missing else base1[s]
+                        row[f'f2_{s}'] = base2[s]
+                    if rng.random() < 0.01:
+                        row.update(judge_f1_score='', judge_f2_score='', judge_winner='', is_10_8='')
+                    else:
+                        a, b = 10, rng.choice((9, 9, 9, 10, 8))
+                        if rng.random() < 0.5:
+                            a, b = b, a
+                        row.update(judge_f1_score=a, judge_f2_score=b,
+                                   judge_winner='f1' if a > b else ('f2' if b > a else 'draw'),
+                                   is_10_8=1 if abs(a - b) >= 2 else 0)
+                    rules = rng.choice(('f1', 'f2', 'draw'))
+                    row['rules_winner'] = rules
+                    row['rules_agrees'] = 1 if row['judge_winner'] and rules == row['judge_winner'] else 0
+                    writer.writerow(row)
+                    n += 1
+    return path
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def same_bits(a, b):
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return a.shape == b.shape and np.array_equal(a.view(np.uint64), b.view(np.uint64))
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), out
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized feature pipeline")
+    parser.add_argument('--csv', help="ml_dataset.csv to use (default: synthetic)")
+    parser.add_argument('--rows', type=int, default=50000, help="Synthetic dataset size")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    csv_path = Path(args.csv) if args.csv else write_synthetic_csv(Path(tmp.name) / 'ml_dataset.csv', args.rows)
+    write_columns(csv_path)
+    model = json.loads(MODEL_PATH.read_text(encoding='utf-8'))
+
+    # 1-2. Features + augmentation parity
+    X_ref, y_ref = per_row_pipeline(csv_path)
+    X_new, y_new = vectorized_pipeline(csv_path)
+    X_aug_ref, y_aug_ref = augment_rows(X_ref, y_ref)
+    X_aug_new, y_aug_new = augment(X_new, y_new)
+    checks = {
+        'features':     same_bits(X_ref, X_new) and list(y_new) == y_ref,
+        'augmentation': same_bits(X_aug_ref, X_aug_new) and list(y_aug_new) == y_aug_ref,
+        'confidence':   same_bits([compute_confidence(x, model) for x in X_ref],
+                                  lr_probability(X_new, model)),
+    }
+    print(f"Dataset: {csv_path}  ({len(y_ref):,} labelled rows)")
+    for name, ok in checks.items():
+        print(f"[{'OK' if ok else 'ERROR'}] {name}: {'bit-identical' if ok else 'MISMATCH'}")
+    if not all(checks.values()):
+        sys.exit(1)
+
+    # 3. Throughput (features + augmentation, load included)
+    t_ref, _ = best_of(lambda: augment_rows(*per_row_pipeline(csv_path)), args.repeat)
+    t_new, _ = best_of(lambda: augment(*vectorized_pipeline(csv_path)), args.repeat)
+    n = len(y_ref)
+    print(f"\n{'Pipeline':<34} {'rows/sec':>12} {'total (s)':>10}")
+    print(f"{'per-row (CSV dicts, previous)':<34} {n / t_ref:>12,.0f} {t_ref:>10.3f}")
+    print(f"{'vectorized (memory-mapped store)':<34} {n / t_new:>12,.0f} {t_new:>10.3f}")
+    print(f"Speedup: {t_ref / t_new:.1f}x")
+
+if __name__ == "__main__":
+    main()
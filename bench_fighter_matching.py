@@ -0,0 +1,138 @@
+"""
+bench_fighter_matching.py — Parity check + benchmark for the blocked fighter matcher.
+
+Compares fighter_identity.match_fight (blocking-key indexes, each name normalized once)
+with the sequential find_matching_fight scan it replaced in build_ml_dataset.py:
+
+  1. Pairwise: _prepared_strategy == match_strategy for every pair of corpus names.
+  2. Fight-level: same meta row, same f1/f2 orientation for every judge group.
+  3. Timing: judge groups matched per second, sequential vs blocked (indexes built once,
+     as judge_links.py does).
+
+The fixture corpus (fixtures/fighter_names/corpus.json) mixes UFCStats / mmadecisions
+spelling variants — accents, reversed Asian names, collapsed spaces, initials, shared
+last names. --scale repeats the event cards to mimic a full-history run.
+
+Usage:
+  python bench_fighter_matching.py
+  python bench_fighter_matching.py --scale 20
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from fighter_identity import (
+    matches_fighter, match_strategy, prepare_name, _prepared_strategy,
+    build_fight_index, match_fight,
+)
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+CORPUS_PATH = Path(__file__).parent / 'fixtures' / 'fighter_names' / 'corpus.json'
+
+
+# ---------------------------------------------------------------------------
+# Reference implementation (sequential scan) — kept verbatim for parity checks
+# ---------------------------------------------------------------------------
+
+def find_matching_fight(js_fighters, candidate_meta):
+    if len(js_fighters) != 2:
+        return None, None, None
+    js_a, js_b = js_fighters[0], js_fighters[1]
+    for m in candidate_meta:
+        m1, m2 = m['fighter1_name'], m['fighter2_name']
+        if matches_fighter(js_a, m1) and matches_fighter(js_b, m2):
+            return m, js_a, js_b
+        if matches_fighter(js_a, m2) and matches_fighter(js_b, m1):
+            return m, js_b, js_a
+    return None, None, None
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def load_corpus(path, scale):
+    corpus = json.loads(Path(path).read_text(encoding='utf-8'))
+    meta_by_event, groups = {}, []
+    for rep in range(scale):
+        suffix = f" #{rep}" if rep else ''
+        for ev in corpus['events']:
+            meta_by_event[ev['event_name'] + suffix] = [
+                {'fight_url': f"{ev['event_name']}{suffix}/{i}", 'fighter1_name': f1, 'fighter2_name': f2}
+                for i, (f1, f2) in enumerate(ev['fights'])
+            ]
+        for g in corpus['judge_groups']:
+            groups.append((g['fighters'], [e + suffix for e in g['candidate_events']]))
+    return corpus['names'], meta_by_event, groups
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the blocked fighter matcher")
+    parser.add_argument('--corpus', default=str(CORPUS_PATH))
+    parser.add_argument('--scale', type=int, default=10, help="Repeat the corpus N times")
+    args = parser.parse_args()
+
+    names, meta_by_event, groups = load_corpus(args.corpus, args.scale)
+    print(f"Corpus: {len(names)} names, {len(meta_by_event):,} events, "
+          f"{sum(len(v) for v in meta_by_event.values()):,} fights, {len(groups):,} judge groups")
+
+    # 1. Pairwise strategy parity
+    mismatches = 0
+    for a in names:
+        for b in names:
+            pa, pb = prepare_name(a), prepare_name(b)
+            got = _prepared_strategy(pa, pb) if pa and pb else None
+            if got != match_strategy(a, b):
+                mismatches += 1
+                print(f"  [ERROR] {a!r} / {b!r}: {match_strategy(a, b)} vs {got}")
+    print(f"[{'OK' if not mismatches else 'ERROR'}] Pairwise strategies: "
+          f"{len(names) ** 2:,} pairs, {mismatches} mismatches")
+
+    # 2. Fight-level parity
+    fight_index = {ev: build_fight_index(rows) for ev, rows in meta_by_event.items()}
+    n_matched = 0
+    strategies = {}
+    for js, cand_events in groups:
+        expected = find_matching_fight(js, [m for ev in cand_events for m in meta_by_event.get(ev, [])])
+        row, f1, f2, strat = match_fight(js, [fight_index[ev] for ev in cand_events if ev in fight_index])
+        if (row, f1, f2) != expected:
+            mismatches += 1
+            print(f"  [ERROR] {js}: {expected[1:]} vs {(f1, f2)}")
+        if row is not None:
+            n_matched += 1
+            strategies[strat] = strategies.get(strat, 0) + 1
+    print(f"[{'OK' if not mismatches else 'ERROR'}] Fight matches: {n_matched:,}/{len(groups):,} groups matched, "
+          f"identical to sequential scan")
+    for strat, n in sorted(strategies.items(), key=lambda kv: -kv[1])[:8]:
+        print(f"      {n:>6,}  {strat[0]} / {strat[1]}")
+    if mismatches:
+        sys.exit(1)
+
+    # 3. Throughput
+    t0 = time.perf_counter()
+    for js, cand_events in groups:
+        find_matching_fight(js, [m for ev in cand_events for m in meta_by_event.get(ev, [])])
+    seq_time = time.perf_counter() - t0
+
+    prepare_name.cache_clear()
+    t0 = time.perf_counter()
+    fight_index = {ev: build_fight_index(rows) for ev, rows in meta_by_event.items()}
+    build_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for js, cand_events in groups:
+        match_fight(js, [fight_index[ev] for ev in cand_events if ev in fight_index])
+    blocked_time = time.perf_counter() - t0
+
+    print(f"\n{'Matcher':<28} {'groups/sec':>12} {'total (s)':>10}")
+    print(f"{'sequential (previous)':<28} {len(groups) / seq_time:>12,.0f} {seq_time:>10.3f}")
+    print(f"{'blocked (incl. index build)':<28} {len(groups) / (blocked_time + build_time):>12,.0f} "
+          f"{blocked_time + build_time:>10.3f}")
+    print(f"Speedup: {seq_time / (blocked_time + build_time):.1f}x  "
+          f"(index build {build_time * 1000:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+bench_scoring_parity.py — Parity check + benchmark for every round-scoring implementation.
+
+The round scoring math exists several times; this scores one fixed corpus of rounds
+(fixtures/scoring_rounds/corpus.json — round_fight_stats-shaped stat pairs with one-sided /
+missing stats, empty cells, lopsided 10-8 rounds and ties) through each of them:
+
+  Logistic model — P(f1 wins the round)
+    reference    per-row Python: scoreRound's features + compute_confidence (bench_features.py,
+                 the code analyze_10_8_thresholds.py used) on scoring_model.json
+    batch        score_rounds.score_pairs: features.feature_matrix + lr_probability on the
+                 registry model (model_registry.load_model) — round_predictions
+    js           FightDetailView.js scoreRound run under node on the web copy of the current
+                 artifact (public/models/scoring/<hash>.bin) decoded by src/modelRegistry.js
+                 decodeModel — the model object loadScoringModel() hands the component
+  Rules model — winner by weighted stat totals
+    build_ml_dataset       rules_winner (the dataset's rules_winner column)
+    validate_scoring_model score_round
+
+  1. Parity: every implementation agrees with the reference within PROB_TOLERANCE, plus the
+     same winner / 10-8 call wherever P is not within tolerance of 0.5 / the 10-8 cut-off.
+     Rules implementations must return identical winners.
+  2. Golden: the reference still reproduces the corpus's recorded scores — a change that
+     moves every implementation together fails too. Skipped (warning) when the current
+     model artifact is not the one the scores were recorded with; --regen re-records them.
+  3. Timing: rounds/sec per implementation (best of --repeat; node timed in-process).
+
+The rules scorers, scoreRound and decodeModel are loaded from their source files
+(build_ml_dataset.py and validate_scoring_model.py connect to Supabase on import,
+FightDetailView.js is a React module, modelRegistry.js an ES module that fetches).
+
+Usage:
+  python bench_scoring_parity.py
+  python bench_scoring_parity.py --scale 50        # repeat the corpus for timing
+  python bench_scoring_parity.py --regen           # rewrite the corpus + recorded scores
+"""
+
+import sys
+import ast
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent
+sys.path.insert(0, str(ROOT / 'scoring_model'))
+from bench_features import compute_confidence
+from score_rounds import STAT_COLUMNS, TEN_EIGHT_THRESHOLD, score_pairs
+import model_registry
+
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+CORPUS_PATH = ROOT / 'fixtures' / 'scoring_rounds' / 'corpus.json'
+JS_PATH = ROOT / 'src' / 'components' / 'FightDetailView.js'
+JS_BLOCK = ('// --- SCORING MODEL', '// --- DATA JOIN ---')
+JS_REGISTRY_PATH = ROOT / 'src' / 'modelRegistry.js'
+WEB_MODEL_DIR = ROOT / 'public' / 'models' / 'scoring'
+JSON_MODEL_PATH = ROOT / 'scoring_model' / 'scoring_model.json'
+
+# Every implementation reads the same float32 values; only summation order differs
+PROB_TOLERANCE = 1e-9
+GOLDEN_TOLERANCE = 1e-12
+CORPUS_ROUNDS = 1000
+
+COLUMNS = list(STAT_COLUMNS.values())
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+def _fighter_stats(rng, dominance):
+    """One fighter's round — internally consistent landed / attempted / target splits."""
+    sig_att = rng.randint(0, int(20 + 60 * dominance))
+    sig = rng.randint(0, sig_att)
+    head = rng.randint(0, sig)
+    body = rng.randint(0, sig - head)
+    dist = rng.randint(0, sig)
+    clinch = rng.randint(0, sig - dist)
+    td_att = rng.choice((0, 0, 0, 1, 2, 3, 5)) + (4 if dominance > 0.8 else 0)
+    td = rng.randint(0, td_att)
+    return {
+        'kd':                          rng.choice((0,) * 12 + (1, 1, 2)) if dominance > 0.3 else 0,
+        'sig_strikes_landed':          sig,
+        'sig_strike_pct':              round(sig / sig_att * 100) if sig_att else 0,
+        'sig_strikes_head_landed':     head,
+        'sig_strikes_body_landed':     body,
+        'sig_strikes_leg_landed':      sig - head - body,
+        'sig_strikes_distance_landed': dist,
+        'sig_strikes_clinch_landed':   clinch,
+        'sig_strikes_ground_landed':   sig - dist - clinch,
+        'takedowns_landed':            td,
+        'takedown_pct':                round(td / td_att * 100) if td_att else 0,
+        'control_time_sec':            min(300, int(rng.random() ** 2 * 300 * (0.3 + dominance))),
+        'sub_attempts':                rng.choice((0,) * 8 + (1, 2)),
+    }
+
+def make_corpus(n=CORPUS_ROUNDS, seed=49):
+    """[(event_date, f1 stats | None, f2 stats | None)] covering the edge cases."""
+    rng = random.Random(seed)
+    rounds = []
+    for i in range(n):
+        date = f'{rng.randint(2001, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+        f1 = _fighter_stats(rng, rng.random())
+        f2 = _fighter_stats(rng, rng.random())
+        kind = i % 20
+        if kind == 0:                                   # lopsided — 10-8 territory
+            f1 = _fighter_stats(rng, 1.0)
+            f1.update(control_time_sec=rng.randint(200, 300), kd=rng.randint(0, 2))
+            f2 = {c: 0 for c in COLUMNS}
+        elif kind == 1:                                 # identical stats
+            f2 = dict(f1)
+        elif kind == 2:                                 # one fighter has no stats row
+            f1, f2 = (None, f2) if rng.random() < 0.5 else (f1, None)
+        elif kind == 3:                                 # neither has stats (not scored)
+            f1 = f2 = None
+        elif kind == 4:                                 # empty cells
+            for s in (f1, f2):
+                for c in rng.sample(COLUMNS, 3):
+                    s[c] = None
+        elif kind == 5:                                 # rules tie with different stats
+            f2 = dict(f1, sig_strikes_landed=f1['sig_strikes_landed'] + 5, kd=f1['kd'] + 1)
+            f1 = dict(f1, sig_strikes_landed=f1['sig_strikes_landed'] + 10)
+        rounds.append((date, f1, f2))
+    return rounds
+
+def write_corpus(rounds, expected, path=CORPUS_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pack = lambda s: None if s is None else [s[c] for c in COLUMNS]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        f.write(f' "columns": {json.dumps(COLUMNS)},\n')
+        f.write(f' "expected": {json.dumps(expected)},\n')
+        f.write(' "rounds": [\n')
+        f.write(',\n'.join(f'  {json.dumps([d, pack(a), pack(b)])}' for d, a, b in rounds))
+        f.write('\n ]\n}\n')
+
+def read_corpus(path=CORPUS_PATH):
+    with open(path, encoding='utf-8') as f:
+        corpus = json.load(f)
+    unpack = lambda s: None if s is None else dict(zip(corpus['columns'], s))
+    return [(d, unpack(a), unpack(b)) for d, a, b in corpus['rounds']], corpus['expected']
+
+# ---------------------------------------------------------------------------
+# Implementations
+# ---------------------------------------------------------------------------
+
+def _get(stats, col):
+    return (stats.get(col) or 0) if stats else 0
+
+def reference_features(f1, f2, event_date):
+    """scoreRound's feature vector, per row."""
+    diffs = [_get(f1, STAT_COLUMNS[c]) - _get(f2, STAT_COLUMNS[c])
+             for c in ('kd', 'sig_landed', 'sig_pct', 'head_landed', 'body_landed', 'leg_landed',
+                       'dist_landed', 'clinch_landed', 'ground_landed', 'td_landed', 'td_pct',
+                       'ctrl_sec', 'sub_attempts')]
+    ratios = []
+    for c in ('sig_landed', 'head_landed', 'td_landed', 'ctrl_sec', 'ground_landed'):
+        a, b = _get(f1, STAT_COLUMNS[c]), _get(f2, STAT_COLUMNS[c])
+        ratios.append(a / (a + b + 1))
+    return [float(v) for v in diffs + ratios] + [1.0 if int(event_date[:4]) >= 2016 else 0.0]
+
+def score_reference(rounds, model):
+    return np.array([compute_confidence(reference_features(a, b, d), model) if (a or b) else math.nan
+                     for d, a, b in rounds])
+
+def score_batch(rounds, model):
+    scored = [i for i, (_, a, b) in enumerate(rounds) if a or b]
+    pairs = [('', 1, rounds[i][1], rounds[i][2], rounds[i][0]) for i in scored]
+    out = np.full(len(rounds), math.nan)
+    out[scored] = score_pairs(pairs, model)[0]
+    return out
+
+def load_defs(path, names):
+    """Top-level assignments / functions `names` from a module's source, without importing it."""
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'))
+    keep = [node for node in tree.body
+            if (isinstance(node, ast.FunctionDef) and node.name in names)
+            or (isinstance(node, ast.Assign) and any(getattr(t, 'id', None) in names for t in node.targets))]
+    namespace = {}
+    exec(compile(ast.Module(body=keep, type_ignores=[]), str(path), 'exec'), namespace)
+    return namespace
+
+def rules_implementations():
+    dataset = load_defs(ROOT / 'scoring_model' / 'build_ml_dataset.py',
+                        {'RULES_WEIGHTS', '_rules_score', 'rules_winner'})
+    validate = load_defs(ROOT / 'validate_scoring_model.py',
+                         {'WEIGHTS', 'compute_round_score', 'score_round'})
+    return {
+        'build_ml_dataset.rules_winner':       dataset['rules_winner'],
+        'validate_scoring_model.score_round':  validate['score_round'],
+    }
+
+JS_RUNNER = """
+const fs = require('fs');
+const corpus = JSON.parse(fs.readFileSync(process.argv[2], 'utf8'));
+const repeat = parseInt(process.argv[3]);
+const raw = fs.readFileSync(process.argv[4]);
+const model = decodeModel(raw.buffer.slice(raw.byteOffset, raw.byteOffset + raw.byteLength), process.argv[5]);
+const cols = corpus.columns;
+const unpack = s => s && Object.fromEntries(cols.map((c, i) => [c, s[i]]));
+const rounds = corpus.rounds.map(([d, a, b]) => [parseInt(d.slice(0, 4)), unpack(a), unpack(b)]);
+let out, best = Infinity;
+for (let r = 0; r < repeat; r++) {
+  const t0 = process.hrtime.bigint();
+  out = rounds.map(([year, a, b]) => scoreRound(a, b, year, model));
+  best = Math.min(best, Number(process.hrtime.bigint() - t0) / 1e9);
+}
+console.log(JSON.stringify({
+  seconds: best,
+  p: out.map(m => m.confidence === null ? null : (m.winner === 'f1' ? m.confidence : 1 - m.confidence)),
+  is10_8: out.map(m => m.f1Score === 8 || m.f2Score === 8),
+}));
+"""
+
+def web_artifact():
+    """Artifact hash the app loads (public/models/scoring/current.json)."""
+    with open(WEB_MODEL_DIR / model_registry.WEB_CURRENT, encoding='utf-8') as f:
+        return json.load(f)['artifact']
+
+def score_js(corpus_path, repeat, artifact):
+    """(p_f1, is_10_8, seconds) from FightDetailView.scoreRound on the decoded web artifact,
+    or None without node."""
+    node = shutil.which('node')
+    if node is None:
+        return None
+    source = JS_PATH.read_text(encoding='utf-8')
+    start, end = source.index(JS_BLOCK[0]), source.index(JS_BLOCK[1])
+    # CommonJS script: drop the ES module exports (fetch is never called)
+    registry = JS_REGISTRY_PATH.read_text(encoding='utf-8').replace('export ', '')
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / 'score_round.js'
+        script.write_text(registry + source[start:end] + JS_RUNNER, encoding='utf-8')
+        res = subprocess.run([node, str(script), str(corpus_path), str(repeat),
+                              str(WEB_MODEL_DIR / f'{artifact}.bin'), artifact],
+                             capture_output=True, text=True, check=True)
+    out = json.loads(res.stdout)
+    p = np.array([math.nan if v is None else v for v in out['p']])
+    return p, np.array(out['is10_8']), out['seconds']
+
+# ---------------------------------------------------------------------------
+# Checks
+# ---------------------------------------------------------------------------
+
+def prob_mismatches(p, ref):
+    """Rows where two probability vectors disagree (NaN = not scored must match too)."""
+    both_nan = np.isnan(p) & np.isnan(ref)
+    close = np.abs(p - ref) <= PROB_TOLERANCE
+    return np.flatnonzero(~(both_nan | close))
+
+def call_mismatches(p, ref, is_10_8=None):
+    """Winner / 10-8 disagreements away from the decision boundaries."""
+    scored = ~np.isnan(ref)
+    p, ref_s = np.where(scored, p, 0.5), np.where(scored, ref, 0.5)
+    conf, ref_conf = np.maximum(p, 1 - p), np.maximum(ref_s, 1 - ref_s)
+    clear_winner = scored & (np.abs(ref_s - 0.5) > PROB_TOLERANCE)
+    clear_10_8 = scored & (np.abs(ref_conf - TEN_EIGHT_THRESHOLD) > PROB_TOLERANCE)
+    flags = conf >= TEN_EIGHT_THRESHOLD if is_10_8 is None else is_10_8
+    bad = (clear_winner & ((p >= 0.5) != (ref_s >= 0.5))) | \
+          (clear_10_8 & (flags != (ref_conf >= TEN_EIGHT_THRESHOLD)))
+    return np.flatnonzero(bad)
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), out
+
+def report(name, bad, what):
+    ok = len(bad) == 0
+    print(f"[{'OK' if ok else 'ERROR'}] {name}: "
+          f"{what if ok else f'{len(bad)} rounds differ (first: {bad[:5].tolist()})'}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description='Parity check + benchmark for the round scorers')
+    parser.add_argument('--scale', type=int, default=20, help='Corpus repeats for timing')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--regen', action='store_true',
+                        help='Regenerate the corpus and record the current reference scores')
+    args = parser.parse_args()
+
+    json_model = json.loads(JSON_MODEL_PATH.read_text(encoding='utf-8'))
+    registry_model = model_registry.load_model()
+    rules = rules_implementations()
+    rules_ref = next(iter(rules.values()))
+
+    if args.regen:
+        rounds = make_corpus()
+        p = score_reference(rounds, json_model)
+        write_corpus(rounds, {
+            'model_artifact': registry_model['artifact'],
+            'p_f1':           [None if math.isnan(v) else v for v in p.tolist()],
+            'rules_winner':   [rules_ref(a, b) for _, a, b in rounds],
+        })
+        print(f"[OK] Wrote {CORPUS_PATH} ({len(rounds):,} rounds, model {registry_model['artifact']})")
+
+    rounds, expected = read_corpus()
+    n_scored = sum(1 for _, a, b in rounds if a or b)
+    print(f"Corpus: {CORPUS_PATH.relative_to(ROOT)}  ({len(rounds):,} rounds, {n_scored:,} with stats)")
+    js_artifact = web_artifact()
+    print(f"Model:  {registry_model['artifact']} (registry)  |  JS: {js_artifact} "
+          f"(public/models/scoring, decodeModel)\n")
+
+    # 1. Parity
+    ref = score_reference(rounds, json_model)
+    batch = score_batch(rounds, registry_model)
+    checks = [
+        report('web copy vs registry current', np.flatnonzero([js_artifact != registry_model['artifact']]),
+               'same artifact'),
+        report('batch vs reference', np.union1d(prob_mismatches(batch, ref), call_mismatches(batch, ref)),
+               f'max |dp| {np.nanmax(np.abs(batch - ref)):.1e}'),
+    ]
+    js = score_js(CORPUS_PATH, 1, js_artifact)
+    if js is None:
+        print("[WARN] node not found — FightDetailView.scoreRound skipped")
+    else:
+        checks.append(report('js vs reference',
+                             np.union1d(prob_mismatches(js[0], ref), call_mismatches(js[0], ref, js[1])),
+                             f'max |dp| {np.nanmax(np.abs(js[0] - ref)):.1e}, same winners / 10-8 calls'))
+    winners = {name: [fn(a, b) for _, a, b in rounds] for name, fn in rules.items()}
+    for name, w in list(winners.items())[1:]:
+        checks.append(report(f'{name} vs {next(iter(winners))}',
+                             np.flatnonzero(np.array(w) != np.array(winners[next(iter(winners))])),
+                             'identical winners'))
+
+    # 2. Golden scores
+    if expected['model_artifact'] != registry_model['artifact']:
+        print(f"[WARN] Recorded scores are for model {expected['model_artifact']} — golden check "
+              f"skipped (run --regen after a deliberate model change)")
+    else:
+        golden = np.array([math.nan if v is None else v for v in expected['p_f1']])
+        drift = np.flatnonzero(~((np.isnan(golden) & np.isnan(ref)) |
+                                 (np.abs(golden - ref) <= GOLDEN_TOLERANCE)))
+        checks.append(report('reference vs recorded scores', drift, 'unchanged'))
+        checks.append(report('rules vs recorded winners',
+                             np.flatnonzero(np.array(winners[next(iter(winners))]) != np.array(expected['rules_winner'])),
+                             'unchanged'))
+    if not all(checks):
+        sys.exit(1)
+
+    # 3. Throughput
+    big = rounds * args.scale
+    n = len(big)
+    timings = [
+        ('reference (per-row Python)',     best_of(lambda: score_reference(big, json_model), args.repeat)[0]),
+        ('batch (score_rounds, NumPy)',    best_of(lambda: score_batch(big, registry_model), args.repeat)[0]),
+    ]
+    if js is not None:
+        with tempfile.TemporaryDirectory() as tmp:
+            big_path = Path(tmp) / 'corpus.json'
+            with open(CORPUS_PATH, encoding='utf-8') as f:
+                corpus = json.load(f)
+            corpus['rounds'] = corpus['rounds'] * args.scale
+            big_path.write_text(json.dumps(corpus), encoding='utf-8')
+            timings.append(('js (FightDetailView.scoreRound)', score_js(big_path, args.repeat, js_artifact)[2]))
+    for name, fn in rules.items():
+        timings.append((f'rules: {name}', best_of(lambda: [fn(a, b) for _, a, b in big], args.repeat)[0]))
+
+    print(f"\n{'Implementation':<46} {'rounds/sec':>12} {'total (s)':>10}")
+    for name, seconds in timings:
+        print(f"{name:<46} {n / seconds:>12,.0f} {seconds:>10.4f}")
+    print(f"({n:,} rounds = corpus x {args.scale}; best of {args.repeat}; node timed in-process)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+bulk_reader.py — Keyset-paginated, concurrent bulk table reader.
+
+Shared by the scoring-model scripts, validate_scoring_model.py, fighter_identity.py and
+judge_links.py for full-table pulls through PostgREST.
+
+Keyset, not OFFSET: each page is `key > last_key ORDER BY key LIMIT 1000`, an index range scan,
+so pulling a table costs O(n) instead of Postgres re-walking every skipped row on each page
+(O(n²) with `.range(offset, ...)`). The key column is added to the select list if missing.
+
+Concurrency: the key space is split into ranges (hex prefixes for gen_random_uuid keys,
+min..max for bigint keys) and every (table, range) pair is read on its own thread with a
+thread-local client, so several tables and key ranges stream at once.
+
+Tables without a single-column unique key (see TABLE_KEYS) fall back to OFFSET paging in a
+single range — keep those to small tables.
+
+Usage:
+  from bulk_reader import read_tables, stream_table, fetch_rows
+
+  for row in stream_table('round_fight_stats', 'event_name, fighter_name, round, kd'):
+      ...
+  tables = read_tables({'events': ('ufc_events', 'event_name, event_date'),
+                        'scores': ('judge_scores', 'date, bout, fighter, judge, round, score')})
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PAGE_SIZE = 1000
+MAX_WORKERS = 8
+PARTITIONS = 4     # key ranges per table for concurrent reads
+
+# table -> (unique key column, key type). 'uuid' / 'int' keys can be split into ranges;
+# 'text' keys are keyset-paged in one range. Missing tables use OFFSET paging.
+TABLE_KEYS = {
+    'ufc_events':         ('id', 'int'),
+    'fights':             ('id', 'int'),
+    'fight_meta_details': ('id', 'uuid'),
+    'round_fight_stats':  ('id', 'uuid'),
+    'judge_scores':       ('id', 'int'),
+    'fighters':           ('id', 'int'),
+    'fighter_aliases':    ('alias', 'text'),
+    'fight_judge_links':  ('fight_url', 'text'),   # unique (migrate_fight_judge_links.py)
+    'ml_dataset_rows':    ('row_key', 'uuid'),
+}
+
+_thread_local = threading.local()
+_DONE = object()
+
+
+def thread_client():
+    """Thread-local Supabase client (same pattern as scrape_mmadecisions.get_thread_db)."""
+    if not hasattr(_thread_local, 'db'):
+        from supabase import create_client
+        _thread_local.db = create_client(
+            os.environ["REACT_APP_SUPABASE_URL"],
+            os.environ["SUPABASE_SERVICE_KEY"]
+        )
+    return _thread_local.db
+
+# ---------------------------------------------------------------------------
+# Single range
+# ---------------------------------------------------------------------------
+
+def _with_key(columns, key):
+    cols = [c.strip() for c in columns.split(',')]
+    if columns.strip() != '*' and key not in cols:
+        return columns + ', ' + key
+    return columns
+
+def _apply(q, filters):
+    for op, col, val in filters:
+        q = getattr(q, op)(col, val)
+    return q
+
+def iter_pages(db, table, columns, filters=(), lower=None, upper=None, page_size=PAGE_SIZE):
+    """Yield row batches for `lower <= key < upper` (either bound optional), in key order.
+    filters: [(op, column, value)] applied to every page, e.g. [('gte', 'created_at', since)]."""
+    key, _ = TABLE_KEYS.get(table, (None, None))
+    if key is None:
+        yield from _iter_offset_pages(db, table, columns, filters, page_size)
+        return
+    columns = _with_key(columns, key)
+    last = None
+    while True:
+        q = _apply(db.from_(table).select(columns), filters)
+        if last is not None:
+            q = q.gt(key, last)
+        elif lower is not None:
+            q = q.gte(key, lower)
+        if upper is not None:
+            q = q.lt(key, upper)
+        batch = q.order(key).limit(page_size).execute().data or []
+        if batch:
+            yield batch
+        if len(batch) < page_size:
+            return
+        last = batch[-1][key]
+
+def _iter_offset_pages(db, table, columns, filters, page_size):
+    offset = 0
+    while True:
+        q = _apply(db.from_(table).select(columns), filters)
+        batch = q.range(offset, offset + page_size - 1).execute().data or []
+        if batch:
+            yield batch
+        if len(batch) < page_size:
+            return
+        offset += page_size
+
+def fetch_rows(db, table, columns, filters=()):
+    """Whole table (after filters) as a list, read sequentially on `db`."""
+    rows = []
+    for batch in iter_pages(db, table, columns, filters):
+        rows.extend(batch)
+    return rows
+
+# ---------------------------------------------------------------------------
+# Key ranges
+# ---------------------------------------------------------------------------
+
+def key_ranges(db, table, filters=(), partitions=PARTITIONS):
+    """[(lower, upper), ...] covering the table's key space; bounds None = open."""
+    key, key_type = TABLE_KEYS.get(table, (None, None))
+    if partitions <= 1 or key_type not in ('uuid', 'int'):
+        return [(None, None)]
+    if key_type == 'uuid':
+        # gen_random_uuid / md5-derived keys are uniform over the leading hex digits
+        bounds = [f"{i * 0x10000 // partitions:04x}0000-0000-0000-0000-000000000000"
+                  for i in range(1, partitions)]
+    else:
+        lo = _apply(db.from_(table).select(key), filters).order(key).limit(1).execute().data
+        hi = _apply(db.from_(table).select(key), filters).order(key, desc=True).limit(1).execute().data
+        if not lo or not hi:
+            return [(None, None)]
+        lo, hi = lo[0][key], hi[0][key]
+        step = (hi - lo) // partitions + 1
+        bounds = [lo + step * i for i in range(1, partitions) if lo + step * i <= hi]
+    edges = [None] + bounds + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+# ---------------------------------------------------------------------------
+# Concurrent reads
+# ---------------------------------------------------------------------------
+
+def _drain(pages, n_workers):
+    while n_workers:
+        item = pages.get()
+        if item is _DONE:
+            n_workers -= 1
+        elif isinstance(item, BaseException):
+            raise item
+        else:
+            yield from item
+
+def stream_table(table, columns, filters=(), partitions=PARTITIONS, ordered=False, client=thread_client):
+    """Yield rows of one table as pages arrive; key ranges are read concurrently.
+    ordered=True yields in key order (later ranges prefetch while earlier ones drain);
+    otherwise order is only guaranteed within a key range."""
+    ranges = key_ranges(client(), table, filters, partitions)
+    stop = threading.Event()
+    if ordered:
+        queues = [queue.Queue() for _ in ranges]
+    else:
+        queues = [queue.Queue()] * len(ranges)   # one shared queue
+
+    def worker(i, lower, upper):
+        try:
+            for batch in iter_pages(client(), table, columns, filters, lower, upper):
+                if stop.is_set():   # consumer stopped early
+                    return
+                queues[i].put(batch)
+        except BaseException as e:
+            queues[i].put(e)
+        finally:
+            queues[i].put(_DONE)
+
+    pool = ThreadPoolExecutor(max_workers=len(ranges))
+    try:
+        for i, (lower, upper) in enumerate(ranges):
+            pool.submit(worker, i, lower, upper)
+        if ordered:
+            for pages in queues:
+                yield from _drain(pages, 1)
+        else:
+            yield from _drain(queues[0], len(ranges))
+    finally:
+        stop.set()
+        pool.shutdown(wait=True)
+
+def read_tables(specs, partitions=PARTITIONS, workers=MAX_WORKERS, client=thread_client):
+    """Read several tables at once. specs: {name: (table, columns[, filters])}.
+    Returns {name: [rows]}; every (table, key range) is a separate job on one pool."""
+    jobs = []
+    for name, spec in specs.items():
+        table, columns = spec[0], spec[1]
+        filters = spec[2] if len(spec) > 2 else ()
+        for lower, upper in key_ranges(client(), table, filters, partitions):
+            jobs.append((name, table, columns, filters, lower, upper))
+
+    def read_job(job):
+        _, table, columns, filters, lower, upper = job
+        rows = []
+        for batch in iter_pages(client(), table, columns, filters, lower, upper):
+            rows.extend(batch)
+        return rows
+
+    out = {name: [] for name in specs}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map() keeps job order, so each table's ranges are concatenated in key order
+        for job, rows in zip(jobs, pool.map(read_job, jobs)):
+            out[job[0]].extend(rows)
+    return out
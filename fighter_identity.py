@@ -0,0 +1,375 @@
+"""
+fighter_identity.py — Canonical fighter identity + alias tables.
+
+Fighter names come from sources that never agree exactly: UFCStats (fight_meta_details,
+round_fight_stats), mmadecisions (judge_scores) and ESPN (Phase 5). This module keeps one
+`fighters` row per person (canonical spelling = UFCStats) and one `fighter_aliases` row per
+raw spelling seen in any source, each with precomputed normalized keys. Consumers resolve a
+name with a dict lookup / SQL equi-join on `fighter_aliases.alias` instead of re-running the
+fuzzy comparisons.
+
+mmadecisions names are resolved in context — the judge_scores (date, bout) group is matched
+to a fight_meta_details row on the same date ±1 day with the 5 matchesFighter strategies,
+and each mmadecisions name becomes an alias of the UFCStats fighter it paired with.
+
+Identity is name-level: two UFCStats fighters with the same normalized name share a row
+(same as every name-based join that existed before this table).
+
+Usage (the master pipeline runs the incremental sync after Phase 5):
+  python fighter_identity.py           # incremental — source rows newer than the last sync
+  python fighter_identity.py --full    # re-read every source row (also retries unresolved names)
+
+Tables: supabase/migrate_fighter_identity.py
+"""
+
+import re
+import sys
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from datetime import date, timedelta
+
+from bulk_reader import fetch_rows
+
+# ---------------------------------------------------------------------------
+# Normalization + match strategies (port of FightDetailView.js matchesFighter)
+# ---------------------------------------------------------------------------
+
+def norm_name(name):
+    # NFKD decomposition converts accented chars to base + combining mark,
+    # then the regex strips the combining marks — so ñ→n, ä→a, ã→a, ō→o, etc.
+    s = unicodedata.normalize('NFKD', (name or '').lower())
+    s = re.sub(r'[^a-z0-9\s]', '', s)
+    return re.sub(r'\s+', ' ', s).strip()
+
+def name_keys(name):
+    """Precomputed lookup keys stored on fighters / fighter_aliases rows."""
+    key = norm_name(name)
+    collapsed = key.replace(' ', '')
+    return {
+        'name_key':      key,
+        'collapsed_key': collapsed,
+        'sorted_key':    ''.join(sorted(collapsed)),
+        'last_key':      key.split()[-1] if key else '',
+    }
+
+def match_strategy(a, b):
+    """Name of the first matchesFighter strategy that pairs a and b, or None."""
+    na, nb = norm_name(a), norm_name(b)
+    if not na or not nb:
+        return None
+    # 1. Exact
+    if na == nb:
+        return 'exact'
+    # 2. Space-collapse ("Rong Zhu" vs "Rongzhu")
+    ac, bc = na.replace(' ', ''), nb.replace(' ', '')
+    if ac == bc:
+        return 'collapsed'
+    # 3. Character-sort anagram, len >= 5 ("Zha Yi" vs "Yizha")
+    if len(ac) >= 5 and len(ac) == len(bc) and sorted(ac) == sorted(bc):
+        return 'anagram'
+    # 4. Same last name, length > 3
+    aw, bw = na.split(), nb.split()
+    if aw[-1] == bw[-1] and len(aw[-1]) > 3:
+        return 'last_name'
+    # 5. All words of shorter name appear in longer (handles Jr., middle names)
+    shorter, longer = (aw, bw) if len(aw) <= len(bw) else (bw, aw)
+    if all(w in longer for w in shorter if len(w) > 1):
+        return 'word_subset'
+    return None
+
+def matches_fighter(a, b):
+    return match_strategy(a, b) is not None
+
+# ---------------------------------------------------------------------------
+# Blocked matcher — same 5 strategies, but each name is normalized once and candidates
+# are found through blocking-key indexes instead of trying every strategy on every row.
+# Results are identical to match_strategy / a sequential scan (bench_fighter_matching.py).
+# ---------------------------------------------------------------------------
+
+STRATEGIES = ('exact', 'collapsed', 'anagram', 'last_name', 'word_subset')  # strongest first
+
+@lru_cache(maxsize=None)
+def prepare_name(name):
+    """(key, collapsed, sorted chars, words, word set) for a raw name, or None if it normalizes empty."""
+    key = norm_name(name)
+    if not key:
+        return None
+    collapsed = key.replace(' ', '')
+    words = tuple(key.split())
+    return key, collapsed, ''.join(sorted(collapsed)), words, frozenset(words)
+
+def _prepared_strategy(p, q):
+    """match_strategy on two prepare_name() tuples."""
+    if p[0] == q[0]:
+        return 'exact'
+    if p[1] == q[1]:
+        return 'collapsed'
+    if len(p[1]) >= 5 and p[2] == q[2]:     # equal sorted chars implies equal length
+        return 'anagram'
+    if p[3][-1] == q[3][-1] and len(p[3][-1]) > 3:
+        return 'last_name'
+    shorter, longer = (p, q) if len(p[3]) <= len(q[3]) else (q, p)
+    if all(w in longer[4] for w in shorter[3] if len(w) > 1):
+        return 'word_subset'
+    return None
+
+def build_name_index(names):
+    """Blocking index over candidate names; slot = position in `names`."""
+    index = {
+        'prepared': [], 'key': defaultdict(list), 'collapsed': defaultdict(list),
+        'sorted': defaultdict(list), 'last': defaultdict(list), 'word': defaultdict(list),
+        'no_long_words': [],
+    }
+    for slot, name in enumerate(names):
+        p = prepare_name(name)
+        index['prepared'].append(p)
+        if p is None:
+            continue
+        index['key'][p[0]].append(slot)
+        index['collapsed'][p[1]].append(slot)
+        if len(p[1]) >= 5:
+            index['sorted'][p[2]].append(slot)
+        if len(p[3][-1]) > 3:
+            index['last'][p[3][-1]].append(slot)
+        long_words = {w for w in p[3] if len(w) > 1}
+        for w in long_words:
+            index['word'][w].append(slot)
+        if not long_words:
+            index['no_long_words'].append(slot)
+    return index
+
+def match_name(index, name):
+    """{slot: strategy} for every indexed name that matches `name`."""
+    q = prepare_name(name)
+    if q is None:
+        return {}
+    candidates = set(index['key'].get(q[0], ()))
+    candidates.update(index['collapsed'].get(q[1], ()))
+    if len(q[1]) >= 5:
+        candidates.update(index['sorted'].get(q[2], ()))
+    if len(q[3][-1]) > 3:
+        candidates.update(index['last'].get(q[3][-1], ()))
+    # word_subset: the shorter name's long words all appear in the longer one, so the pair
+    # shares a long word — unless the shorter side has no long words at all
+    q_long = [w for w in q[3] if len(w) > 1]
+    for w in q_long:
+        candidates.update(index['word'].get(w, ()))
+    candidates.update(index['no_long_words'])
+    if not q_long:
+        candidates = range(len(index['prepared']))
+
+    matches = {}
+    for slot in candidates:
+        p = index['prepared'][slot]
+        if p is not None:
+            strategy = _prepared_strategy(q, p)
+            if strategy:
+                matches[slot] = strategy
+    return matches
+
+def build_fight_index(meta_rows):
+    """Blocking index over fight_meta_details rows: slot 2k = fighter1 of row k, 2k+1 = fighter2."""
+    names = []
+    for m in meta_rows:
+        names.extend((m['fighter1_name'], m['fighter2_name']))
+    index = build_name_index(names)
+    index['rows'] = list(meta_rows)
+    return index
+
+def match_fight(js_fighters, fight_indexes):
+    """Match 2 mmadecisions fighter names to a fight_meta_details row.
+
+    fight_indexes: build_fight_index() results, in the order a sequential scan would visit
+    their rows. Returns (meta_row, f1_js_name, f2_js_name, (f1_strategy, f2_strategy)) where
+    f1_js_name is the name that maps to meta.fighter1_name — the same row and orientation the
+    sequential first-match scan picks — or (None, None, None, None).
+    """
+    if len(js_fighters) != 2:
+        return None, None, None, None
+    js_a, js_b = js_fighters[0], js_fighters[1]
+    for index in fight_indexes:
+        ma = match_name(index, js_a)
+        if not ma:
+            continue
+        mb = match_name(index, js_b)
+        best = None
+        for slot, sa in ma.items():
+            sb = mb.get(slot ^ 1)       # js_b must match the other fighter of the same row
+            if sb is not None and (best is None or slot < best[0]):
+                best = (slot, sa, sb)
+        if best:
+            slot, sa, sb = best
+            m = index['rows'][slot // 2]
+            if slot % 2 == 0:
+                return m, js_a, js_b, (sa, sb)
+            return m, js_b, js_a, (sb, sa)  # swap so f1_js -> m1, f2_js -> m2
+    return None, None, None, None
+
+def weakest_strategy(strategies):
+    """Single match-strategy code for a fight match: the weaker of the two name matches."""
+    return max(strategies, key=STRATEGIES.index)
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def fetch_all(db, table, columns, since_col=None, since=None):
+    filters = [('gte', since_col, since)] if since_col and since else []
+    return fetch_rows(db, table, columns, filters)
+
+def load_identity(db):
+    """In-memory identity: name_key -> fighter_id, raw alias -> fighter_id, id -> canonical name."""
+    fighters = fetch_all(db, 'fighters', 'id, canonical_name, name_key')
+    aliases = fetch_all(db, 'fighter_aliases', 'alias, fighter_id, created_at')
+    return {
+        'by_key':    {f['name_key']: f['id'] for f in fighters},
+        'by_alias':  {a['alias']: a['fighter_id'] for a in aliases},
+        'canonical': {f['id']: f['canonical_name'] for f in fighters},
+        'watermark': max((a['created_at'] for a in aliases if a.get('created_at')), default=None),
+    }
+
+def resolve(identity, name):
+    """fighter_id for a raw name from any source, or None. O(1)."""
+    fid = identity['by_alias'].get(name)
+    if fid is None:
+        fid = identity['by_key'].get(norm_name(name))
+    return fid
+
+# ---------------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------------
+
+def _chunks(rows, size=500):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+def _ensure_fighters(db, identity, names):
+    """Create fighters rows for canonical (UFCStats) names whose key is unknown."""
+    new = {}
+    for name in names:
+        keys = name_keys(name)
+        if keys['name_key'] and keys['name_key'] not in identity['by_key']:
+            new.setdefault(keys['name_key'], {'canonical_name': name, **keys})
+    for chunk in _chunks(list(new.values())):
+        res = db.table('fighters').upsert(chunk, on_conflict='name_key').execute()
+        for f in res.data or []:
+            identity['by_key'][f['name_key']] = f['id']
+            identity['canonical'][f['id']] = f['canonical_name']
+    return len(new)
+
+def _stage_alias(identity, pending, alias, fighter_id, source, strategy):
+    if not alias or fighter_id is None or alias in identity['by_alias'] or alias in pending:
+        return
+    pending[alias] = {
+        'alias': alias,
+        'name_key': norm_name(alias),
+        'fighter_id': fighter_id,
+        'source': source,
+        'match_strategy': strategy,
+    }
+
+def _write_aliases(db, identity, pending):
+    for chunk in _chunks(list(pending.values())):
+        db.table('fighter_aliases').upsert(chunk, on_conflict='alias', ignore_duplicates=True).execute()
+    for a in pending.values():
+        identity['by_alias'][a['alias']] = a['fighter_id']
+    return len(pending)
+
+def sync_identity(db, espn_pairs=(), full=False):
+    """Bring fighters / fighter_aliases up to date. espn_pairs: [(espn_name, ufcstats_name)]."""
+    identity = load_identity(db)
+    since = None
+    if not full and identity['watermark']:
+        # Small overlap so rows inserted while the previous sync ran are not missed
+        since = (date.fromisoformat(identity['watermark'][:10]) - timedelta(days=2)).isoformat()
+    print(f"[..] Fighter identity: {len(identity['by_key']):,} fighters, "
+          f"{len(identity['by_alias']):,} aliases ({'full' if since is None else f'since {since[:10]}'})")
+
+    pending = {}
+
+    # 1. UFCStats canonical names (fight_meta_details has no timestamp — always read; 2 columns)
+    meta = fetch_all(db, 'fight_meta_details', 'event_name, fighter1_name, fighter2_name')
+    stats_names = {r['fighter_name'] for r in
+                   fetch_all(db, 'round_fight_stats', 'fighter_name', 'inserted_at', since)}
+    meta_names = {n for m in meta for n in (m['fighter1_name'], m['fighter2_name']) if n}
+    canonical_names = meta_names | stats_names
+    n_new_fighters = _ensure_fighters(db, identity, canonical_names)
+    for name in canonical_names:
+        source = 'ufcstats' if name in meta_names else 'round_stats'
+        _stage_alias(identity, pending, name, identity['by_key'].get(norm_name(name)), source, 'exact')
+
+    # 2. ESPN names, already paired with a UFCStats bout by Phase 5
+    _ensure_fighters(db, identity, {ufc for _, ufc in espn_pairs})
+    for espn_name, ufc_name in espn_pairs:
+        _stage_alias(identity, pending, espn_name, resolve(identity, ufc_name), 'espn',
+                     match_strategy(espn_name, ufc_name) or 'bout_context')
+
+    # 3. mmadecisions names, resolved against the fight they were scored in
+    events = fetch_all(db, 'ufc_events', 'event_name, event_date')
+    events_by_date = defaultdict(list)
+    for e in events:
+        if e.get('event_date'):
+            events_by_date[e['event_date']].append(e['event_name'])
+    meta_by_event = defaultdict(list)
+    for m in meta:
+        meta_by_event[m['event_name']].append(m)
+    fight_index = {ev: build_fight_index(rows) for ev, rows in meta_by_event.items()}
+
+    scores = fetch_all(db, 'judge_scores', 'date, bout, fighter', 'created_at', since)
+    groups = defaultdict(set)
+    for js in scores:
+        groups[(js['date'], js['bout'])].add(js['fighter'])
+
+    unresolved = set()
+    for (js_date, _), fighters in groups.items():
+        todo = [f for f in fighters if f not in identity['by_alias'] and f not in pending]
+        if not todo:
+            continue
+        meta_row = None
+        if len(fighters) == 2:
+            d0 = date.fromisoformat(str(js_date))
+            indexes = [fight_index[ev] for delta in (-1, 0, 1)
+                       for ev in events_by_date.get((d0 + timedelta(days=delta)).isoformat(), [])
+                       if ev in fight_index]
+            meta_row, f1_js, f2_js, strategies = match_fight(sorted(fighters), indexes)
+            if meta_row is not None:
+                pairing = {f1_js: (meta_row['fighter1_name'], strategies[0]),
+                           f2_js: (meta_row['fighter2_name'], strategies[1])}
+        for f in todo:
+            if meta_row is not None:
+                meta_name, strategy = pairing[f]
+                _stage_alias(identity, pending, f, resolve(identity, meta_name), 'mmadecisions', strategy)
+            elif norm_name(f) in identity['by_key']:
+                # No fight context, but the normalized spelling is already a known fighter
+                _stage_alias(identity, pending, f, identity['by_key'][norm_name(f)], 'mmadecisions', 'exact')
+            else:
+                unresolved.add(f)
+
+    n_aliases = _write_aliases(db, identity, pending)
+    print(f"[OK] Fighter identity: +{n_new_fighters:,} fighters, +{n_aliases:,} aliases, "
+          f"{len(unresolved):,} mmadecisions names unresolved")
+    return identity
+
+
+if __name__ == "__main__":
+    import os
+    import argparse
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    load_dotenv(dotenv_path=Path(__file__).parent / '.env')
+
+    parser = argparse.ArgumentParser(description="Build / refresh the fighters + fighter_aliases tables")
+    parser.add_argument("--full", action="store_true", help="Re-read every source row")
+    args = parser.parse_args()
+
+    url = os.environ.get("REACT_APP_SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        print("[ERROR] Missing REACT_APP_SUPABASE_URL or SUPABASE_SERVICE_KEY in .env")
+        sys.exit(1)
+    sync_identity(create_client(url, key), full=args.full)
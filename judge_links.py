@@ -0,0 +1,156 @@
+"""
+judge_links.py — Persisted fight ↔ judge-scorecard links.
+
+judge_scores (mmadecisions) and fight_meta_details (UFCStats) never share an event name
+or an exact fighter spelling, so every consumer used to re-derive the pairing with a ±1 day
+date window plus fuzzy name comparisons. This module does that matching once per
+judge_scores (bout, date) group and stores the result in `fight_judge_links`:
+
+  (js_bout, js_date) -> fight_url, f1_js_name, f2_js_name, match_strategy
+
+A fight has at most one link (unique fight_url): when a second scorecard group matches a
+fight that is already linked, the existing link is kept and the conflict is logged.
+
+f1_js_name / f2_js_name are the judge_scores.fighter spellings of
+fight_meta_details.fighter1_name / fighter2_name, so consumers orient scores with an
+equality test instead of a name comparison. match_strategy is the weaker of the two name
+matches (fighter_identity.weakest_strategy).
+
+Matching is fighter_identity.match_fight over every UFCStats event dated ±1 day of the
+scorecard — the same 5 matchesFighter strategies build_ml_dataset.py used inline.
+
+Usage (the master pipeline runs the incremental sync after Phase 6):
+  python judge_links.py           # incremental — judge_scores rows newer than the last link
+  python judge_links.py --full    # re-read every judge_scores row (also retries unmatched groups)
+
+Table: supabase/migrate_fight_judge_links.py
+"""
+
+import sys
+from collections import defaultdict
+from datetime import date, timedelta
+
+from fighter_identity import build_fight_index, match_fight, weakest_strategy, fetch_all
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def load_links(db):
+    """{(js_bout, js_date): link row} for every stored link, plus the created_at watermark."""
+    rows = fetch_all(db, 'fight_judge_links',
+                     'js_bout, js_date, fight_url, f1_js_name, f2_js_name, match_strategy, created_at')
+    links = {(r['js_bout'], str(r['js_date'])): r for r in rows}
+    watermark = max((r['created_at'] for r in rows if r.get('created_at')), default=None)
+    return links, watermark
+
+def load_fight_indexes(db):
+    """events_by_date (date str -> UFCStats event names) + per-event blocked fight indexes."""
+    events_by_date = defaultdict(list)
+    for e in fetch_all(db, 'ufc_events', 'event_name, event_date'):
+        if e.get('event_date'):
+            events_by_date[e['event_date']].append(e['event_name'])
+    meta_by_event = defaultdict(list)
+    for m in fetch_all(db, 'fight_meta_details', 'fight_url, event_name, fighter1_name, fighter2_name'):
+        meta_by_event[m['event_name']].append(m)
+    fight_index = {ev: build_fight_index(rows) for ev, rows in meta_by_event.items()}
+    return events_by_date, fight_index
+
+# ---------------------------------------------------------------------------
+# Matching
+# ---------------------------------------------------------------------------
+
+def link_group(js_bout, js_date, fighters, events_by_date, fight_index):
+    """Link row for one judge_scores (bout, date) group, or None when no fight matches."""
+    if len(fighters) != 2:
+        return None
+    try:
+        d0 = date.fromisoformat(str(js_date))
+    except ValueError:
+        return None
+    indexes = [fight_index[ev] for delta in (-1, 0, 1)
+               for ev in events_by_date.get((d0 + timedelta(days=delta)).isoformat(), [])
+               if ev in fight_index]
+    meta_row, f1_js, f2_js, strategies = match_fight(sorted(fighters), indexes)
+    if meta_row is None:
+        return None
+    return {
+        'js_bout': js_bout,
+        'js_date': str(js_date),
+        'fight_url': meta_row['fight_url'],
+        'f1_js_name': f1_js,
+        'f2_js_name': f2_js,
+        'match_strategy': weakest_strategy(strategies),
+    }
+
+# ---------------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------------
+
+def sync_judge_links(db, full=False):
+    """Link every judge_scores (bout, date) group that has no fight_judge_links row yet."""
+    links, watermark = load_links(db)
+    since = None
+    if not full and watermark:
+        # Small overlap so rows inserted while the previous sync ran are not missed
+        since = (date.fromisoformat(watermark[:10]) - timedelta(days=2)).isoformat()
+    print(f"[..] Judge links: {len(links):,} stored ({'full' if since is None else f'since {since}'})")
+
+    scores = fetch_all(db, 'judge_scores', 'date, bout, fighter', 'created_at', since)
+    groups = defaultdict(set)
+    for js in scores:
+        key = (js['bout'], str(js['date']))
+        if key not in links:
+            groups[key].add(js['fighter'])
+    if not groups:
+        print("[OK] Judge links: nothing new to link")
+        return links
+
+    events_by_date, fight_index = load_fight_indexes(db)
+    linked = {l['fight_url']: key for key, l in links.items()}
+    new_links, unmatched, conflicts = [], 0, 0
+    for (js_bout, js_date), fighters in groups.items():
+        link = link_group(js_bout, js_date, fighters, events_by_date, fight_index)
+        if link is None:
+            unmatched += 1
+            continue
+        if link['fight_url'] in linked:
+            other_bout, other_date = linked[link['fight_url']]
+            print(f"[WARN] Judge links: {js_bout} ({js_date}) matches {link['fight_url']}, "
+                  f"already linked to {other_bout} ({other_date}) — skipped")
+            conflicts += 1
+            continue
+        linked[link['fight_url']] = (js_bout, js_date)
+        new_links.append(link)
+
+    for i in range(0, len(new_links), 500):
+        db.table('fight_judge_links').upsert(new_links[i:i + 500], on_conflict='js_bout,js_date').execute()
+    for link in new_links:
+        links[(link['js_bout'], link['js_date'])] = link
+
+    print(f"[OK] Judge links: +{len(new_links):,} linked, {unmatched:,} groups unmatched, "
+          f"{conflicts:,} skipped as duplicate fights (of {len(groups):,} new)")
+    return links
+
+
+if __name__ == "__main__":
+    import os
+    import argparse
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    load_dotenv(dotenv_path=Path(__file__).parent / '.env')
+
+    parser = argparse.ArgumentParser(description="Build / refresh the fight_judge_links table")
+    parser.add_argument("--full", action="store_true", help="Re-read every judge_scores row")
+    args = parser.parse_args()
+
+    url = os.environ.get("REACT_APP_SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_KEY")
+    if not url or not key:
+        print("[ERROR] Missing REACT_APP_SUPABASE_URL or SUPABASE_SERVICE_KEY in .env")
+        sys.exit(1)
+    sync_judge_links(create_client(url, key), full=args.full)
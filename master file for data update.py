@@ -1,6 +1,7 @@
 import os
 import sys
 import time
+import argparse
 import subprocess
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 from datetime import datetime
@@ -11,6 +12,10 @@ from supabase import create_client, Client
 from dateutil import parser
 from pathlib import Path
 
+import retry_queue
+import fighter_identity
+import judge_links
+
 # --- 1. INITIALIZATION ---
 # This forces the script to look for .env in the same folder as the script file
 env_path = Path(__file__).parent / '.env'
@@ -35,6 +40,9 @@ stats_summary = {
     "new_round_rows": 0
 }
 
+# (ESPN displayName, UFCStats name) pairs seen by Phase 5 — become fighter_aliases in Phase 7
+espn_name_pairs = []
+
 # --- 2. UTILITY FUNCTIONS ---
 def get_texts(td): 
     return [p.get_text(strip=True) for p in td.find_all('p')]
@@ -414,6 +422,47 @@ def sync_fights():
                     supabase_db.table("user_votes").delete().eq("fight_id", f['id']).execute()
                     supabase_db.table("fights").delete().eq("id", f['id']).execute()
 
+def update_fight_from_meta(fight_url, meta):
+    """Copy winner + weight_class from a fight_meta_details row onto the main 'fights' row.
+    Idempotent, so a retry can re-run it whenever the meta row already exists."""
+    fights_update = {}
+    if meta.get('winner'):
+        fights_update['winner'] = meta['winner']
+    if meta.get('weight_class'):
+        fights_update['weight_class'] = meta['weight_class']
+    if fights_update:
+        if meta.get('winner'):
+            print(f"🏆 Updating Winner for {meta['bout']}: {meta['winner']}")
+        supabase_db.table("fights").update(fights_update).eq("fight_url", fight_url).execute()
+
+def sync_fight_meta(fight_url):
+    """Scrape + insert metadata for one fight. Failures go to the retry queue ('meta')."""
+    data = parse_fight_meta_details(fight_url)
+    if not data:
+        retry_queue.record_failure('meta', fight_url, 'MetaParseFailed')
+        return False
+    data['bout'] = clean_bout_name(data.get('bout', ''))
+
+    # --- THE FIX ---
+    # Remove 'status' from the dictionary because the fight_meta_details table 
+    # doesn't have a 'status' column. (It only exists on the parent 'fights' table).
+    data.pop('status', None) 
+
+    try:
+        # 1. Insert the detailed metadata
+        supabase_db.table("fight_meta_details").insert(data).execute()
+
+        # 2. Update the main 'fights' table with winner + weight_class
+        update_fight_from_meta(fight_url, data)
+    except Exception as e:
+        print(f"❌ Metadata insert failed for {fight_url}: {e}")
+        retry_queue.record_failure('meta', fight_url, e)
+        return False
+
+    retry_queue.record_success('meta', fight_url)
+    stats_summary["new_metadata"] += 1
+    return True
+
 def sync_meta():
     print("🚀 Phase 3: Syncing Metadata & Winners...")
     # Fetch ALL completed fights — per-fight URL check skips already-processed ones
@@ -424,32 +473,38 @@ def sync_meta():
         if supabase_db.table("fight_meta_details").select("id").eq("fight_url", f['fight_url']).execute().data: 
             continue
             
-        data = parse_fight_meta_details(f['fight_url'])
-        if data:
-            data['bout'] = clean_bout_name(data.get('bout', ''))
-            
-            # --- THE FIX ---
-            # Remove 'status' from the dictionary because the fight_meta_details table 
-            # doesn't have a 'status' column. (It only exists on the parent 'fights' table).
-            data.pop('status', None) 
-
-            # 1. Insert the detailed metadata
-            supabase_db.table("fight_meta_details").insert(data).execute()
-            
-            # 2. Update the main 'fights' table with winner + weight_class
-            fights_update = {}
-            if data.get('winner'):
-                fights_update['winner'] = data['winner']
-            if data.get('weight_class'):
-                fights_update['weight_class'] = data['weight_class']
-            if fights_update:
-                if data.get('winner'):
-                    print(f"🏆 Updating Winner for {data['bout']}: {data['winner']}")
-                supabase_db.table("fights").update(fights_update).eq("fight_url", f['fight_url']).execute()
-            
-            stats_summary["new_metadata"] += 1
+        if sync_fight_meta(f['fight_url']):
             time.sleep(1)
 
+def sync_fight_round_stats(task):
+    """Scrape + upsert round stats for one fight (task: bout, event_name, fight_url).
+    Failures go to the retry queue ('round_stats') instead of aborting the phase."""
+    try:
+        res = requests.get(task['fight_url'], timeout=15)
+        if res.status_code != 200:
+            retry_queue.record_failure('round_stats', task['fight_url'], f"HTTP {res.status_code}", payload=task)
+            return
+        soup = BeautifulSoup(res.text, 'html.parser')
+        tables = soup.find_all('table', class_='b-fight-details__table js-fight-table')
+        if len(tables) < 2:
+            # Page has no per-round tables (yet) — nothing to retry
+            retry_queue.record_success('round_stats', task['fight_url'])
+            return
+
+        cleaned_bout = clean_bout_name(task['bout'])
+        main = parse_base_stats_table(tables[0], task['event_name'], cleaned_bout)
+        zone = parse_zone_stats_table(tables[1], task['event_name'], cleaned_bout)
+
+        z_map = {(z["fighter_name"], z["round"]): z for z in zone}
+        merged = [{**m, **z_map.get((m["fighter_name"], m["round"]), {})} for m in main]
+
+        supabase_db.table("round_fight_stats").upsert(merged, on_conflict="event_name,bout,round,fighter_name").execute()
+        stats_summary["new_round_rows"] += len(merged)
+        retry_queue.record_success('round_stats', task['fight_url'])
+    except Exception as e:
+        print(f"   ❌ Round stats failed for {task['bout']}: {e}")
+        retry_queue.record_failure('round_stats', task['fight_url'], e, payload=task)
+
 def sync_round_stats():
     print("🚀 Phase 4: Syncing Round Stats...")
     # Fetch tasks from your view or manually check missing stats
@@ -457,25 +512,22 @@ def sync_round_stats():
     # Assuming 'fight_scraping_status' view exists:
     try:
         tasks = supabase_db.table("fight_scraping_status").select("bout, event_name, fight_url").filter("fight_status", "in", '("❌ MISSING", "⚠️ PARTIAL")').execute()
-        
-        for task in tasks.data:
-            res = requests.get(task['fight_url'])
-            if res.status_code != 200: continue
-            soup = BeautifulSoup(res.text, 'html.parser')
-            tables = soup.find_all('table', class_='b-fight-details__table js-fight-table')
-            if len(tables) < 2: continue
-            
-            cleaned_bout = clean_bout_name(task['bout'])
-            main = parse_base_stats_table(tables[0], task['event_name'], cleaned_bout)
-            zone = parse_zone_stats_table(tables[1], task['event_name'], cleaned_bout)
-            
-            z_map = {(z["fighter_name"], z["round"]): z for z in zone}
-            merged = [{**m, **z_map.get((m["fighter_name"], m["round"]), {})} for m in main]
-            
-            supabase_db.table("round_fight_stats").upsert(merged, on_conflict="event_name,bout,round,fighter_name").execute()
-            stats_summary["new_round_rows"] += len(merged)
     except Exception as e:
         print(f"Skipping Round Stats (View might be missing): {e}")
+        return
+
+    for task in tasks.data:
+        sync_fight_round_stats(task)
+
+def score_new_rounds():
+    print("🧮 Phase 4b: Scoring new rounds (round_predictions, fight_decision_probabilities)...")
+    # Own processes: the scripts run from scoring_model/ and need numpy
+    for script in ("score_rounds.py", "decision_probability.py"):
+        path = Path(__file__).parent / "scoring_model" / script
+        result = subprocess.run([sys.executable, str(path)], cwd=path.parent, text=True)
+        if result.returncode != 0:
+            print(f"   ⚠️  {script} exited with code {result.returncode}")
+            return
 
 
 
@@ -576,6 +628,10 @@ def sync_event_times():
                     )
                     if db_match:
                         matched_ids.append(db_match['id'])
+                        db_a, db_b = db_match['bout'].split(' vs ', 1)
+                        if not (_names_match(espn_a, db_a) and _names_match(espn_b, db_b)):
+                            db_a, db_b = db_b, db_a
+                        espn_name_pairs.extend([(espn_a, db_a.strip()), (espn_b, db_b.strip())])
                         updates = {}
                         if db_match['espn_competition_id'] != comp_id:
                             updates['espn_competition_id'] = comp_id
@@ -608,6 +664,43 @@ def sync_event_times():
         except Exception as e:
             print(f"      ❌ Error syncing time: {e}")
 
+def sync_fighter_identity():
+    print("🪪 Phase 7: Syncing Fighter Identity (fighters + fighter_aliases)...")
+    try:
+        fighter_identity.sync_identity(supabase_db, espn_pairs=espn_name_pairs)
+    except Exception as e:
+        print(f"   ⚠️  Fighter identity sync skipped: {e}")
+
+def retry_failed_work():
+    """Retry pass: retry Phase 3/4 work items that failed on earlier runs (see retry_queue.py).
+    Runs before any discovery so a transient failure costs one retry, not a full rescan.
+    Judge-score items are retried by scrape_mmadecisions.py itself at the start of Phase 6."""
+    retry_queue.load_queue()
+    meta_items = retry_queue.due_items('meta')
+    round_items = retry_queue.due_items('round_stats')
+    if not meta_items and not round_items:
+        print(f"♻️  Retry Pass: nothing due ({retry_queue.summarize(('meta', 'round_stats'))})")
+        return
+    print(f"♻️  Retry Pass: retrying {len(meta_items)} metadata + {len(round_items)} round-stat items...")
+    for item in meta_items:
+        # The meta row may exist already (another path filled it, or only the fights update
+        # failed): re-apply the fights update from it instead of scraping again
+        existing = supabase_db.table("fight_meta_details").select("bout, winner, weight_class") \
+            .eq("fight_url", item['url']).limit(1).execute().data
+        if not existing:
+            sync_fight_meta(item['url'])
+            continue
+        try:
+            update_fight_from_meta(item['url'], existing[0])
+        except Exception as e:
+            print(f"❌ Winner update failed for {item['url']}: {e}")
+            retry_queue.record_failure('meta', item['url'], e)
+            continue
+        retry_queue.record_success('meta', item['url'])
+    for item in round_items:
+        sync_fight_round_stats(item['payload'])
+    retry_queue.save_queue()
+
 def sync_judge_scores():
     print("⚖️  Phase 6: Syncing Judge Scores (mmadecisions.com)...")
     scraper = Path(__file__).parent / "scrape_mmadecisions.py"
@@ -617,11 +710,50 @@ def sync_judge_scores():
     else:
         print("   ✅ Judge scores sync complete.")
 
+def sync_judge_links():
+    # Runs even after a failed scrape — whatever rows were inserted still need linking
+    print("🔗 Phase 6b: Linking judge scorecards to fights (fight_judge_links)...")
+    try:
+        judge_links.sync_judge_links(supabase_db)
+    except Exception as e:
+        print(f"   ⚠️  Judge link sync skipped: {e}")
+        return
+    # Server-side ML training set (build_ml_dataset.py streams it)
+    try:
+        supabase_db.rpc("refresh_ml_dataset_rows").execute()
+        print("   ✅ ml_dataset_rows refreshed.")
+    except Exception as e:
+        print(f"   ⚠️  ml_dataset_rows refresh skipped: {e}")
+
+def refresh_scoring_model(enabled=False):
+    # New scorecards are in ml_dataset_rows now: extend the dataset, warm-start the model,
+    # then re-score (score_rounds.py rescores everything when the model version changed).
+    # Opt-in: a published update rewrites git-tracked files (scoring_model.json,
+    # scoring_model/model_registry/, public/models/scoring/) that should be reviewed and committed.
+    if not enabled:
+        print("📈 Phase 6c: Scoring model refresh skipped (run with --refresh-model to update it)")
+        return
+    print("📈 Phase 6c: Refreshing the scoring model (incremental dataset + warm-start update)...")
+    scripts = Path(__file__).parent / "scoring_model"
+    for args in (["build_ml_dataset.py", "--incremental"], ["train_scoring_model.py", "--incremental"]):
+        result = subprocess.run([sys.executable, str(scripts / args[0]), *args[1:]], cwd=scripts, text=True)
+        if result.returncode != 0:
+            print(f"   ⚠️  {args[0]} exited with code {result.returncode} — model refresh skipped")
+            return
+    score_new_rounds()
+
 
 # --- 6. EXECUTION ---
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Daily UFC data update.")
+    arg_parser.add_argument("--refresh-model", action="store_true",
+                            help="Phase 6c: warm-start update of the scoring model (rewrites tracked model files)")
+    args = arg_parser.parse_args()
     start_time = time.time()
-    
+
+    # 0. Failed work items from earlier runs, before any discovery
+    retry_failed_work()
+
     # 1. Upcoming First
     sync_upcoming_events()
     sync_upcoming_fights()
@@ -631,8 +763,13 @@ if __name__ == "__main__":
     sync_fights()
     sync_meta()
     sync_round_stats()
+    score_new_rounds()
+    retry_queue.save_queue()   # before Phase 6 — the judge scraper writes the same queue file
     sync_judge_scores()
+    sync_judge_links()
+    refresh_scoring_model(args.refresh_model)
     sync_event_times()
+    sync_fighter_identity()
     
     duration = round(time.time() - start_time, 2)
     print("\n" + "="*30)
@@ -642,5 +779,7 @@ if __name__ == "__main__":
     print(f"🔄  Updated Fights: {stats_summary['updated_fights']}")
     print(f"📝  Meta Added:     {stats_summary['new_metadata']}")
     print(f"🔢  Round Rows:     {stats_summary['new_round_rows']}")
+    retry_queue.load_queue()
+    print(f"♻️  Retry Queue:    {retry_queue.summarize()}")
     print("="*30)
     print("🏁 Master Sync Complete.")
\ No newline at end of file
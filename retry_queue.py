@@ -0,0 +1,129 @@
+"""
+retry_queue.py — Dead-letter queue for failed scrape work items.
+
+Shared by scrape_mmadecisions.py and the master data update script. Every work item that
+fails (page fetch, judge_scores upsert, Phase 3 metadata, Phase 4 round stats) is recorded
+here with its phase, URL, error class and attempt count, and retried at the start of the
+next run — before any discovery work — instead of waiting for a full rescan to stumble
+on it again.
+
+Backoff: an item becomes due RETRY_BASE_MINUTES after its first failure, doubling per
+attempt up to RETRY_MAX_HOURS. After MAX_ATTEMPTS failures it is parked as dead (kept in
+the file, no longer retried automatically) until cleared with --clear-dead.
+
+Storage is a local JSON file (git-ignored), written via temp file + rename.
+
+Usage:
+  python retry_queue.py               # List queued + dead items
+  python retry_queue.py --clear-dead  # Drop dead items so discovery can pick them up again
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+QUEUE_PATH = Path(__file__).parent / 'scrape_retry_queue.json'
+MAX_ATTEMPTS = 6
+RETRY_BASE_MINUTES = 30   # 30m, 1h, 2h, 4h, ... between attempts
+RETRY_MAX_HOURS = 24
+
+_queue = {}
+_queue_lock = threading.Lock()
+
+
+def _key(phase, url):
+    return f"{phase} {url}"
+
+def load_queue():
+    global _queue
+    try:
+        with open(QUEUE_PATH, encoding='utf-8') as f:
+            _queue = json.load(f)
+    except FileNotFoundError:
+        _queue = {}
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Could not read retry queue, starting empty: {e!r}")
+        _queue = {}
+    return _queue
+
+def save_queue():
+    tmp_path = QUEUE_PATH.with_suffix('.json.tmp')
+    with _queue_lock:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_queue, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, QUEUE_PATH)
+
+def record_failure(phase, url, error, payload=None):
+    """Record a failed attempt. `error` is the exception (its class name is stored) or a short reason."""
+    now = datetime.now()
+    if isinstance(error, BaseException):
+        error_class, message = type(error).__name__, str(error)[:300]
+    else:
+        error_class, message = str(error), ''
+    with _queue_lock:
+        entry = _queue.get(_key(phase, url)) or {
+            'phase': phase,
+            'url': url,
+            'payload': payload or {},
+            'attempts': 0,
+            'first_failed': now.isoformat(timespec='seconds'),
+        }
+        entry['attempts'] += 1
+        entry['error'] = error_class
+        entry['message'] = message
+        entry['last_failed'] = now.isoformat(timespec='seconds')
+        if payload:
+            entry['payload'] = payload
+        delay = min(timedelta(minutes=RETRY_BASE_MINUTES * 2 ** (entry['attempts'] - 1)),
+                    timedelta(hours=RETRY_MAX_HOURS))
+        entry['next_retry'] = (now + delay).isoformat(timespec='seconds')
+        _queue[_key(phase, url)] = entry
+
+def record_success(phase, url):
+    with _queue_lock:
+        _queue.pop(_key(phase, url), None)
+
+def is_dead(entry):
+    return entry['attempts'] >= MAX_ATTEMPTS
+
+def due_items(phases):
+    """Live items for the given phase(s) whose backoff has elapsed, oldest failure first."""
+    if isinstance(phases, str):
+        phases = (phases,)
+    now = datetime.now().isoformat(timespec='seconds')
+    with _queue_lock:
+        items = [dict(e) for e in _queue.values()
+                 if e['phase'] in phases and not is_dead(e) and e['next_retry'] <= now]
+    return sorted(items, key=lambda e: e['first_failed'])
+
+def summarize(phases=None):
+    """One-line status for end-of-run summaries."""
+    entries = [e for e in _queue.values() if phases is None or e['phase'] in phases]
+    dead = sum(1 for e in entries if is_dead(e))
+    return f"{len(entries) - dead:,} queued for retry, {dead:,} dead ({QUEUE_PATH.name})"
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    parser = argparse.ArgumentParser(description="Inspect the scrape dead-letter queue")
+    parser.add_argument("--clear-dead", action="store_true",
+                        help="Remove items that exhausted MAX_ATTEMPTS")
+    args = parser.parse_args()
+
+    load_queue()
+    if args.clear_dead:
+        dead_keys = [k for k, e in _queue.items() if is_dead(e)]
+        for k in dead_keys:
+            del _queue[k]
+        save_queue()
+        print(f"[OK] Removed {len(dead_keys):,} dead items.")
+
+    for e in sorted(_queue.values(), key=lambda e: (e['phase'], e['first_failed'])):
+        state = 'DEAD' if is_dead(e) else f"next {e['next_retry']}"
+        print(f"  {e['phase']:<14} x{e['attempts']}  {e['error']:<22} {state:<25} {e['url']}")
+    print(summarize())
@@ -2,7 +2,8 @@
 analyze_10_8_thresholds.py
 
 Analyzes what separates real 10-8 rounds from 10-9 rounds using:
-  - ml_dataset.csv  (already has is_10_8 flag per judge-round)
+  - ml_dataset.csv  (already has is_10_8 flag per judge-round; features + metadata come
+                     memory-mapped from the feature cache, feature_cache.py)
   - scoring_model.json  (LR model for confidence scoring)
 
 Output:
@@ -10,20 +11,37 @@ Output:
   - ML confidence distribution for 10-8 vs 10-9 rounds
   - Precision/recall table at various confidence thresholds
   - Suggested combined rule
+  - F1-optimal cut-off (exact + 0.001 fine grid) for confidence alone and KD >= k rules,
+    next to the app's current cut-off — from one sorted sweep with cumulative counts
 
 Usage:
   python analyze_10_8_thresholds.py
+  python analyze_10_8_thresholds.py --curve curve.csv   # full fine-grid P/R/F1 curve
 """
 
 import sys
 import csv
 import json
-import math
+import time
+import argparse
 from pathlib import Path
-from collections import defaultdict, Counter
 
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
+try:
+    import numpy as np
+except ImportError:
+    print("[ERROR] numpy is required.")
+    print("  Install: pip install numpy")
+    sys.exit(1)
+
+from features import FEATURE_NAMES, lr_probability
+from feature_cache import load_features
+
+parser = argparse.ArgumentParser(description='10-8 vs 10-9 threshold analysis.')
+parser.add_argument('--curve', help='Write the fine-grid precision/recall/F1 curve (CSV)')
+args = parser.parse_args()
+
 SCRIPT_DIR = Path(__file__).parent
 CSV_PATH   = SCRIPT_DIR / 'ml_dataset.csv'
 MODEL_PATH = SCRIPT_DIR / 'scoring_model.json'
@@ -35,89 +53,38 @@ MODEL_PATH = SCRIPT_DIR / 'scoring_model.json'
 with open(MODEL_PATH) as f:
     model = json.load(f)
 
-COEFFICIENTS = model['coefficients']
-INTERCEPT    = model['intercept']
-SCALER_MEAN  = model['scaler_mean']
-SCALER_STD   = model['scaler_std']
-
-def sigmoid(x):
-    return 1 / (1 + math.exp(-x))
-
-def compute_confidence(row):
-    def g(col):
-        v = row.get(col) or '0'
-        try:    return float(v)
-        except: return 0.0
-
-    f1_kd    = g('f1_kd');           f2_kd    = g('f2_kd')
-    f1_sig   = g('f1_sig_landed');   f2_sig   = g('f2_sig_landed')
-    f1_spct  = g('f1_sig_pct');      f2_spct  = g('f2_sig_pct')
-    f1_head  = g('f1_head_landed');  f2_head  = g('f2_head_landed')
-    f1_body  = g('f1_body_landed');  f2_body  = g('f2_body_landed')
-    f1_leg   = g('f1_leg_landed');   f2_leg   = g('f2_leg_landed')
-    f1_dist  = g('f1_dist_landed');  f2_dist  = g('f2_dist_landed')
-    f1_cli   = g('f1_clinch_landed');f2_cli   = g('f2_clinch_landed')
-    f1_gnd   = g('f1_ground_landed');f2_gnd   = g('f2_ground_landed')
-    f1_td    = g('f1_td_landed');    f2_td    = g('f2_td_landed')
-    f1_tpct  = g('f1_td_pct');       f2_tpct  = g('f2_td_pct')
-    f1_ctrl  = g('f1_ctrl_sec');     f2_ctrl  = g('f2_ctrl_sec')
-    f1_sub   = g('f1_sub_attempts'); f2_sub   = g('f2_sub_attempts')
-
-    post_2016 = 1.0 if (row.get('event_date') or '') >= '2016-01-01' else 0.0
-
-    def ratio(a, b): return a / (a + b + 1)
-
-    features = [
-        f1_kd   - f2_kd,
-        f1_sig  - f2_sig,
-        f1_spct - f2_spct,
-        f1_head - f2_head,
-        f1_body - f2_body,
-        f1_leg  - f2_leg,
-        f1_dist - f2_dist,
-        f1_cli  - f2_cli,
-        f1_gnd  - f2_gnd,
-        f1_td   - f2_td,
-        f1_tpct - f2_tpct,
-        f1_ctrl - f2_ctrl,
-        f1_sub  - f2_sub,
-        ratio(f1_sig,  f2_sig),
-        ratio(f1_head, f2_head),
-        ratio(f1_td,   f2_td),
-        ratio(f1_ctrl, f2_ctrl),
-        ratio(f1_gnd,  f2_gnd),
-        post_2016,
-    ]
-
-    scaled = [(features[i] - SCALER_MEAN[i]) / SCALER_STD[i] for i in range(len(features))]
-    logit  = sum(COEFFICIENTS[i] * scaled[i] for i in range(len(scaled))) + INTERCEPT
-    p      = sigmoid(logit)
-    return p, max(p, 1 - p)   # (p_f1_wins, confidence)
-
-# ---------------------------------------------------------------------------
-# Load CSV — deduplicate by (fight_url, round)
+# Cached feature columns are in features.FEATURE_NAMES order
+if model['features'] != FEATURE_NAMES:
+    print("[ERROR] scoring_model.json features differ from features.FEATURE_NAMES — retrain first")
+    sys.exit(1)
+
+# ---------------------------------------------------------------------------
+# Load dataset — deduplicate by (fight_url, round)
 # A round is 10-8 if ANY judge scored it 10-8
 # ---------------------------------------------------------------------------
 
 print("[..] Loading ml_dataset.csv ...")
 
-rounds = {}  # (fight_url, round) -> dict
+fc = load_features(CSV_PATH)
+winner_labels = fc['judge_winner'].labels.tolist()
+
+rounds = {}  # (fight_url code, round) -> dict
 
-with open(CSV_PATH, newline='', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        key          = (row['fight_url'], row['round'])
-        is_10_8_row  = row.get('is_10_8', '0') == '1'
-        judge_winner = row.get('judge_winner', '')
+for i, (url, rnum, is_10_8, winner) in enumerate(zip(fc['fight_url'].codes.tolist(),
+                                                       fc['round'].tolist(),
+                                                       fc['is_10_8'].tolist(),
+                                                       fc['judge_winner'].codes.tolist())):
+    key         = (url, rnum)
+    is_10_8_row = is_10_8 == 1
 
-        if key not in rounds:
-            rounds[key] = {
-                'row':          row,
-                'is_10_8':      False,
-                'judge_winner': judge_winner,
-            }
-        if is_10_8_row:
-            rounds[key]['is_10_8'] = True
+    if key not in rounds:
+        rounds[key] = {
+            'row':          i,
+            'is_10_8':      False,
+            'judge_winner': winner_labels[winner],
+        }
+    if is_10_8_row:
+        rounds[key]['is_10_8'] = True
 
 print(f"[OK] {len(rounds):,} unique fight-rounds")
 
@@ -125,33 +92,23 @@ print(f"[OK] {len(rounds):,} unique fight-rounds")
 # Compute KD differential + ML confidence for each round
 # ---------------------------------------------------------------------------
 
-records_10_8 = []
-records_10_9 = []
-
-for key, info in rounds.items():
-    row          = info['row']
-    judge_winner = info['judge_winner']
+# First judge row of every non-draw round
+decided = [info for info in rounds.values() if info['judge_winner'] in ('f1', 'f2')]
+rows    = np.array([info['row'] for info in decided], dtype=np.int64)
+f1_won  = np.array([info['judge_winner'] == 'f1' for info in decided], dtype=bool)
 
-    if judge_winner not in ('f1', 'f2'):
-        continue  # skip draws
+X          = fc['X'][rows]
+p_f1       = lr_probability(X, model)
+confidence = np.maximum(p_f1, 1 - p_f1)
 
-    p_f1, confidence = compute_confidence(row)
+# KD differential from the judge winner's perspective (f2 - f1 == -(f1 - f2) exactly)
+kd      = X[:, FEATURE_NAMES.index('kd_diff')]
+kd_diff = np.where(f1_won, kd, -kd).astype(np.int64)
 
-    f1_kd = float(row.get('f1_kd') or 0)
-    f2_kd = float(row.get('f2_kd') or 0)
+is_88   = np.array([info['is_10_8'] for info in decided], dtype=bool)
 
-    # KD differential from the judge winner's perspective
-    kd_diff = (f1_kd - f2_kd) if judge_winner == 'f1' else (f2_kd - f1_kd)
-
-    rec = {'kd_diff': int(kd_diff), 'confidence': confidence}
-
-    if info['is_10_8']:
-        records_10_8.append(rec)
-    else:
-        records_10_9.append(rec)
-
-n_88 = len(records_10_8)
-n_99 = len(records_10_9)
+n_88 = int(np.count_nonzero(is_88))
+n_99 = len(decided) - n_88
 
 print(f"  10-8 rounds : {n_88:,}")
 print(f"  10-9 rounds : {n_99:,}")
@@ -161,74 +118,131 @@ print()
 # KD differential distribution
 # ---------------------------------------------------------------------------
 
-def kd_distribution(records, label):
-    counts = Counter(r['kd_diff'] for r in records)
-    total  = len(records)
+def kd_distribution(kd_vals, label):
+    values, counts = np.unique(kd_vals, return_counts=True)
+    total  = len(kd_vals)
     print(f"  KD differential (winner KDs - loser KDs) — {label}  n={total:,}")
     print(f"  {'KD diff':>8}  {'Count':>7}  {'%':>6}")
     print(f"  {'--------':>8}  {'-------':>7}  {'------':>6}")
-    for kd in sorted(counts):
-        pct = counts[kd] / total * 100
-        print(f"  {kd:>8}  {counts[kd]:>7}  {pct:>5.1f}%")
+    for kd, count in zip(values.tolist(), counts.tolist()):
+        pct = count / total * 100
+        print(f"  {kd:>8}  {count:>7}  {pct:>5.1f}%")
     print()
 
-kd_distribution(records_10_8, '10-8 rounds')
-kd_distribution(records_10_9, '10-9 rounds')
+kd_distribution(kd_diff[is_88], '10-8 rounds')
+kd_distribution(kd_diff[~is_88], '10-9 rounds')
 
 # ---------------------------------------------------------------------------
 # ML confidence distribution (buckets of 0.05)
 # ---------------------------------------------------------------------------
 
-def conf_distribution(records, label):
-    buckets = defaultdict(int)
-    total   = len(records)
-    for r in records:
-        b = round(r['confidence'] * 20) / 20   # nearest 0.05
-        buckets[b] += 1
+def conf_distribution(conf_vals, label):
+    buckets, counts = np.unique(np.round(conf_vals * 20) / 20, return_counts=True)   # nearest 0.05
+    total   = len(conf_vals)
     print(f"  ML confidence distribution — {label}  n={total:,}")
     print(f"  {'Confidence':>10}  {'Count':>7}  {'%':>6}")
     print(f"  {'----------':>10}  {'-------':>7}  {'------':>6}")
-    for b in sorted(buckets):
-        pct = buckets[b] / total * 100
+    for b, count in zip(buckets.tolist(), counts.tolist()):
+        pct = count / total * 100
         bar = '#' * int(pct / 2)
-        print(f"  {b:>10.2f}  {buckets[b]:>7}  {pct:>5.1f}%  {bar}")
+        print(f"  {b:>10.2f}  {count:>7}  {pct:>5.1f}%  {bar}")
     print()
 
-conf_distribution(records_10_8, '10-8 rounds')
-conf_distribution(records_10_9, '10-9 rounds')
+conf_distribution(confidence[is_88], '10-8 rounds')
+conf_distribution(confidence[~is_88], '10-9 rounds')
 
 # ---------------------------------------------------------------------------
 # Confidence percentiles
 # ---------------------------------------------------------------------------
 
-def percentile_summary(records, label):
-    vals = sorted(r['confidence'] for r in records)
+def percentile_summary(conf_vals, label):
+    vals = np.sort(conf_vals)
     n    = len(vals)
     def p(pct): return vals[int(pct / 100 * n)]
     print(f"  Confidence percentiles — {label}")
     print(f"  p25={p(25):.3f}  p50={p(50):.3f}  p75={p(75):.3f}  p90={p(90):.3f}  p95={p(95):.3f}")
     print()
 
-percentile_summary(records_10_8, '10-8 rounds')
-percentile_summary(records_10_9, '10-9 rounds')
+percentile_summary(confidence[is_88], '10-8 rounds')
+percentile_summary(confidence[~is_88], '10-9 rounds')
+
+# ---------------------------------------------------------------------------
+# Threshold sweep — one sort, cumulative counts
+#
+# Rounds are sorted by confidence once. Suffix sums over that order give, for every
+# position, how many rounds sit at or above it (predicted 10-8) and how many of those are
+# real 10-8s (TP) — one row per KD rule (row 0: confidence only, then KD >= k). Any
+# (KD rule, confidence threshold) cell is then a searchsorted lookup, so the full
+# precision / recall / F1 curve on every distinct confidence, the fine grid and the
+# KD x confidence grid all come from the same arrays.
+# ---------------------------------------------------------------------------
+
+CURRENT_THRESHOLD = 0.99                     # src/components/FightDetailView.js: is10_8
+KD_LEVELS  = [1, 2, 3]                       # combined-rule rows: winner KD diff >= k
+FINE_GRID  = np.arange(500, 1000) / 1000     # 0.500, 0.501, ... 0.999
+
+def build_sweep(conf, is_pos, kd, kd_levels):
+    order = np.argsort(conf, kind='stable')
+    rules = np.vstack([np.ones(len(order), dtype=bool)] + [kd[order] >= k for k in kd_levels])
+
+    def suffix_sums(flags):   # [:, i] = count over sorted positions i..n-1; [:, n] = 0
+        out = np.zeros((flags.shape[0], flags.shape[1] + 1), dtype=np.int64)
+        out[:, :-1] = np.cumsum(flags[:, ::-1], axis=1)[:, ::-1]
+        return out
+
+    return {'conf': conf[order], 'kd_levels': [None] + list(kd_levels),
+            'predicted': suffix_sums(rules), 'tp': suffix_sums(rules & is_pos[order])}
+
+def sweep_at(sweep, thresholds, rule=0):
+    """(predicted, TP) arrays for 'confidence >= t' (and the rule's KD condition)."""
+    idx = np.searchsorted(sweep['conf'], thresholds, side='left')
+    return sweep['predicted'][rule, idx], sweep['tp'][rule, idx]
+
+def pr_curve(predicted, tp, total_pos):
+    """(precision, recall, F1) arrays; 0 where undefined."""
+    precision = np.divide(tp, predicted, out=np.zeros(len(tp)), where=predicted > 0)
+    recall    = tp / total_pos if total_pos else np.zeros(len(tp))
+    denom     = precision + recall
+    f1        = np.divide(2 * precision * recall, denom, out=np.zeros(len(tp)), where=denom > 0)
+    return precision, recall, f1
+
+t0 = time.perf_counter()
+sweep = build_sweep(confidence, is_88, kd_diff, KD_LEVELS)
+
+# Exact optimum: every distinct confidence is a candidate threshold
+candidates = np.unique(sweep['conf'])
+best_exact = {}
+for rule, kd_level in enumerate(sweep['kd_levels']):
+    pred, tp = sweep_at(sweep, candidates, rule)
+    precision, recall, f1 = pr_curve(pred, tp, n_88)
+    j = len(f1) - 1 - int(np.argmax(f1[::-1])) if len(f1) else None   # ties: highest cut-off
+    if j is not None:
+        best_exact[kd_level] = (float(candidates[j]), int(pred[j]), int(tp[j]),
+                                precision[j], recall[j], f1[j])
+
+# Fine grid, every KD rule
+fine = {}
+for rule, kd_level in enumerate(sweep['kd_levels']):
+    pred, tp = sweep_at(sweep, FINE_GRID, rule)
+    fine[kd_level] = (pred, tp) + pr_curve(pred, tp, n_88)
+sweep_ms = (time.perf_counter() - t0) * 1000
 
 # ---------------------------------------------------------------------------
 # Precision / recall at various confidence thresholds (confidence-only rule)
 # ---------------------------------------------------------------------------
 
-all_records = [(r, True) for r in records_10_8] + [(r, False) for r in records_10_9]
 total_pos   = n_88
 
 print("  Confidence-only threshold analysis")
 print(f"  {'Threshold':>10}  {'Predicted':>9}  {'TP':>6}  {'Precision':>9}  {'Recall':>7}")
 print(f"  {'----------':>10}  {'---------':>9}  {'------':>6}  {'---------':>9}  {'-------':>7}")
 
-for thresh in [0.60, 0.65, 0.70, 0.75, 0.80, 0.85, 0.90, 0.95]:
-    predicted  = [r for r, is_8 in all_records if r['confidence'] >= thresh]
-    true_pos   = sum(1 for r, is_8 in all_records if r['confidence'] >= thresh and is_8)
-    precision  = true_pos / len(predicted) * 100 if predicted else 0
+coarse = [0.60, 0.65, 0.70, 0.75, 0.80, 0.85, 0.90, 0.95]
+pred, tp = sweep_at(sweep, np.array(coarse))
+for thresh, n_pred, true_pos in zip(coarse, pred.tolist(), tp.tolist()):
+    precision  = true_pos / n_pred * 100 if n_pred else 0
     recall     = true_pos / total_pos * 100 if total_pos else 0
-    print(f"  {thresh:>10.2f}  {len(predicted):>9,}  {true_pos:>6,}  {precision:>8.1f}%  {recall:>6.1f}%")
+    print(f"  {thresh:>10.2f}  {n_pred:>9,}  {true_pos:>6,}  {precision:>8.1f}%  {recall:>6.1f}%")
 
 print()
 
@@ -240,14 +254,57 @@ print("  Combined rule analysis  (winner KD diff >= threshold AND confidence >=
 print(f"  {'KD>=':>5}  {'Conf>=':>7}  {'Predicted':>9}  {'TP':>6}  {'Precision':>9}  {'Recall':>7}")
 print(f"  {'-----':>5}  {'-------':>7}  {'---------':>9}  {'------':>6}  {'---------':>9}  {'-------':>7}")
 
+grid_conf = [0.65, 0.70, 0.75, 0.80, 0.85]
 for kd_thresh in [1, 2]:
-    for conf_thresh in [0.65, 0.70, 0.75, 0.80, 0.85]:
-        predicted = [
-            (r, is_8) for r, is_8 in all_records
-            if r['kd_diff'] >= kd_thresh and r['confidence'] >= conf_thresh
-        ]
-        true_pos  = sum(1 for r, is_8 in predicted if is_8)
-        precision = true_pos / len(predicted) * 100 if predicted else 0
+    pred, tp = sweep_at(sweep, np.array(grid_conf), sweep['kd_levels'].index(kd_thresh))
+    for conf_thresh, n_pred, true_pos in zip(grid_conf, pred.tolist(), tp.tolist()):
+        precision = true_pos / n_pred * 100 if n_pred else 0
         recall    = true_pos / total_pos * 100 if total_pos else 0
-        print(f"  {kd_thresh:>5}  {conf_thresh:>7.2f}  {len(predicted):>9,}  {true_pos:>6,}  {precision:>8.1f}%  {recall:>6.1f}%")
+        print(f"  {kd_thresh:>5}  {conf_thresh:>7.2f}  {n_pred:>9,}  {true_pos:>6,}  {precision:>8.1f}%  {recall:>6.1f}%")
     print()
+
+# ---------------------------------------------------------------------------
+# Optimal cut-off (max F1)
+# ---------------------------------------------------------------------------
+
+print(f"  Optimal threshold by F1  (exact: {len(candidates):,} distinct confidences; "
+      f"fine grid: {FINE_GRID[0]:.3f}-{FINE_GRID[-1]:.3f} step 0.001)")
+print(f"  {'Rule':<22}  {'Conf>=':>8}  {'Predicted':>9}  {'TP':>6}  {'Precision':>9}  {'Recall':>7}  {'F1':>6}")
+print(f"  {'-'*22}  {'-'*8}  {'-'*9}  {'-'*6}  {'-'*9}  {'-'*7}  {'-'*6}")
+
+def rule_name(kd_level):
+    return 'confidence only' if kd_level is None else f'KD >= {kd_level} + confidence'
+
+def print_cut(name, thresh, n_pred, true_pos, precision, recall, f1):
+    print(f"  {name:<22}  {thresh:>8.4f}  {n_pred:>9,}  {true_pos:>6,}  {precision*100:>8.1f}%  "
+          f"{recall*100:>6.1f}%  {f1:>6.3f}")
+
+for kd_level in sweep['kd_levels']:
+    if kd_level in best_exact:
+        print_cut(rule_name(kd_level), *best_exact[kd_level])
+
+print()
+print("  Fine grid, best 5 by F1 (confidence only)")
+pred, tp, precision, recall, f1 = fine[None]
+for j in np.lexsort((-FINE_GRID, -f1))[:5]:   # ties: highest cut-off first
+    print_cut('confidence only', FINE_GRID[j], int(pred[j]), int(tp[j]), precision[j], recall[j], f1[j])
+
+pred, tp = sweep_at(sweep, np.array([CURRENT_THRESHOLD]))
+precision, recall, f1 = pr_curve(pred, tp, n_88)
+print()
+print_cut('current (app)', CURRENT_THRESHOLD, int(pred[0]), int(tp[0]), precision[0], recall[0], f1[0])
+print()
+print(f"[OK] Sweep: {len(confidence):,} rounds, {len(candidates) + len(FINE_GRID):,} thresholds x "
+      f"{len(sweep['kd_levels'])} rules in {sweep_ms:.1f} ms")
+
+# Full fine-grid curve for every rule
+if args.curve:
+    with open(args.curve, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['kd_min', 'threshold', 'predicted', 'tp', 'precision', 'recall', 'f1'])
+        for kd_level, (pred, tp, precision, recall, f1) in fine.items():
+            for row in zip(FINE_GRID.tolist(), pred.tolist(), tp.tolist(),
+                           precision.tolist(), recall.tolist(), f1.tolist()):
+                writer.writerow(['' if kd_level is None else kd_level] + [
+                    f'{v:.6f}' if isinstance(v, float) else v for v in row])
+    print(f"[OK] Curve → {args.curve}")
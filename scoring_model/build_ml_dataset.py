@@ -4,10 +4,28 @@ build_ml_dataset.py — Phase 3c, Step 1
 Cross-source data extraction for the UFC round-scoring ML model.
 
 Problem: round_fight_stats uses UFCStats event/fighter names; judge_scores uses
-mmadecisions event/fighter names. These NEVER match directly. This script bridges
-the two sources via:
-  1. Date-based event join (judge_scores.date ±1 day → ufc_events.event_date)
-  2. Fuzzy fighter name matching (5-strategy, mirrors FightDetailView.js matchesFighter)
+mmadecisions event/fighter names. These NEVER match directly. fight_judge_links
+(judge_links.py, synced after Phase 6) bridges them: each judge_scores (date, bout) group →
+fight_url + the mmadecisions spelling of fighter1/fighter2.
+
+Default: the join runs in the database — the ml_dataset_rows materialized view
+(supabase/migrate_ml_dataset_rows.py) emits the final (fight, round, judge) rows and this
+script streams them page by page (keyset on row_key) straight into the CSV, adding the
+derived label / baseline columns. --refresh refreshes the view first (the master pipeline
+refreshes it after Phase 6b).
+
+--incremental: only fights touched since the last build — judge_scores.created_at,
+round_fight_stats.inserted_at and fight_judge_links.created_at watermarks (kept in
+ml_dataset_state.json) → changed fight_urls; their rows in the existing CSV are replaced
+with fresh ml_dataset_rows rows and everything else is kept. Falls back to a full build
+when there is no state for the output file.
+
+Every build also converts the CSV into its typed columnar store (ml_dataset.cols/, see
+dataset_store.py) — the analysis scripts memory-map that instead of re-parsing the CSV.
+
+--client-join: the previous path — pull all four source tables and join in Python.
+--rematch (implies --client-join) also re-derives the links in-process (date ±1 day event
+join + the 5 matchesFighter strategies) for a tree whose link table is not synced.
 
 Output:
   ml_dataset.csv — one row per (fight, round, judge) with:
@@ -16,18 +34,23 @@ Output:
     - 10-8 flag
     - Rules-based model prediction for baseline comparison
     - Metadata: fight_url, event_date, weight_class, judge
+  ml_dataset.cols/ — the same columns as typed .npy arrays + schema.json
 
 Usage:
   python build_ml_dataset.py
   python build_ml_dataset.py --out path/to/output.csv
-  python build_ml_dataset.py --verbose   # print sample failed name matches
+  python build_ml_dataset.py --refresh       # refresh ml_dataset_rows before streaming
+  python build_ml_dataset.py --incremental   # replace only fights changed since the last build
+  python build_ml_dataset.py --client-join   # join the source tables in Python
+  python build_ml_dataset.py --client-join --verbose   # + print sample unlinked judge groups
+  python build_ml_dataset.py --rematch       # client join, matching fights in-process
 """
 
 import sys
 import os
 import csv
-import re
-import unicodedata
+import json
+import time
 import argparse
 from collections import defaultdict
 from pathlib import Path
@@ -40,6 +63,12 @@ load_dotenv(ROOT / '.env')
 
 from supabase import create_client
 
+sys.path.insert(0, str(ROOT))
+from fighter_identity import build_fight_index
+from judge_links import link_group
+from bulk_reader import read_tables, stream_table, fetch_rows
+from dataset_store import write_columns, store_path
+
 SUPABASE_URL = os.environ.get('REACT_APP_SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')
 
@@ -114,91 +143,45 @@ def rules_winner(f1_stats, f2_stats):
     return 'draw'
 
 # ---------------------------------------------------------------------------
-# Name matching — exact port of FightDetailView.js matchesFighter (5 strategies)
+# Data fetching — bulk_reader (repo root): keyset pages, tables + key ranges read concurrently
 # ---------------------------------------------------------------------------
 
-def norm_name(name):
-    # NFKD decomposition converts accented chars to base + combining mark,
-    # then the regex strips the combining marks — so ñ→n, ä→a, ã→a, ō→o, etc.
-    s = unicodedata.normalize('NFKD', (name or '').lower())
-    s = re.sub(r'[^a-z0-9\s]', '', s)
-    return re.sub(r'\s+', ' ', s).strip()
-
-def matches_fighter(a, b):
-    na, nb = norm_name(a), norm_name(b)
-    if not na or not nb:
-        return False
-    # 1. Exact
-    if na == nb:
-        return True
-    # 2. Space-collapse ("Rong Zhu" vs "Rongzhu")
-    ac, bc = na.replace(' ', ''), nb.replace(' ', '')
-    if ac == bc:
-        return True
-    # 3. Character-sort anagram, len >= 5 ("Zha Yi" vs "Yizha")
-    if len(ac) >= 5 and len(ac) == len(bc) and sorted(ac) == sorted(bc):
-        return True
-    # 4. Same last name, length > 3
-    aw, bw = na.split(), nb.split()
-    if aw[-1] == bw[-1] and len(aw[-1]) > 3:
-        return True
-    # 5. All words of shorter name appear in longer (handles Jr., middle names)
-    shorter, longer = (aw, bw) if len(aw) <= len(bw) else (bw, aw)
-    return all(w in longer for w in shorter if len(w) > 1)
-
-# ---------------------------------------------------------------------------
-# Data fetching with pagination
-# ---------------------------------------------------------------------------
+def stream_extract_rows():
+    """Yield ml_dataset_rows in row_key order (a hash of the natural key — stable across
+    refreshes, not chronological); key ranges prefetch concurrently."""
+    yield from stream_table('ml_dataset_rows', '*', ordered=True)
+
+def load_all_data(rematch=False):
+    specs = {
+        'ufc_events':         ('ufc_events', 'event_name, event_date'),
+        'fight_meta_details': ('fight_meta_details',
+                               'fight_url, event_name, fighter1_name, fighter2_name, weight_class'),
+        'round_fight_stats':  ('round_fight_stats',
+                               'event_name, fighter_name, round, ' + ', '.join(STAT_MAP.keys())),
+        'judge_scores':       ('judge_scores', 'date, bout, fighter, judge, round, score'),
+    }
+    if not rematch:
+        specs['fight_judge_links'] = ('fight_judge_links',
+                                      'js_bout, js_date, fight_url, f1_js_name, f2_js_name')
+    print(f"[..] Fetching {', '.join(specs)} (concurrent keyset reads) ...")
+    tables = read_tables(specs)
+    for name, rows in tables.items():
+        print(f"      {name:<20} {len(rows):>9,} rows")
 
-def fetch_all(table, columns):
-    rows, page_size, offset = [], 1000, 0
-    while True:
-        res = supabase.from_(table).select(columns).range(offset, offset + page_size - 1).execute()
-        batch = res.data or []
-        rows.extend(batch)
-        if len(batch) < page_size:
-            break
-        offset += page_size
-    return rows
-
-def load_all_data():
-    print("[1/4] Fetching ufc_events ...")
-    events = fetch_all('ufc_events', 'event_name, event_date')
-    print(f"      {len(events):,} rows")
-
-    print("[2/4] Fetching fight_meta_details ...")
-    meta = fetch_all('fight_meta_details', 'fight_url, event_name, fighter1_name, fighter2_name, weight_class')
-    print(f"      {len(meta):,} rows")
-
-    print("[3/4] Fetching round_fight_stats ...")
-    stat_cols_str = 'event_name, fighter_name, round, ' + ', '.join(STAT_MAP.keys())
-    stats = fetch_all('round_fight_stats', stat_cols_str)
-    print(f"      {len(stats):,} rows")
-
-    print("[4/4] Fetching judge_scores ...")
-    scores = fetch_all('judge_scores', 'date, bout, fighter, judge, round, score')
-    print(f"      {len(scores):,} rows")
-
-    return events, meta, stats, scores
+    return (tables['ufc_events'], tables['fight_meta_details'], tables['round_fight_stats'],
+            tables['judge_scores'], tables.get('fight_judge_links'))
 
 # ---------------------------------------------------------------------------
 # Index building
 # ---------------------------------------------------------------------------
 
 def build_indexes(events, meta, stats, scores):
-    # date string -> list of UFCStats event_name (±1 day lookups)
-    events_by_date = defaultdict(list)
     event_date_map = {}  # event_name -> event_date string (for CSV output)
     for e in events:
-        d = e.get('event_date')
-        if d:
-            events_by_date[d].append(e['event_name'])
-            event_date_map[e['event_name']] = d
+        if e.get('event_date'):
+            event_date_map[e['event_name']] = e['event_date']
 
-    # UFCStats event_name -> list of fight_meta_details rows
-    meta_by_event = defaultdict(list)
-    for m in meta:
-        meta_by_event[m['event_name']].append(m)
+    meta_by_url = {m['fight_url']: m for m in meta}
 
     # (event_name, fighter_name, round_num) -> stats row
     stats_index = {}
@@ -206,34 +189,39 @@ def build_indexes(events, meta, stats, scores):
         key = (s['event_name'], s['fighter_name'], s['round'])
         stats_index[key] = s
 
-    # (mmadecisions date_str, bout_str) -> list of judge_score rows
+    # (mmadecisions bout_str, date_str) -> list of judge_score rows (fight_judge_links key)
     judge_groups = defaultdict(list)
     for js in scores:
-        judge_groups[(js['date'], js['bout'])].append(js)
+        judge_groups[(js['bout'], str(js['date']))].append(js)
 
-    return events_by_date, meta_by_event, stats_index, judge_groups, event_date_map
+    return meta_by_url, stats_index, judge_groups, event_date_map
 
 # ---------------------------------------------------------------------------
-# Fight matching
+# Fight links — (bout, date) -> fight_url + f1/f2 mmadecisions spellings.
+# Read from fight_judge_links, or with --rematch re-derived here by judge_links.link_group
+# (fighter_identity.match_fight over the UFCStats events dated ±1 day).
 # ---------------------------------------------------------------------------
 
-def find_matching_fight(js_fighters, candidate_meta):
-    """
-    Match 2 mmadecisions fighter names to a fight_meta_details row.
-    Returns (meta_row, f1_js_name, f2_js_name) where:
-      f1_js_name is the mmadecisions name that maps to meta.fighter1_name
-      f2_js_name is the mmadecisions name that maps to meta.fighter2_name
-    """
-    if len(js_fighters) != 2:
-        return None, None, None
-    js_a, js_b = js_fighters[0], js_fighters[1]
-    for m in candidate_meta:
-        m1, m2 = m['fighter1_name'], m['fighter2_name']
-        if matches_fighter(js_a, m1) and matches_fighter(js_b, m2):
-            return m, js_a, js_b
-        if matches_fighter(js_a, m2) and matches_fighter(js_b, m1):
-            return m, js_b, js_a  # swap so f1_js -> m1, f2_js -> m2
-    return None, None, None
+def index_links(links):
+    return {(l['js_bout'], str(l['js_date'])): l for l in links}
+
+def rematch_links(events, meta, judge_groups):
+    events_by_date = defaultdict(list)
+    for e in events:
+        if e.get('event_date'):
+            events_by_date[e['event_date']].append(e['event_name'])
+    meta_by_event = defaultdict(list)
+    for m in meta:
+        meta_by_event[m['event_name']].append(m)
+    fight_index = {ev: build_fight_index(rows) for ev, rows in meta_by_event.items()}
+
+    link_index = {}
+    for (js_bout, js_date), group_rows in judge_groups.items():
+        link = link_group(js_bout, js_date, {r['fighter'] for r in group_rows},
+                          events_by_date, fight_index)
+        if link is not None:
+            link_index[(js_bout, js_date)] = link
+    return link_index
 
 # ---------------------------------------------------------------------------
 # CSV row builder
@@ -278,20 +266,246 @@ def build_row(meta_row, round_num, judge_name, f1_stats, f2_stats,
 
     return row
 
+def build_row_from_extract(r):
+    """CSV row from one ml_dataset_rows row (already joined server-side)."""
+    meta_row = {
+        'fight_url':     r['fight_url'],
+        'event_name':    r['event_name'],
+        'weight_class':  r['weight_class'],
+        'fighter1_name': r['f1_name'],
+        'fighter2_name': r['f2_name'],
+    }
+    f1_stats = {db_col: r[f'f1_{short}'] for db_col, short in STAT_MAP.items()}
+    f2_stats = {db_col: r[f'f2_{short}'] for db_col, short in STAT_MAP.items()}
+    return build_row(meta_row, r['round'], r['judge'], f1_stats, f2_stats,
+                     r['judge_f1_score'], r['judge_f2_score'], r['event_date'] or '')
+
+# ---------------------------------------------------------------------------
+# Incremental builds — watermarks + changed fights
+# ---------------------------------------------------------------------------
+
+STATE_PATH = Path(__file__).parent / 'ml_dataset_state.json'
+
+# state key -> (table, timestamp column) whose max marks how far a build has seen
+WATERMARKS = {
+    'judge_scores':      ('judge_scores', 'created_at'),
+    'round_fight_stats': ('round_fight_stats', 'inserted_at'),
+    'fight_judge_links': ('fight_judge_links', 'created_at'),
+}
+WATERMARK_OVERLAP_DAYS = 2   # rows inserted while the previous build ran are re-read
+
+def load_state():
+    try:
+        with open(STATE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Could not read {STATE_PATH.name}, doing a full build: {e!r}")
+        return {}
+
+def _write_state(state):
+    tmp_path = STATE_PATH.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+def save_state(out_path, watermarks, n_rows):
+    state = load_state()
+    state[str(Path(out_path).resolve())] = {'watermarks': watermarks, 'rows': n_rows}
+    _write_state(state)
+
+def clear_state(out_path):
+    """Forget the build recorded for out_path — the next --incremental run does a full build."""
+    state = load_state()
+    if state.pop(str(Path(out_path).resolve()), None) is not None:
+        _write_state(state)
+
+def current_watermarks():
+    """Max timestamp per WATERMARKS table, capped at the last ml_dataset_rows refresh —
+    rows newer than the refresh are not in the view yet, so the next build must re-read them."""
+    res = supabase.from_('ml_dataset_refresh').select('refreshed_at').execute()
+    refreshed_at = res.data[0]['refreshed_at'] if res.data else None
+    marks = {}
+    for name, (table, col) in WATERMARKS.items():
+        res = supabase.from_(table).select(col).order(col, desc=True).limit(1).execute()
+        mark = res.data[0][col] if res.data else None
+        marks[name] = min(mark, refreshed_at) if mark and refreshed_at else mark
+    return marks
+
+def _since(mark):
+    if not mark:
+        return None
+    return (date.fromisoformat(mark[:10]) - timedelta(days=WATERMARK_OVERLAP_DAYS)).isoformat()
+
+def _chunks(items, size=200):
+    items = sorted(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def changed_fight_urls(watermarks):
+    """fight_urls whose training rows may differ from the last build."""
+    urls = set()
+
+    # 1. Links created since the last build (new scorecards, or old ones matched by --full)
+    since = _since(watermarks.get('fight_judge_links'))
+    links = fetch_rows(supabase, 'fight_judge_links', 'fight_url',
+                       [('gte', 'created_at', since)] if since else [])
+    urls.update(l['fight_url'] for l in links)
+
+    # 2. New judge_scores rows on already-linked (bout, date) groups
+    since = _since(watermarks.get('judge_scores'))
+    groups = {(r['bout'], str(r['date'])) for r in
+              fetch_rows(supabase, 'judge_scores', 'bout, date',
+                         [('gte', 'created_at', since)] if since else [])}
+    for chunk in _chunks({b for b, _ in groups}):
+        for l in fetch_rows(supabase, 'fight_judge_links', 'js_bout, js_date, fight_url',
+                            [('in_', 'js_bout', chunk)]):
+            if (l['js_bout'], str(l['js_date'])) in groups:
+                urls.add(l['fight_url'])
+
+    # 3. New / re-scraped round stats → fights on the same card with that fighter
+    since = _since(watermarks.get('round_fight_stats'))
+    stat_keys = {(r['event_name'], r['fighter_name']) for r in
+                 fetch_rows(supabase, 'round_fight_stats', 'event_name, fighter_name',
+                            [('gte', 'inserted_at', since)] if since else [])}
+    for chunk in _chunks({ev for ev, _ in stat_keys}, 50):
+        for m in fetch_rows(supabase, 'fight_meta_details',
+                            'fight_url, event_name, fighter1_name, fighter2_name',
+                            [('in_', 'event_name', chunk)]):
+            if ((m['event_name'], m['fighter1_name']) in stat_keys
+                    or (m['event_name'], m['fighter2_name']) in stat_keys):
+                urls.add(m['fight_url'])
+    return urls
+
+def run_incremental(out_path, refresh=False):
+    prev = load_state().get(str(Path(out_path).resolve()))
+    if not prev or not Path(out_path).exists():
+        print(f"[..] No previous build recorded for {out_path} — doing a full build")
+        return run(out_path, refresh=refresh)
+
+    start = time.perf_counter()
+    if refresh:
+        print("[..] Refreshing ml_dataset_rows ...")
+        supabase.rpc('refresh_ml_dataset_rows').execute()
+    watermarks = current_watermarks()
+
+    print("[..] Finding fights changed since the last build ...")
+    urls = changed_fight_urls(prev['watermarks'])
+    print(f"      {len(urls):,} fights changed")
+
+    new_rows = []
+    for chunk in _chunks(urls):
+        new_rows.extend(fetch_rows(supabase, 'ml_dataset_rows', '*', [('in_', 'fight_url', chunk)]))
+
+    with open(out_path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames != FIELDNAMES:
+            print("[..] CSV columns differ from FIELDNAMES — doing a full build")
+            return run(out_path, refresh=False)
+        kept = [row for row in reader if row['fight_url'] not in urls]
+    n_replaced = prev['rows'] - len(kept)
+
+    tmp_path = Path(out_path).with_suffix('.csv.tmp')
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(kept)
+        for r in new_rows:
+            writer.writerow(build_row_from_extract(r))
+    os.replace(tmp_path, out_path)
+    write_store(out_path)
+
+    n_rows = len(kept) + len(new_rows)
+    save_state(out_path, watermarks, n_rows)
+    print(f"[OK] Incremental build: {len(urls):,} fights, -{n_replaced:,} / +{len(new_rows):,} rows "
+          f"→ {n_rows:,} rows in {time.perf_counter() - start:.1f}s ({out_path})")
+
+def write_store(out_path):
+    n_rows = write_columns(out_path)
+    print(f"[OK] Columnar store: {n_rows:,} rows → {store_path(out_path)}")
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def run(out_path, verbose=False):
-    events, meta, stats_rows, score_rows = load_all_data()
+# Columns ml_dataset_rows must expose (everything build_row_from_extract reads)
+EXTRACT_COLUMNS = (
+    ['row_key', 'fight_url', 'event_name', 'event_date', 'weight_class', 'round', 'judge',
+     'f1_name', 'f2_name', 'judge_f1_score', 'judge_f2_score', 'stats_coverage']
+    + [f'f1_{s}' for s in STAT_SHORT]
+    + [f'f2_{s}' for s in STAT_SHORT]
+)
+
+def run(out_path, refresh=False):
+    if refresh:
+        print("[..] Refreshing ml_dataset_rows ...")
+        supabase.rpc('refresh_ml_dataset_rows').execute()
+
+    watermarks = current_watermarks()
+    print("[..] Streaming ml_dataset_rows ...")
+    n_rows        = 0
+    n_rows_both   = 0
+    n_rows_one    = 0
+    fights        = set()
+
+    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+
+        for r in stream_extract_rows():
+            if n_rows == 0:
+                missing = [c for c in EXTRACT_COLUMNS if c not in r]
+                if missing:
+                    print(f"[ERROR] ml_dataset_rows is missing columns {missing[:5]} — re-run "
+                          f"supabase/migrate_ml_dataset_rows.py after changing STAT_MAP")
+                    sys.exit(1)
+            writer.writerow(build_row_from_extract(r))
+            n_rows += 1
+            fights.add(r['fight_url'])
+            if r['stats_coverage'] == 'both':
+                n_rows_both += 1
+            else:
+                n_rows_one += 1
+            if n_rows % 5000 == 0:
+                print(f"      {n_rows:,} rows ...")
+
+    print("=" * 68)
+    print("  DATA EXTRACTION REPORT (server-side join)")
+    print("=" * 68)
+    print(f"  Fights:                                     {len(fights):,}")
+    if n_rows > 0:
+        print(f"    Both fighters have stats:               {n_rows_both:,}  "
+              f"({n_rows_both/n_rows*100:.1f}%)")
+        print(f"    One fighter missing (filled empty):     {n_rows_one:,}  "
+              f"({n_rows_one/n_rows*100:.1f}%)")
+    print()
+    print(f"  CSV rows written:  {n_rows:,}")
+    print(f"  Output:            {out_path}")
+    print("=" * 68)
+
+    write_store(out_path)
+    save_state(out_path, watermarks, n_rows)
+
+    if n_rows == 0:
+        print("\n[WARN] ml_dataset_rows is empty. Run `python judge_links.py --full`, then "
+              "`python build_ml_dataset.py --refresh` (or use --client-join).")
+
+def run_client_join(out_path, verbose=False, rematch=False):
+    events, meta, stats_rows, score_rows, links = load_all_data(rematch)
 
     print("\n[..] Building indexes ...")
-    events_by_date, meta_by_event, stats_index, judge_groups, event_date_map = \
+    meta_by_url, stats_index, judge_groups, event_date_map = \
         build_indexes(events, meta, stats_rows, score_rows)
+    if rematch:
+        print("[..] Matching judge groups to fights (--rematch) ...")
+        link_index = rematch_links(events, meta, judge_groups)
+    else:
+        link_index = index_links(links)
 
     n_bouts            = len(judge_groups)
-    n_no_event         = 0
-    n_no_fight         = 0
+    n_no_link          = 0
+    n_no_meta          = 0
     n_fight_matched    = 0
     n_rounds_both      = 0
     n_rounds_one_miss  = 0
@@ -301,56 +515,44 @@ def run(out_path, verbose=False):
 
     print(f"[..] Processing {n_bouts:,} (date, bout) groups ...\n")
 
+    # Client-join rows are not ml_dataset_rows rows (--rematch links, unrefreshed view), so
+    # the watermarks of the last server-side build no longer describe this file
+    clear_state(out_path)
     with open(out_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
 
-        for (js_date, js_bout), group_rows in judge_groups.items():
+        for (js_bout, js_date), group_rows in judge_groups.items():
 
-            # 1. Resolve UFCStats event via date ±1
-            try:
-                js_date_obj = date.fromisoformat(str(js_date))
-            except Exception:
-                n_no_event += 1
-                continue
-
-            candidate_event_names = []
-            for delta in (-1, 0, 1):
-                d = (js_date_obj + timedelta(days=delta)).isoformat()
-                candidate_event_names.extend(events_by_date.get(d, []))
-
-            if not candidate_event_names:
-                n_no_event += 1
-                continue
-
-            # 2. Get distinct fighters from this judge group (should be exactly 2)
-            js_fighters = list({r['fighter'] for r in group_rows})
-            if len(js_fighters) != 2:
-                n_no_fight += 1
-                continue
-
-            # 3. Match to a specific fight via fuzzy name matching
-            candidate_meta = []
-            for ev_name in candidate_event_names:
-                candidate_meta.extend(meta_by_event.get(ev_name, []))
-
-            meta_row, f1_js_name, f2_js_name = find_matching_fight(js_fighters, candidate_meta)
-
-            if meta_row is None:
-                n_no_fight += 1
+            # 1. Resolve the fight through its (bout, date) link
+            link = link_index.get((js_bout, js_date))
+            if link is None:
+                n_no_link += 1
                 if verbose and len(name_miss_examples) < 20:
+                    js_fighters = sorted({r['fighter'] for r in group_rows})
                     name_miss_examples.append(
                         f"  {js_date} | {js_bout} | js_fighters={js_fighters}"
                     )
                 continue
 
+            meta_row = meta_by_url.get(link['fight_url'])
+            if meta_row is None:
+                n_no_meta += 1
+                continue
+            f1_js_name, f2_js_name = link['f1_js_name'], link['f2_js_name']
+
             n_fight_matched += 1
             event_date = event_date_map.get(meta_row['event_name'], '')
 
             # 4. Build (round, judge) -> {f1_score, f2_score} from the judge group
             round_judge_scores = defaultdict(lambda: {'f1': None, 'f2': None})
             for r in group_rows:
-                perspective = 'f1' if r['fighter'] == f1_js_name else 'f2'
+                if r['fighter'] == f1_js_name:
+                    perspective = 'f1'
+                elif r['fighter'] == f2_js_name:
+                    perspective = 'f2'
+                else:
+                    continue
                 round_judge_scores[(r['round'], r['judge'])][perspective] = r['score']
 
             # 5. Look up round stats and emit rows
@@ -390,10 +592,10 @@ def run(out_path, verbose=False):
     print("  DATA EXTRACTION REPORT")
     print("=" * 68)
     print(f"  Unique (date, bout) groups in judge_scores: {n_bouts:,}")
-    print(f"  No UFCStats event found (date ±1):          {n_no_event:,}  "
-          f"({n_no_event/max(n_bouts,1)*100:.1f}%)")
-    print(f"  Event found, fighter match failed:          {n_no_fight:,}  "
-          f"({n_no_fight/max(n_bouts,1)*100:.1f}%)")
+    print(f"  No fight link (unmatched / not yet synced): {n_no_link:,}  "
+          f"({n_no_link/max(n_bouts,1)*100:.1f}%)")
+    print(f"  Linked fight missing from meta:             {n_no_meta:,}  "
+          f"({n_no_meta/max(n_bouts,1)*100:.1f}%)")
     print(f"  Matched to a specific fight:                {n_fight_matched:,}  "
           f"({n_fight_matched/max(n_bouts,1)*100:.1f}%)")
     print()
@@ -411,20 +613,38 @@ def run(out_path, verbose=False):
     print("=" * 68)
 
     if verbose and name_miss_examples:
-        print("\n  Sample name-match failures (first 20):")
+        print("\n  Sample unlinked groups (first 20):")
         for ex in name_miss_examples:
             print(ex)
 
+    write_store(out_path)
+
     if n_fight_matched == 0:
-        print("\n[WARN] Zero fights matched. Verify that event_date ranges overlap between sources.")
+        print("\n[WARN] Zero fights matched. Run `python judge_links.py --full` (or pass --rematch) "
+              "and verify that event_date ranges overlap between sources.")
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Build ML dataset for UFC round scoring model.')
     parser.add_argument('--out', default='ml_dataset.csv',
                         help='Output CSV path (default: ml_dataset.csv in script directory)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Refresh the ml_dataset_rows materialized view before streaming it')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Replace only fights changed since the last build of this output file')
+    parser.add_argument('--client-join', action='store_true',
+                        help='Pull the source tables and join in Python instead of streaming ml_dataset_rows')
     parser.add_argument('--verbose', action='store_true',
-                        help='Print sample fighter name-match failures')
+                        help='Print sample judge groups with no fight link (--client-join)')
+    parser.add_argument('--rematch', action='store_true',
+                        help='Client join, matching judge groups to fights in-process instead of '
+                             'reading fight_judge_links')
     args = parser.parse_args()
-    run(Path(__file__).parent / args.out, verbose=args.verbose)
+    out_path = Path(__file__).parent / args.out
+    if args.client_join or args.rematch:
+        run_client_join(out_path, verbose=args.verbose, rematch=args.rematch)
+    elif args.incremental:
+        run_incremental(out_path, refresh=args.refresh)
+    else:
+        run(out_path, refresh=args.refresh)
 
@@ -10,18 +10,31 @@ Models:
 
 All models use identical 19 differential features + symmetric augmentation.
 
+Fits run on a process pool under a core budget: each model has a CORE_BUDGET (its n_jobs
+and its BLAS/OpenMP thread cap), and fits are only started while the running budgets sum
+to at most --cores, so RF / XGB / the ensembles no longer each grab every core at once.
+Every fit gets a fresh worker process, so the peak RSS reported is that model's own.
+
+Reported per model: holdout accuracy, log loss, Brier, fit time, predict latency per 1k
+rows (predict_proba on the holdout, best of PREDICT_REPEAT) and peak RSS. The leaderboard
+is also written as JSON (model_leaderboard.json next to the CSV) so model choice can weigh
+serving cost against accuracy.
+
 Usage:
   python compare_models.py
   python compare_models.py --no-xgb   # skip XGBoost if not installed
+  python compare_models.py --cores 4 --leaderboard /tmp/leaderboard.json
 """
 
+import os
 import sys
-import csv
+import json
 import math
 import time
 import argparse
 from pathlib import Path
-from collections import defaultdict
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
@@ -44,66 +57,40 @@ try:
 except ImportError:
     HAS_XGB = False
 
-# ---------------------------------------------------------------------------
-# Feature engineering constants (must stay in sync with train_scoring_model.py)
-# ---------------------------------------------------------------------------
+try:
+    from threadpoolctl import threadpool_limits   # installed with scikit-learn
+except ImportError:
+    threadpool_limits = None
+
+from features import augment
+from feature_cache import load_features, cache_key
 
-DIFF_COLS = [
-    'kd', 'sig_landed', 'sig_pct', 'head_landed', 'body_landed', 'leg_landed',
-    'dist_landed', 'clinch_landed', 'ground_landed',
-    'td_landed', 'td_pct', 'ctrl_sec', 'sub_attempts',
-]
-RATIO_COLS = ['sig_landed', 'head_landed', 'td_landed', 'ctrl_sec', 'ground_landed']
+# Feature spec: features.py (shared with train_scoring_model.py)
 
 TRAIN_FROM = 2013
 TRAIN_UNTIL = 2023
 HOLDOUT_FROM = 2024
 
+# Cores each model's fit may use; anything not listed gets 1
+CORE_BUDGET = {
+    'Random Forest':             4,
+    'XGBoost':                   4,
+    'Voting (soft, LR+RF+XGB)':  4,
+    'Stacking (LR+RF+XGB → LR)': 4,
+}
+PREDICT_REPEAT = 3
+
 # ---------------------------------------------------------------------------
 # Data helpers
 # ---------------------------------------------------------------------------
 
-def safe_float(v, default=0.0):
-    try:
-        f = float(v)
-        return f if math.isfinite(f) else default
-    except (TypeError, ValueError):
-        return default
-
-def compute_features(row):
-    diffs  = [safe_float(row.get(f'f1_{c}')) - safe_float(row.get(f'f2_{c}'))
-              for c in DIFF_COLS]
-    ratios = [safe_float(row.get(f'f1_{c}')) /
-              (safe_float(row.get(f'f1_{c}')) + safe_float(row.get(f'f2_{c}')) + 1.0)
-              for c in RATIO_COLS]
-    post_2016 = 1.0 if (row.get('event_date', '') >= '2016-01-01') else 0.0
-    winner = row.get('judge_winner', '')
-    label  = 1 if winner == 'f1' else (0 if winner == 'f2' else None)
-    return diffs + ratios + [post_2016], label
-
-def load_split(csv_path):
-    X_tr, y_tr, X_ho, y_ho = [], [], [], []
-    with open(csv_path, encoding='utf-8') as f:
-        for row in csv.DictReader(f):
-            d = row.get('event_date', '')
-            if not d:
-                continue
-            yr = int(d[:4])
-            feats, label = compute_features(row)
-            if label is None:
-                continue
-            if TRAIN_FROM <= yr <= TRAIN_UNTIL:
-                X_tr.append(feats); y_tr.append(label)
-            elif yr >= HOLDOUT_FROM:
-                X_ho.append(feats); y_ho.append(label)
-    return X_tr, y_tr, X_ho, y_ho
-
-def augment(X, y):
-    n_diff  = len(DIFF_COLS)
-    n_ratio = len(RATIO_COLS)
-    Xm = [[-f for f in r[:n_diff]] + [1 - v for v in r[n_diff:n_diff+n_ratio]] + [r[-1]]
-          for r in X]
-    return X + Xm, y + [1 - lbl for lbl in y]
+def load_split(csv_path, verbose=True):
+    """Feature matrices + labels for the train and holdout years (draws excluded)."""
+    fc = load_features(csv_path, verbose=verbose)
+    X, y, years = fc['X'], fc['y'], fc['year']
+    tr = np.flatnonzero((y >= 0) & (years >= TRAIN_FROM) & (years <= TRAIN_UNTIL))
+    ho = np.flatnonzero((y >= 0) & (years >= HOLDOUT_FROM))
+    return X[tr], y[tr], X[ho], y[ho]
 
 # ---------------------------------------------------------------------------
 # Metrics
@@ -120,6 +107,59 @@ def evaluate(model, X_np, y):
         ll, bs = float('nan'), float('nan')
     return acc, ll, bs
 
+def predict_ms_per_1k(model, X_np):
+    """Best-of-PREDICT_REPEAT wall time of predict_proba (predict if unsupported), ms / 1k rows."""
+    predict = model.predict_proba if hasattr(model, 'predict_proba') else model.predict
+    best = float('inf')
+    for _ in range(PREDICT_REPEAT):
+        t0 = time.perf_counter()
+        predict(X_np)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(X_np) * 1e6
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where it cannot be read)."""
+    # Linux: VmHWM resets on exec — ru_maxrss would still hold the parent's peak from
+    # before the worker was spawned
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return _peak_rss_windows_mb()
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / 1024 / 1024 if sys.platform == 'darwin' else kb / 1024   # bytes on macOS
+
+def _peak_rss_windows_mb():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t),
+                        ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t),
+                        ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(Counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize / 1024 / 1024
+    except (AttributeError, OSError):
+        return None
+
 def section(t):
     print(); print("=" * 72); print(f"  {t}"); print("=" * 72)
 
@@ -127,10 +167,12 @@ def section(t):
 # Model definitions
 # ---------------------------------------------------------------------------
 
-def build_models(use_xgb):
+def build_models(use_xgb, n_jobs=-1):
+    """Every model to compare, unfitted. n_jobs goes to each model's own estimators; the
+    ensembles fit their members one after another so they never use more than n_jobs."""
     lr  = LogisticRegression(C=1.0, max_iter=2000, solver='lbfgs', random_state=42)
     rf  = RandomForestClassifier(n_estimators=300, min_samples_leaf=5,
-                                  n_jobs=-1, random_state=42)
+                                  n_jobs=n_jobs, random_state=42)
 
     models = {
         'LR (baseline)': lr,
@@ -141,7 +183,7 @@ def build_models(use_xgb):
         xgb = XGBClassifier(n_estimators=300, max_depth=6, learning_rate=0.05,
                              subsample=0.8, colsample_bytree=0.8,
                              use_label_encoder=False, eval_metric='logloss',
-                             random_state=42, verbosity=0)
+                             n_jobs=n_jobs, random_state=42, verbosity=0)
         models['XGBoost'] = xgb
 
     # --- Neural networks: four architectures ---
@@ -169,18 +211,18 @@ def build_models(use_xgb):
     # --- Ensemble: Soft Voting ---
     base_lr  = LogisticRegression(C=1.0, max_iter=2000, solver='lbfgs', random_state=42)
     base_rf  = RandomForestClassifier(n_estimators=300, min_samples_leaf=5,
-                                       n_jobs=-1, random_state=42)
+                                       n_jobs=n_jobs, random_state=42)
     if use_xgb and HAS_XGB:
         base_xgb = XGBClassifier(n_estimators=300, max_depth=6, learning_rate=0.05,
                                   subsample=0.8, colsample_bytree=0.8,
                                   use_label_encoder=False, eval_metric='logloss',
-                                  random_state=42, verbosity=0)
+                                  n_jobs=n_jobs, random_state=42, verbosity=0)
         voting_estimators = [('lr', base_lr), ('rf', base_rf), ('xgb', base_xgb)]
     else:
         voting_estimators = [('lr', base_lr), ('rf', base_rf)]
 
     models['Voting (soft, LR+RF+XGB)'] = VotingClassifier(
-        estimators=voting_estimators, voting='soft', n_jobs=-1
+        estimators=voting_estimators, voting='soft', n_jobs=1
     )
 
     # --- Ensemble: Stacking ---
@@ -188,12 +230,12 @@ def build_models(use_xgb):
     meta_lr = LogisticRegression(C=0.5, max_iter=1000, solver='lbfgs', random_state=42)
     stk_base_lr  = LogisticRegression(C=1.0, max_iter=2000, solver='lbfgs', random_state=42)
     stk_base_rf  = RandomForestClassifier(n_estimators=200, min_samples_leaf=5,
-                                           n_jobs=-1, random_state=42)
+                                           n_jobs=n_jobs, random_state=42)
     if use_xgb and HAS_XGB:
         stk_base_xgb = XGBClassifier(n_estimators=200, max_depth=6, learning_rate=0.05,
                                       subsample=0.8, colsample_bytree=0.8,
                                       use_label_encoder=False, eval_metric='logloss',
-                                      random_state=42, verbosity=0)
+                                      n_jobs=n_jobs, random_state=42, verbosity=0)
         stack_estimators = [('lr', stk_base_lr), ('rf', stk_base_rf), ('xgb', stk_base_xgb)]
     else:
         stack_estimators = [('lr', stk_base_lr), ('rf', stk_base_rf)]
@@ -202,48 +244,131 @@ def build_models(use_xgb):
         estimators=stack_estimators,
         final_estimator=meta_lr,
         cv=5,
-        n_jobs=-1,
+        n_jobs=1,
     )
 
     return models
 
+# ---------------------------------------------------------------------------
+# Scheduling
+# ---------------------------------------------------------------------------
+
+def core_budget(name, total_cores):
+    return max(1, min(CORE_BUDGET.get(name, 1), total_cores))
+
+def fit_one(csv_path, name, use_xgb, cores):
+    """Fit + score one model; runs in its own worker process with at most `cores` threads.
+    Returns a leaderboard entry (error set instead of metrics if the fit raised)."""
+    entry = {'model': name, 'cores': cores}
+    limit = threadpool_limits(limits=cores) if threadpool_limits else None
+    try:
+        X_tr, y_tr, X_ho, y_ho = load_split(csv_path, verbose=False)
+        X_tr_aug, y_tr_aug = augment(X_tr, y_tr)
+        scaler = StandardScaler()
+        X_tr_s = scaler.fit_transform(X_tr_aug)
+        X_ho_s = scaler.transform(X_ho)
+
+        model = build_models(use_xgb, n_jobs=cores)[name]
+        t0 = time.perf_counter()
+        model.fit(X_tr_s, y_tr_aug)
+        fit_sec = time.perf_counter() - t0
+
+        acc, ll, bs = evaluate(model, X_ho_s, y_ho)
+        entry.update(accuracy=acc, log_loss=ll, brier=bs, fit_sec=fit_sec,
+                     predict_ms_per_1k=predict_ms_per_1k(model, X_ho_s))
+    except Exception as e:
+        entry['error'] = str(e)
+    finally:
+        if limit is not None:
+            limit.restore_original_limits()
+    entry['peak_rss_mb'] = peak_rss_mb()
+    return entry
+
+def run_pool(csv_path, names, use_xgb, total_cores):
+    """Fit every model, starting the largest budgets first and only while the running fits'
+    budgets fit in total_cores. Returns {name: entry} in completion order."""
+    pending = sorted(names, key=lambda n: -core_budget(n, total_cores))   # stable: ties keep order
+    running = {}   # future -> (name, cores)
+    free = total_cores
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(total_cores, len(names)),
+                             max_tasks_per_child=1) as pool:
+        while pending or running:
+            while pending and core_budget(pending[0], total_cores) <= free:
+                name = pending.pop(0)
+                cores = core_budget(name, total_cores)
+                running[pool.submit(fit_one, csv_path, name, use_xgb, cores)] = (name, cores)
+                free -= cores
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name, cores = running.pop(fut)
+                free += cores
+                results[name] = fut.result()
+                tag = 'ERROR' if 'error' in results[name] else 'OK'
+                print(f"  [{tag}] {name}  ({cores} core{'s' if cores > 1 else ''})")
+    return results
+
+def write_leaderboard(path, entries, csv_path, n_train, n_holdout, total_cores):
+    ranked = sorted((e for e in entries if 'error' not in e), key=lambda e: -e['accuracy'])
+    for rank, e in enumerate(ranked, 1):
+        e['rank'] = rank
+    out = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'feature_cache_key': cache_key(csv_path),
+        'train_rows': n_train,
+        'holdout_rows': n_holdout,
+        'cores': total_cores,
+        'models': ranked + [e for e in entries if 'error' in e],
+    }
+    tmp = Path(str(path) + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(out, f, indent=2)
+    os.replace(tmp, path)
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def run(csv_path, use_xgb):
+def fmt_optional(v, spec):
+    return format(v, spec) if v is not None else 'n/a'
+
+def run(csv_path, use_xgb, total_cores=None, leaderboard_path=None):
     print(f"Loading {csv_path} ...")
     X_tr, y_tr, X_ho, y_ho = load_split(csv_path)
     print(f"Train: {len(X_tr):,} rows  |  Holdout: {len(X_ho):,} rows")
 
     section("AUGMENTATION")
     X_tr_aug, y_tr_aug = augment(X_tr, y_tr)
-    print(f"  Pre-aug:  {len(X_tr):,}  (f1 rate: {sum(y_tr)/len(y_tr)*100:.1f}%)")
-    print(f"  Post-aug: {len(X_tr_aug):,}  (f1 rate: {sum(y_tr_aug)/len(y_tr_aug)*100:.1f}%)")
-
-    scaler = StandardScaler()
-    X_tr_s = scaler.fit_transform(np.array(X_tr_aug))
-    X_ho_s = scaler.transform(np.array(X_ho))
-    y_tr_np = np.array(y_tr_aug)
-    y_ho_np = np.array(y_ho)
+    print(f"  Pre-aug:  {len(X_tr):,}  (f1 rate: {np.count_nonzero(y_tr)/len(y_tr)*100:.1f}%)")
+    print(f"  Post-aug: {len(X_tr_aug):,}  (f1 rate: {np.count_nonzero(y_tr_aug)/len(y_tr_aug)*100:.1f}%)")
 
-    models = build_models(use_xgb)
+    names = list(build_models(use_xgb))
+    total_cores = total_cores or os.cpu_count() or 1
 
-    section("TRAINING & EVALUATION  (holdout: 2024-2025)")
-    print(f"  {'Model':<35} {'Accuracy':>10} {'LogLoss':>9} {'Brier':>8} {'Time':>8}")
-    print(f"  {'-'*35} {'-'*10} {'-'*9} {'-'*8} {'-'*8}")
+    section(f"TRAINING & EVALUATION  (holdout: 2024-2025, {total_cores} cores)")
+    t0 = time.perf_counter()
+    entries = run_pool(csv_path, names, use_xgb, total_cores)
+    print(f"  {len(names)} fits in {time.perf_counter() - t0:.1f}s wall")
+    print()
+    print(f"  {'Model':<35} {'Accuracy':>10} {'LogLoss':>9} {'Brier':>8} {'Fit':>8} "
+          f"{'ms/1k':>8} {'RSS MB':>8}")
+    print(f"  {'-'*35} {'-'*10} {'-'*9} {'-'*8} {'-'*8} {'-'*8} {'-'*8}")
 
     results = {}
-    for name, model in models.items():
-        t0 = time.time()
-        try:
-            model.fit(X_tr_s, y_tr_np)
-            acc, ll, bs = evaluate(model, X_ho_s, y_ho_np)
-            elapsed = time.time() - t0
-            results[name] = (acc, ll, bs)
-            print(f"  {name:<35} {acc*100:>9.2f}% {ll:>9.4f} {bs:>8.4f} {elapsed:>7.1f}s")
-        except Exception as e:
-            print(f"  {name:<35} ERROR: {e}")
+    for name in names:
+        e = entries[name]
+        if 'error' in e:
+            print(f"  {name:<35} ERROR: {e['error']}")
+            continue
+        results[name] = (e['accuracy'], e['log_loss'], e['brier'])
+        print(f"  {name:<35} {e['accuracy']*100:>9.2f}% {e['log_loss']:>9.4f} {e['brier']:>8.4f} "
+              f"{e['fit_sec']:>7.1f}s {e['predict_ms_per_1k']:>8.2f} "
+              f"{fmt_optional(e['peak_rss_mb'], '>8.0f'):>8}")
+
+    leaderboard_path = leaderboard_path or Path(csv_path).parent / 'model_leaderboard.json'
+    write_leaderboard(leaderboard_path, [entries[n] for n in names], csv_path,
+                      len(X_tr), len(X_ho), total_cores)
+    print(f"\n  [OK] Leaderboard → {leaderboard_path}")
 
     section("RANKED BY HOLDOUT ACCURACY")
     ranked = sorted(results.items(), key=lambda x: x[1][0], reverse=True)
@@ -281,5 +406,9 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Compare ML models for UFC round scoring.')
     parser.add_argument('--csv', default='ml_dataset.csv')
     parser.add_argument('--no-xgb', action='store_true')
+    parser.add_argument('--cores', type=int, default=0,
+                        help='Total core budget for concurrent fits (default: all cores)')
+    parser.add_argument('--leaderboard', help='Leaderboard JSON path (default: model_leaderboard.json)')
     args = parser.parse_args()
-    run(Path(__file__).parent / args.csv, use_xgb=not args.no_xgb)
+    run(Path(__file__).parent / args.csv, use_xgb=not args.no_xgb,
+        total_cores=args.cores, leaderboard_path=args.leaderboard)
@@ -0,0 +1,233 @@
+"""
+dataset_store.py — Typed columnar copy of ml_dataset.csv.
+
+build_ml_dataset.py writes the CSV (kept for spreadsheets / diffs) and then converts it into
+a directory of NumPy .npy files next to it — ml_dataset.cols/ for ml_dataset.csv:
+
+  schema.json          column order, kind per column, row count, source CSV size + mtime +
+                       sha256 (the dataset content hash feature_cache.py keys on)
+  <col>.npy            float  — float64, NaN where the CSV cell is empty
+                       int    — int16, -1 where the CSV cell is empty
+                       text   — int32 codes into <col>.labels.npy (sorted unique strings)
+  <col>.labels.npy     text columns only — fixed-width unicode array
+
+Plain .npy (not .npz) so every column opens with np.load(mmap_mode='r'): the analysis
+scripts (train_scoring_model, compare_models, eda_report, analyze_10_8_thresholds) get
+contiguous arrays straight from the page cache instead of one dict per row with every float
+re-parsed.
+
+load_dataset() rebuilds the store from the CSV when it is missing or older than the CSV
+(size / mtime mismatch), so a hand-edited or externally produced CSV still works.
+
+Usage:
+  from dataset_store import load_dataset, decode
+  ds = load_dataset('ml_dataset.csv')
+  ds['f1_sig_landed']             # float64 memmap
+  decode(ds['judge_winner'])      # unicode array, one entry per row
+
+  python dataset_store.py                   # convert ml_dataset.csv
+  python dataset_store.py --csv other.csv
+"""
+
+import os
+import sys
+import csv
+import json
+import hashlib
+import shutil
+import argparse
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+SCHEMA_VERSION = 2
+
+TEXT_COLUMNS = {
+    'fight_url', 'event_name', 'event_date', 'weight_class', 'judge',
+    'f1_name', 'f2_name', 'judge_winner', 'rules_winner',
+}
+INT_COLUMNS = {'round', 'judge_f1_score', 'judge_f2_score', 'is_10_8', 'rules_agrees'}
+# every other column is a float stat
+
+INT_MISSING = -1
+
+# Text column: codes index into labels; labels[codes] gives the per-row strings
+TextColumn = namedtuple('TextColumn', ['codes', 'labels'])
+
+
+def store_path(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.stem + '.cols')
+
+def column_kind(name):
+    if name in TEXT_COLUMNS:
+        return 'text'
+    if name in INT_COLUMNS:
+        return 'int'
+    return 'float'
+
+def _source_info(csv_path):
+    st = os.stat(csv_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+# ---------------------------------------------------------------------------
+# .npy directories (shared with feature_cache.py)
+# ---------------------------------------------------------------------------
+
+def write_arrays(out_dir, arrays, manifest, manifest_name='schema.json', kinds=None):
+    """Write {name: ndarray | TextColumn} as <name>.npy (+ <name>.labels.npy) files plus a
+    JSON manifest listing the columns, into a temp dir that is then swapped in for out_dir."""
+    out_dir = Path(out_dir)
+    tmp_dir = out_dir.with_name(f'{out_dir.name}.tmp{os.getpid()}')   # per process: parallel writers
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    manifest = dict(manifest, columns=[])
+    for name, arr in arrays.items():
+        if isinstance(arr, TextColumn):
+            np.save(tmp_dir / f'{name}.npy', arr.codes)
+            np.save(tmp_dir / f'{name}.labels.npy', arr.labels)
+            kind = 'text'
+        else:
+            np.save(tmp_dir / f'{name}.npy', arr)
+            kind = (kinds or {}).get(name, 'array')
+        manifest['columns'].append({'name': name, 'kind': kind})
+    with open(tmp_dir / manifest_name, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+
+    # Swap in: readers holding memmaps of the old files keep them until they close
+    old_dir = out_dir.with_name(f'{out_dir.name}.old{os.getpid()}')
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if out_dir.exists():
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+def read_arrays(base, manifest, columns=None):
+    """{name: memmap | TextColumn} for the columns listed in a write_arrays manifest."""
+    base = Path(base)
+    out = {}
+    for col in manifest['columns']:
+        name = col['name']
+        if columns is not None and name not in columns:
+            continue
+        arr = np.load(base / f'{name}.npy', mmap_mode='r')
+        if col['kind'] == 'text':
+            out[name] = TextColumn(arr, np.load(base / f'{name}.labels.npy', mmap_mode='r'))
+        else:
+            out[name] = arr
+    return out
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def _parse_float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _parse_int(v):
+    if v == '' or v is None:
+        return INT_MISSING
+    return int(float(v))
+
+def write_columns(csv_path):
+    """Convert csv_path into its .cols store (written to a temp dir, then swapped in).
+    Returns the row count."""
+    csv_path = Path(csv_path)
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        values = [[] for _ in header]
+        for row in reader:
+            for j, v in enumerate(row):
+                values[j].append(v)
+    n_rows = len(values[0]) if values else 0
+
+    arrays = {}
+    for name, vals in zip(header, values):
+        kind = column_kind(name)
+        if kind == 'text':
+            labels, codes = np.unique(np.array(vals, dtype=str), return_inverse=True)
+            arrays[name] = TextColumn(codes.reshape(-1).astype(np.int32), labels)
+        elif kind == 'int':
+            arrays[name] = np.array([_parse_int(v) for v in vals], dtype=np.int16)
+        else:
+            arrays[name] = np.array([_parse_float(v) for v in vals], dtype=np.float64)
+
+    schema = {'version': SCHEMA_VERSION, 'rows': n_rows,
+              'source': _source_info(csv_path), 'sha256': _file_sha256(csv_path)}
+    write_arrays(store_path(csv_path), arrays, schema,
+                 kinds={name: column_kind(name) for name in header})
+    return n_rows
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def read_schema(csv_path):
+    try:
+        with open(store_path(csv_path) / 'schema.json', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_current(csv_path, schema=None):
+    """True when the store exists and was converted from the CSV as it is now."""
+    schema = schema or read_schema(csv_path)
+    if not schema or schema.get('version') != SCHEMA_VERSION:
+        return False
+    if not Path(csv_path).exists():
+        return True   # store shipped without its CSV
+    return schema.get('source') == _source_info(csv_path)
+
+def load_dataset(csv_path, columns=None):
+    """{column: memmap array | TextColumn} for the dataset, (re)converting the CSV first
+    when the store is missing or stale. columns limits which columns are opened."""
+    schema = read_schema(csv_path)
+    if not is_current(csv_path, schema):
+        print(f"[..] Converting {Path(csv_path).name} to columnar store ...")
+        count = write_columns(csv_path)
+        print(f"[OK] {count:,} rows → {store_path(csv_path).name}/")
+        schema = read_schema(csv_path)
+
+    return read_arrays(store_path(csv_path), schema, columns)
+
+def dataset_hash(csv_path):
+    """sha256 of the dataset CSV, read from the (re)converted store's schema."""
+    schema = read_schema(csv_path)
+    if not is_current(csv_path, schema):
+        load_dataset(csv_path, columns=())
+        schema = read_schema(csv_path)
+    return schema['sha256']
+
+def row_count(ds):
+    col = next(iter(ds.values()))
+    return len(col.codes if isinstance(col, TextColumn) else col)
+
+def decode(col):
+    """Per-row strings of a TextColumn (fixed-width unicode array)."""
+    return col.labels[col.codes]
+
+def text_at(col, i):
+    return str(col.labels[col.codes[i]])
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    parser = argparse.ArgumentParser(description='Convert ml_dataset.csv to the columnar store.')
+    parser.add_argument('--csv', default='ml_dataset.csv', help='Input CSV')
+    args = parser.parse_args()
+    csv_path = Path(__file__).parent / args.csv
+    n = write_columns(csv_path)
+    print(f"[OK] {n:,} rows → {store_path(csv_path)}")
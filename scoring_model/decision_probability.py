@@ -0,0 +1,322 @@
+"""
+decision_probability.py — Fight-level decision probabilities and upset index.
+
+Turns the per-round model output in round_predictions (score_rounds.py) into the probability
+of each official decision for every decision fight. First the exact distribution of one
+judge's scorecard:
+
+  round r, from fighter1's side:  +2 = 10-8 f1   +1 = 10-9 f1   -1 = 10-9 f2   -2 = 10-8 f2
+  P(+1) = p_f1 (1 - q)   P(+2) = p_f1 q   P(-1) = (1 - p_f1)(1 - q)   P(-2) = (1 - p_f1) q
+
+q = P(10-8 | the round's confidence), the per-card 10-8 rate in CALIBRATION_EDGES confidence
+bins, measured on ml_dataset.csv (feature cache + exported model). Without the dataset the
+app's rule is used instead: q = 1 at confidence >= TEN_EIGHT_THRESHOLD, else 0.
+
+Rounds are independent, so the card margin is the convolution of the per-round outcomes
+(Poisson-binomial style, with four outcomes per round). It is computed for all fights with
+the same round count at once, as an (n_fights, 4R + 1) array updated once per round, and
+collapsed to per-card P(f1 card) / P(drawn card) / P(f2 card).
+
+Then the panel: the three cards are independent given the rounds (each judge draws their own
+round outcomes from the same probabilities), and a fighter wins the decision with at least
+two of the three cards — unanimous 3-0, split 2-1 or majority 2-0-1. Everything else is a
+draw (1-0-2 majority draw, 1-1-1 split draw, 0-0-3 unanimous draw):
+
+  P(f1 decision) = P(f1 card >= 2 of 3) = w^2 (3 - 2w)     w = P(f1 card)
+
+  fight_decision_probabilities (fight_url) -> p_f1_win, p_draw, p_f2_win, official,
+                                              p_official, upset_index = 1 - p_official
+
+official is the recorded decision (f1 / f2 / draw, fight_meta_details method 'Decision …').
+upset_index near 1 means the model's panel almost never scores the fight the way it went.
+Fights where a round has no prediction (missing stats), or whose predictions come from
+another model version, are skipped.
+
+Incremental (default): decision fights with no row yet, plus fights whose round predictions
+were re-scored since the newest computed_at. A new model version → everything. The master
+pipeline runs this after score_rounds.py.
+
+Table: supabase/migrate_fight_decision_probabilities.py
+
+Usage:
+  python decision_probability.py             # incremental
+  python decision_probability.py --full      # every decision fight
+  python decision_probability.py --dry-run   # compute and report, write nothing
+"""
+
+import sys
+import os
+import time
+import argparse
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("[ERROR] numpy is required.")
+    print("  Install: pip install numpy")
+    sys.exit(1)
+
+from features import lr_probability
+from score_rounds import ROOT, TEN_EIGHT_THRESHOLD, load_model
+
+CSV_PATH = Path(__file__).parent / 'ml_dataset.csv'
+
+# Confidence bins for P(10-8 | confidence); the last edge is above 1 so confidence 1.0 lands in a bin
+CALIBRATION_EDGES = np.array([0.5, 0.8, 0.9, 0.95, 0.98, 0.99, 0.995, 1.0 + 1e-9])
+
+UPSERT_BATCH = 500
+
+# Round outcome margins from fighter1's side, in the column order of round_outcomes()
+MARGINS = np.array([2, 1, -1, -2])
+
+# ---------------------------------------------------------------------------
+# 10-8 calibration
+# ---------------------------------------------------------------------------
+
+def calibrate_ten_eight(model, csv_path=CSV_PATH):
+    """Per-bin P(10-8) on one judge's card, from every decided judge row of the dataset.
+    None when the dataset is not available locally."""
+    if not Path(csv_path).exists() and not Path(csv_path).with_suffix('.cols').exists():
+        return None
+    from feature_cache import load_features
+    fc = load_features(csv_path)
+    decided = np.asarray(fc['y']) >= 0
+    p_f1 = lr_probability(np.asarray(fc['X'])[decided], model)
+    conf = np.maximum(p_f1, 1 - p_f1)
+    is_10_8 = np.asarray(fc['is_10_8'])[decided] == 1
+
+    bins = np.clip(np.digitize(conf, CALIBRATION_EDGES) - 1, 0, len(CALIBRATION_EDGES) - 2)
+    n = np.bincount(bins, minlength=len(CALIBRATION_EDGES) - 1)
+    k = np.bincount(bins, weights=is_10_8, minlength=len(CALIBRATION_EDGES) - 1)
+    return (k + 0.5) / (n + 1.0)   # Jeffreys prior: empty bins stay near 0.5 but never 0 / 1
+
+def ten_eight_probability(confidence, rates):
+    """q per round: calibrated bin rate, or the app's hard cut-off without a calibration."""
+    confidence = np.asarray(confidence, dtype=np.float64)
+    if rates is None:
+        return (confidence >= TEN_EIGHT_THRESHOLD).astype(np.float64)
+    bins = np.clip(np.digitize(confidence, CALIBRATION_EDGES) - 1, 0, len(rates) - 1)
+    return rates[bins]
+
+# ---------------------------------------------------------------------------
+# Scorecard distribution
+# ---------------------------------------------------------------------------
+
+def round_outcomes(p_f1, q):
+    """(..., 4) probabilities of the MARGINS outcomes per round."""
+    p_f1 = np.asarray(p_f1)
+    return np.stack([p_f1 * q, p_f1 * (1 - q), (1 - p_f1) * (1 - q), (1 - p_f1) * q], axis=-1)
+
+def card_distribution(outcomes):
+    """outcomes: (n_fights, R, 4). Returns (n_fights, 4R + 1): P(card margin = m) at
+    column m + 2R, for margins -2R .. 2R from fighter1's side."""
+    n, n_rounds, _ = outcomes.shape
+    width = 4 * n_rounds + 1
+    dist = np.zeros((n, width))
+    dist[:, 2 * n_rounds] = 1.0
+    for r in range(n_rounds):
+        nxt = np.zeros_like(dist)
+        for j, m in enumerate(MARGINS):
+            # shift by m: only margins reachable after r + 1 rounds are non-zero, so no wrap
+            nxt[:, max(m, 0):width + min(m, 0)] += \
+                dist[:, max(-m, 0):width - max(m, 0)] * outcomes[:, r, j:j + 1]
+        dist = nxt
+    return dist
+
+def card_probabilities(outcomes):
+    """(P(f1 card), P(drawn card), P(f2 card)) for one judge, from (n_fights, R, 4) round outcomes."""
+    n_rounds = outcomes.shape[1]
+    dist = card_distribution(outcomes)
+    centre = 2 * n_rounds
+    return dist[:, centre + 1:].sum(axis=1), dist[:, centre], dist[:, :centre].sum(axis=1)
+
+def panel_probabilities(card_f1, card_f2):
+    """(p_f1_win, p_draw, p_f2_win) of the official decision from three independent cards:
+    a fighter needs at least two of the three cards, anything else is a draw."""
+    p_f1 = card_f1 ** 2 * (3 - 2 * card_f1)
+    p_f2 = card_f2 ** 2 * (3 - 2 * card_f2)
+    return p_f1, np.clip(1.0 - p_f1 - p_f2, 0.0, 1.0), p_f2
+
+def decision_probabilities(outcomes):
+    """(p_f1_win, p_draw, p_f2_win) of the decision per fight, from (n_fights, R, 4) round outcomes."""
+    card_f1, _, card_f2 = card_probabilities(outcomes)
+    return panel_probabilities(card_f1, card_f2)
+
+# ---------------------------------------------------------------------------
+# Fights
+# ---------------------------------------------------------------------------
+
+def official_result(meta):
+    """'f1' / 'f2' / 'draw' for a decision, None otherwise."""
+    if not (meta.get('method') or '').lower().startswith('decision'):
+        return None
+    if meta.get('result') == 'draw':
+        return 'draw'
+    if meta.get('winner') == meta['fighter1_name']:
+        return 'f1'
+    if meta.get('winner') == meta['fighter2_name']:
+        return 'f2'
+    return None
+
+def _rounds_scheduled(meta):
+    try:
+        return int(str(meta.get('round') or '').split()[0])
+    except (ValueError, IndexError):
+        return 0
+
+def compute(meta_rows, predictions, rates):
+    """[(meta, official, n_rounds)], p_f1_win, p_draw, p_f2_win for every decision fight with a
+    prediction on each round; fights are grouped by round count so each group is one batch."""
+    preds = defaultdict(dict)
+    for p in predictions:
+        preds[p['fight_url']][p['round']] = p
+
+    groups = defaultdict(list)    # n_rounds -> [(meta, official)]
+    n_incomplete = 0
+    for m in meta_rows:
+        official = official_result(m)
+        n_rounds = _rounds_scheduled(m)
+        if official is None or n_rounds == 0:
+            continue
+        if any(r not in preds[m['fight_url']] for r in range(1, n_rounds + 1)):
+            n_incomplete += 1
+            continue
+        groups[n_rounds].append((m, official))
+
+    fights, p_win, p_draw, p_loss = [], [], [], []
+    for n_rounds, items in sorted(groups.items()):
+        rows = [[preds[m['fight_url']][r] for r in range(1, n_rounds + 1)] for m, _ in items]
+        p_f1 = np.array([[p['p_f1'] for p in rs] for rs in rows])
+        conf = np.array([[p['confidence'] for p in rs] for rs in rows])
+        a, b, c = decision_probabilities(round_outcomes(p_f1, ten_eight_probability(conf, rates)))
+        fights.extend((m, official, n_rounds) for m, official in items)
+        p_win.append(a)
+        p_draw.append(b)
+        p_loss.append(c)
+    if not fights:
+        return [], np.empty(0), np.empty(0), np.empty(0), n_incomplete
+    return fights, np.concatenate(p_win), np.concatenate(p_draw), np.concatenate(p_loss), n_incomplete
+
+def result_rows(fights, p_f1_win, p_draw, p_f2_win, model_version, computed_at):
+    rows = []
+    for i, (m, official, n_rounds) in enumerate(fights):
+        p_official = {'f1': p_f1_win[i], 'draw': p_draw[i], 'f2': p_f2_win[i]}[official]
+        rows.append({
+            'fight_url':     m['fight_url'],
+            'rounds':        n_rounds,
+            'p_f1_win':      float(p_f1_win[i]),
+            'p_draw':        float(p_draw[i]),
+            'p_f2_win':      float(p_f2_win[i]),
+            'official':      official,
+            'p_official':    float(p_official),
+            'upset_index':   float(1.0 - p_official),
+            'model_version': model_version,
+            'computed_at':   computed_at,
+        })
+    return rows
+
+# ---------------------------------------------------------------------------
+# Database
+# ---------------------------------------------------------------------------
+
+META_SELECT = 'fight_url, fighter1_name, fighter2_name, winner, result, method, round'
+PRED_SELECT = 'fight_url, round, p_f1, confidence, model_version, scored_at'
+
+def pending_fight_urls(db, model_version, decision_urls):
+    """Decision fights to (re)compute: no row for this model version, or round predictions
+    re-scored since the newest computed_at."""
+    from bulk_reader import fetch_rows
+    done = fetch_rows(db, 'fight_decision_probabilities', 'fight_url, model_version, computed_at')
+    current = [r for r in done if r['model_version'] == model_version]
+    urls = decision_urls - {r['fight_url'] for r in current}
+    since = max((r['computed_at'] for r in current if r.get('computed_at')), default=None)
+    if since:
+        urls |= {p['fight_url'] for p in
+                 fetch_rows(db, 'round_predictions', 'fight_url', [('gte', 'scored_at', since)])}
+    return urls & decision_urls
+
+def load_inputs(db, model_version, full=False):
+    from bulk_reader import fetch_rows
+    meta = fetch_rows(db, 'fight_meta_details', META_SELECT, [('ilike', 'method', 'decision%')])
+    decision_urls = {m['fight_url'] for m in meta if official_result(m) is not None}
+    urls = decision_urls if full else pending_fight_urls(db, model_version, decision_urls)
+    print(f"[..] {len(urls):,} of {len(decision_urls):,} decision fights to compute")
+
+    predictions = []
+    if full:
+        predictions = fetch_rows(db, 'round_predictions', PRED_SELECT)
+    else:
+        urls = sorted(urls)
+        for i in range(0, len(urls), 200):
+            predictions.extend(fetch_rows(db, 'round_predictions', PRED_SELECT,
+                                          [('in_', 'fight_url', urls[i:i + 200])]))
+    # A row is stamped with model_version, so every round has to come from that model
+    stale = {p['fight_url'] for p in predictions if p['model_version'] != model_version}
+    if stale:
+        print(f"[WARN] {len(stale):,} fights skipped: predictions from another model version — "
+              f"run score_rounds.py --full")
+        predictions = [p for p in predictions if p['fight_url'] not in stale]
+    return [m for m in meta if m['fight_url'] in urls and m['fight_url'] not in stale], predictions
+
+def upsert_results(db, rows):
+    for i in range(0, len(rows), UPSERT_BATCH):
+        db.table('fight_decision_probabilities').upsert(rows[i:i + UPSERT_BATCH],
+                                                        on_conflict='fight_url').execute()
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def run(db, full=False, dry_run=False):
+    model, model_version = load_model()
+    rates = calibrate_ten_eight(model)
+    if rates is None:
+        print(f"[WARN] {CSV_PATH.name} not found — 10-8 probability falls back to "
+              f"confidence >= {TEN_EIGHT_THRESHOLD}")
+    else:
+        print("[OK] P(10-8 | confidence): " + "  ".join(
+            f"{lo:.3f}+ {r:.3f}" for lo, r in zip(CALIBRATION_EDGES[:-1], rates)))
+
+    meta, predictions = load_inputs(db, model_version, full)
+
+    t0 = time.perf_counter()
+    fights, p_f1_win, p_draw, p_f2_win, n_incomplete = compute(meta, predictions, rates)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    print(f"[OK] {len(fights):,} fights in {elapsed_ms:.0f} ms "
+          f"({n_incomplete:,} skipped: a round has no prediction)")
+    if not fights:
+        return 0
+
+    rows = result_rows(fights, p_f1_win, p_draw, p_f2_win, model_version,
+                       datetime.now(timezone.utc).isoformat())
+    top = sorted(rows, key=lambda r: r['upset_index'], reverse=True)[:5]
+    print("  Biggest upsets:")
+    for r in top:
+        print(f"    {r['upset_index']:.3f}  {r['official']:<4}  {r['fight_url']}")
+
+    if not dry_run:
+        upsert_results(db, rows)
+        print(f"[OK] Upserted {len(rows):,} fight_decision_probabilities rows")
+    return len(rows)
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    parser = argparse.ArgumentParser(description='Fight-level decision probabilities from round_predictions.')
+    parser.add_argument('--full', action='store_true', help='Recompute every decision fight')
+    parser.add_argument('--dry-run', action='store_true', help='Compute and report without writing')
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv(ROOT / '.env')
+    sys.path.insert(0, str(ROOT))
+    from bulk_reader import thread_client
+
+    if not os.environ.get('REACT_APP_SUPABASE_URL') or not os.environ.get('SUPABASE_SERVICE_KEY'):
+        print("[ERROR] Missing REACT_APP_SUPABASE_URL or SUPABASE_SERVICE_KEY in .env")
+        sys.exit(1)
+
+    run(thread_client(), full=args.full, dry_run=args.dry_run)
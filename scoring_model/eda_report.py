@@ -1,7 +1,12 @@
 """
 eda_report.py — Phase 3c, Step 2
 
-Exploratory data analysis on ml_dataset.csv.
+Exploratory data analysis on ml_dataset.csv, streamed once over its memory-mapped
+columnar store (dataset_store.py) in CHUNK_ROWS slices. Each slice is reduced to a small
+accumulator (counts, per-class Welford moments, sums) that is merged into the running
+total, and every section is rendered from the totals — memory stays flat as the dataset
+grows. Only the inter-judge tally grows, with the number of distinct (fight, round) pairs
+(one verdict bitmask + judge count per pair).
 
 Answers:
   1. Class balance — how often does each fighter win? draw rate?
@@ -15,60 +20,30 @@ Answers:
 Usage:
   python eda_report.py
   python eda_report.py --csv path/to/ml_dataset.csv
+  python eda_report.py --chunk-rows 100000
 """
 
 import sys
-import csv
 import math
 import argparse
-from collections import defaultdict, Counter
 from pathlib import Path
 
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
+try:
+    import numpy as np
+except ImportError:
+    print("[ERROR] numpy is required.")
+    print("  Install: pip install numpy")
+    sys.exit(1)
+
+from dataset_store import load_dataset, row_count
+from features import POST_2016_FROM
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def safe_float(v):
-    try:
-        return float(v)
-    except (TypeError, ValueError):
-        return None
-
-def mean(vals):
-    v = [x for x in vals if x is not None]
-    return sum(v) / len(v) if v else None
-
-def stdev(vals):
-    v = [x for x in vals if x is not None]
-    if len(v) < 2:
-        return None
-    m = sum(v) / len(v)
-    return math.sqrt(sum((x - m) ** 2 for x in v) / (len(v) - 1))
-
-def point_biserial_r(binary_labels, continuous_vals):
-    """
-    Point-biserial correlation between a binary outcome and a continuous variable.
-    Measures how well a stat differentiates round winners from round losers.
-    Returns r in [-1, 1]; |r| > 0.1 is meaningful for sports data.
-    """
-    pairs = [(b, c) for b, c in zip(binary_labels, continuous_vals)
-             if b is not None and c is not None]
-    if len(pairs) < 10:
-        return None
-    n = len(pairs)
-    n1 = sum(1 for b, _ in pairs if b == 1)
-    n0 = n - n1
-    if n1 == 0 or n0 == 0:
-        return None
-    m1 = mean([c for b, c in pairs if b == 1])
-    m0 = mean([c for b, c in pairs if b == 0])
-    sd = stdev([c for _, c in pairs])
-    if not sd or sd == 0:
-        return None
-    return (m1 - m0) / sd * math.sqrt(n1 * n0 / n ** 2)
-
 def pct(n, total):
     return f"{n/total*100:.1f}%" if total else "n/a"
 
@@ -80,6 +55,45 @@ def bar(r, width=30):
     else:
         return ' ' * (width - filled) + '█' * filled + '│'
 
+def moments(vals):
+    """(n, mean, M2) of a 1-D array — M2 is the sum of squared deviations from the mean."""
+    n = len(vals)
+    if not n:
+        return (0, 0.0, 0.0)
+    m = float(vals.mean())
+    return (n, m, float(((vals - m) ** 2).sum()))
+
+def merge_moments(a, b):
+    """Combine two (n, mean, M2) triples (Chan et al. parallel Welford update)."""
+    na, ma, m2a = a
+    nb, mb, m2b = b
+    if not na:
+        return b
+    if not nb:
+        return a
+    n = na + nb
+    delta = mb - ma
+    return (n, ma + delta * nb / n, m2a + m2b + delta * delta * na * nb / n)
+
+def point_biserial_r(m0, m1):
+    """
+    Point-biserial correlation between a binary outcome and a continuous variable, from
+    the variable's moments in each outcome class (m0: outcome 0, m1: outcome 1).
+    Measures how well a stat differentiates round winners from round losers.
+    Returns r in [-1, 1]; |r| > 0.1 is meaningful for sports data.
+    """
+    n0, mean0, _ = m0
+    n1, mean1, _ = m1
+    n, _, m2 = merge_moments(m0, m1)
+    if n < 10:
+        return None
+    if n1 == 0 or n0 == 0:
+        return None
+    sd = math.sqrt(m2 / (n - 1))
+    if not sd:
+        return None
+    return (mean1 - mean0) / sd * math.sqrt(n1 * n0 / n ** 2)
+
 # ---------------------------------------------------------------------------
 # Data loading
 # ---------------------------------------------------------------------------
@@ -97,13 +111,158 @@ STAT_COLS = [
     'ground_landed', 'ground_attempted',
 ]
 
-def load_csv(path):
-    rows = []
-    with open(path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
-    return rows
+NAIVE_COLS = ['sig_landed', 'total_landed']   # "whoever landed more <col> wins" baselines
+FOCUS_STATS = ['sig_landed', 'kd', 'td_landed', 'ctrl_sec', 'sub_attempts', 'ground_landed']
+
+META_COLS = ['judge_winner', 'event_date', 'weight_class', 'fight_url', 'round',
+             'is_10_8', 'rules_agrees']
+
+CHUNK_ROWS = 1 << 18
+
+# judge_winner classes
+F1, F2, DRAW, OTHER, EMPTY = range(5)
+N_CLASSES = 5
+WINNER_CLASS = {'f1': F1, 'f2': F2, 'draw': DRAW, '': EMPTY}   # anything else: OTHER
+
+ERAS = [('pre-2016', 0), ('post-2016', 1)]
+
+ROUND_STRIDE = 1 << 16   # (fight, round) key = fight_url code * ROUND_STRIDE + round + 1
+POPCOUNT = np.array([bin(i).count('1') for i in range(1 << N_CLASSES)])
+
+def open_dataset(path):
+    """Memory-mapped columns the report reads, plus per-label lookup tables so each chunk
+    maps text codes to winner class / era / weight class by indexing."""
+    ds = load_dataset(path, columns=META_COLS + [f'{side}_{col}' for side in ('f1', 'f2')
+                                                  for col in STAT_COLS])
+    winner_labels = ds['judge_winner'].labels.tolist()
+    tables = {
+        'class': np.array([WINNER_CLASS.get(w, OTHER) for w in winner_labels], dtype=np.int8),
+        'era':   (np.asarray(ds['event_date'].labels) >= POST_2016_FROM).astype(np.int8),
+        'wc':    ['Unknown' if w == '' else w for w in ds['weight_class'].labels.tolist()],
+    }
+    return ds, tables
+
+# ---------------------------------------------------------------------------
+# Accumulators
+# ---------------------------------------------------------------------------
+
+def new_accumulator(n_wc):
+    return {
+        'rows':        0,
+        'winners':     np.zeros((2, N_CLASSES), dtype=np.int64),   # [era, class]
+        # labelled, non-draw rows per weight_class code (+ 10-8 count, first row for ordering)
+        'wc_total':    np.zeros(n_wc, dtype=np.int64),
+        'wc_10_8':     np.zeros(n_wc, dtype=np.int64),
+        'wc_first':    np.full(n_wc, np.iinfo(np.int64).max),
+        'rules_agree': np.zeros(2, dtype=np.int64),                 # evaluable rows, per era
+        'naive':       np.zeros((len(NAIVE_COLS), 2), dtype=np.int64),   # [col, (correct, decided)]
+        'moments':     {col: [(0, 0.0, 0.0), (0, 0.0, 0.0)] for col in STAT_COLS},  # [f2 won, f1 won]
+        'rounds':      {},                                          # round -> int64[N_CLASSES]
+        'era_sums':    np.zeros((2, len(FOCUS_STATS), 2)),          # [era, stat, (winner, loser)]
+        'era_counts':  np.zeros((2, len(FOCUS_STATS), 2), dtype=np.int64),
+        # sorted (fight, round) keys with the set of verdicts (bitmask) and judge count
+        'judge_keys':   np.empty(0, dtype=np.int64),
+        'judge_masks':  np.empty(0, dtype=np.uint8),
+        'judge_counts': np.empty(0, dtype=np.int64),
+    }
+
+def _reduce_judges(keys, masks, counts):
+    """Collapse duplicate (fight, round) keys: OR the verdict masks, add the judge counts."""
+    if not len(keys):
+        return keys, masks, counts
+    order = np.argsort(keys, kind='stable')
+    keys, masks, counts = keys[order], masks[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return (keys[starts], np.bitwise_or.reduceat(masks, starts),
+            np.add.reduceat(counts, starts))
+
+def merge(a, b):
+    """Combine two accumulators (consecutive chunks or any two shards of the dataset)."""
+    out = {'rows': a['rows'] + b['rows']}
+    for name in ('winners', 'wc_total', 'wc_10_8', 'rules_agree', 'naive',
+                 'era_sums', 'era_counts'):
+        out[name] = a[name] + b[name]
+    out['wc_first'] = np.minimum(a['wc_first'], b['wc_first'])
+    out['moments'] = {col: [merge_moments(x, y) for x, y in zip(a['moments'][col], b['moments'][col])]
+                      for col in STAT_COLS}
+    out['rounds'] = dict(a['rounds'])
+    for rnum, counts in b['rounds'].items():
+        out['rounds'][rnum] = out['rounds'][rnum] + counts if rnum in out['rounds'] else counts
+    out['judge_keys'], out['judge_masks'], out['judge_counts'] = _reduce_judges(
+        np.concatenate([a['judge_keys'], b['judge_keys']]),
+        np.concatenate([a['judge_masks'], b['judge_masks']]),
+        np.concatenate([a['judge_counts'], b['judge_counts']]))
+    return out
+
+def accumulate(ds, tables, start, stop):
+    """Accumulator for rows [start, stop) — only this slice of each column is read."""
+    acc = new_accumulator(len(tables['wc']))
+    acc['rows'] = stop - start
+    cls = tables['class'][ds['judge_winner'].codes[start:stop]]
+    era = tables['era'][ds['event_date'].codes[start:stop]]
+    wc = np.asarray(ds['weight_class'].codes[start:stop])
+    rounds = np.asarray(ds['round'][start:stop]).astype(np.int64)
+    labelled = cls != EMPTY
+    evaluable = (cls == F1) | (cls == F2)
+
+    # 1. Class balance
+    acc['winners'] += np.bincount(era * N_CLASSES + cls, minlength=2 * N_CLASSES).reshape(2, N_CLASSES)
+
+    # 2. 10-8 by weight class (labelled, non-draw)
+    scored = labelled & (cls != DRAW)
+    acc['wc_total'] += np.bincount(wc[scored], minlength=len(acc['wc_total']))
+    acc['wc_10_8'] += np.bincount(wc[scored & (np.asarray(ds['is_10_8'][start:stop]) == 1)],
+                                  minlength=len(acc['wc_10_8']))
+    codes, first = np.unique(wc[scored], return_index=True)
+    acc['wc_first'][codes] = start + np.flatnonzero(scored)[first]
+
+    # 3. Baselines
+    agrees = evaluable & (np.asarray(ds['rules_agrees'][start:stop]) == 1)
+    acc['rules_agree'] += np.bincount(era[agrees], minlength=2)
+    stats = {}
+    for col in STAT_COLS:
+        stats[col] = (np.asarray(ds[f'f1_{col}'][start:stop]), np.asarray(ds[f'f2_{col}'][start:stop]))
+    for i, col in enumerate(NAIVE_COLS):
+        f1, f2 = (np.where(np.isnan(v), 0.0, v) for v in stats[col])   # empty cells count as 0
+        decided = evaluable & (f1 != f2)
+        acc['naive'][i] = (np.count_nonzero(decided & ((f1 > f2) == (cls == F1))),
+                           np.count_nonzero(decided))
+
+    # 4. Correlations: moments of f1 - f2 per outcome (NaN = either side missing, excluded)
+    for col in STAT_COLS:
+        diffs = stats[col][0] - stats[col][1]
+        ok = ~np.isnan(diffs)
+        acc['moments'][col] = [moments(diffs[ok & (cls == F2)]), moments(diffs[ok & (cls == F1)])]
+
+    # 5. Round winner distribution
+    keyed = rounds + 1   # round -1 (empty) → 0
+    by_round = np.bincount(keyed * N_CLASSES + cls,
+                           minlength=(int(keyed.max()) + 1) * N_CLASSES).reshape(-1, N_CLASSES)
+    for r in np.flatnonzero(by_round.any(axis=1)):
+        acc['rounds'][int(r) - 1] = by_round[r]
+
+    # 6. Judge agreement: verdict set + judge count per (fight, round)
+    keys = np.asarray(ds['fight_url'].codes[start:stop]).astype(np.int64) * ROUND_STRIDE + keyed
+    acc['judge_keys'], acc['judge_masks'], acc['judge_counts'] = _reduce_judges(
+        keys[labelled], (1 << cls[labelled]).astype(np.uint8),
+        np.ones(int(np.count_nonzero(labelled)), dtype=np.int64))
+
+    # 7. Era shift: winner's / loser's stat per evaluable round
+    for j, col in enumerate(FOCUS_STATS):
+        f1, f2 = stats[col]
+        for side, vals in enumerate((np.where(cls == F1, f1, f2), np.where(cls == F1, f2, f1))):
+            ok = evaluable & ~np.isnan(vals)
+            acc['era_sums'][:, j, side] = np.bincount(era[ok], weights=vals[ok], minlength=2)
+            acc['era_counts'][:, j, side] = np.bincount(era[ok], minlength=2)
+    return acc
+
+def stream(ds, tables, chunk_rows=CHUNK_ROWS):
+    """One pass over the dataset, merging chunk accumulators into the running total."""
+    total = new_accumulator(len(tables['wc']))
+    n = row_count(ds)
+    for start in range(0, n, chunk_rows):
+        total = merge(total, accumulate(ds, tables, start, min(start + chunk_rows, n)))
+    return total
 
 # ---------------------------------------------------------------------------
 # Analysis functions
@@ -115,130 +274,87 @@ def section(title):
     print(f"  {title}")
     print("=" * 70)
 
-def class_balance(rows):
+def class_balance(acc):
     section("1. CLASS BALANCE")
-    winners = Counter(r['judge_winner'] for r in rows if r['judge_winner'])
-    total = sum(winners.values())
+    winners = acc['winners'].sum(axis=0)
+    total = int(winners[:EMPTY].sum())
     print(f"  Total labelled rows: {total:,}")
     print()
-    for label in ('f1', 'f2', 'draw'):
-        n = winners.get(label, 0)
+    for label, c in (('f1', F1), ('f2', F2), ('draw', DRAW)):
+        n = int(winners[c])
         print(f"  {label:>4}:  {n:>6,}  ({pct(n, total)})")
 
     # Also split by post/pre 2016
     print()
     print("  By era:")
-    for era, label in [('pre-2016', False), ('post-2016', True)]:
-        era_rows = [r for r in rows if r['judge_winner'] and
-                    (r.get('event_date', '') >= '2016-01-01') == label]
-        if not era_rows:
+    for era, e in ERAS:
+        era_winners = acc['winners'][e]
+        era_total = int(era_winners[:EMPTY].sum())
+        if not era_total:
             continue
-        era_total = len(era_rows)
-        f1_n = sum(1 for r in era_rows if r['judge_winner'] == 'f1')
-        f2_n = sum(1 for r in era_rows if r['judge_winner'] == 'f2')
-        draw_n = sum(1 for r in era_rows if r['judge_winner'] == 'draw')
+        f1_n, f2_n, draw_n = (int(era_winners[c]) for c in (F1, F2, DRAW))
         print(f"  {era} (n={era_total:,}):  "
               f"f1={pct(f1_n,era_total)}  f2={pct(f2_n,era_total)}  draw={pct(draw_n,era_total)}")
 
-def ten_eight_analysis(rows):
+def ten_eight_analysis(acc, tables):
     section("2. 10-8 ROUND FREQUENCY")
-    labelled = [r for r in rows if r['judge_winner'] and r['judge_winner'] != 'draw']
-    total = len(labelled)
-    ten_eights = sum(1 for r in labelled if r.get('is_10_8') == '1')
+    total = int(acc['wc_total'].sum())
+    ten_eights = int(acc['wc_10_8'].sum())
     print(f"  10-8 rounds: {ten_eights:,} / {total:,}  ({pct(ten_eights, total)})")
     print()
 
-    # By weight class
-    wc_counts = defaultdict(lambda: [0, 0])  # [10-8 count, total]
-    for r in labelled:
-        wc = r.get('weight_class') or 'Unknown'
-        wc_counts[wc][1] += 1
-        if r.get('is_10_8') == '1':
-            wc_counts[wc][0] += 1
+    # By weight class, in first-appearance order ('' and 'Unknown' share a row)
+    wc_counts = {}
+    for code in np.argsort(acc['wc_first'], kind='stable'):
+        if not acc['wc_total'][code]:
+            continue
+        t8, tot = wc_counts.get(tables['wc'][code], (0, 0))
+        wc_counts[tables['wc'][code]] = (t8 + int(acc['wc_10_8'][code]), tot + int(acc['wc_total'][code]))
 
-    wc_rates = [(wc, c[0], c[1], c[0]/c[1]*100) for wc, c in wc_counts.items() if c[1] >= 50]
+    wc_rates = [(wc, t8, tot, t8/tot*100) for wc, (t8, tot) in wc_counts.items() if tot >= 50]
     wc_rates.sort(key=lambda x: x[3], reverse=True)
     print(f"  {'Weight Class':<35} {'10-8':>6} {'Total':>7} {'Rate':>6}")
     print(f"  {'-'*35} {'-'*6} {'-'*7} {'-'*6}")
     for wc, t8, tot, rate in wc_rates:
         print(f"  {wc:<35} {t8:>6,} {tot:>7,} {rate:>5.1f}%")
 
-def baseline_comparison(rows):
+def baseline_comparison(acc):
     section("3. BASELINE MODEL COMPARISON")
     # Only non-draw rounds where we have a clear judge winner
-    evaluable = [r for r in rows if r['judge_winner'] in ('f1', 'f2')]
-    total = len(evaluable)
+    evaluable = acc['winners'][:, F1] + acc['winners'][:, F2]
+    total = int(evaluable.sum())
     print(f"  Evaluable rounds (excluding draws): {total:,}")
     print()
 
     # Rules-based model
-    rules_agree = sum(1 for r in evaluable if r.get('rules_agrees') == '1')
+    rules_agree = int(acc['rules_agree'].sum())
     print(f"  Rules-based model:               {rules_agree:,}/{total:,}  ({pct(rules_agree, total)})")
 
     # Naive baseline: whoever landed more sig strikes wins
-    naive_correct = 0
-    naive_total = 0
-    for r in evaluable:
-        f1_sig = safe_float(r.get('f1_sig_landed')) or 0
-        f2_sig = safe_float(r.get('f2_sig_landed')) or 0
-        if f1_sig == f2_sig:
-            continue  # skip ties in naive baseline
-        naive_winner = 'f1' if f1_sig > f2_sig else 'f2'
-        naive_total += 1
-        if naive_winner == r['judge_winner']:
-            naive_correct += 1
+    naive_correct, naive_total = (int(v) for v in acc['naive'][NAIVE_COLS.index('sig_landed')])
     print(f"  Naive (more sig strikes wins):   {naive_correct:,}/{naive_total:,}  ({pct(naive_correct, naive_total)})")
 
     # Naive total strikes
-    naive2_correct = 0
-    naive2_total = 0
-    for r in evaluable:
-        f1_tot = safe_float(r.get('f1_total_landed')) or 0
-        f2_tot = safe_float(r.get('f2_total_landed')) or 0
-        if f1_tot == f2_tot:
-            continue
-        n2w = 'f1' if f1_tot > f2_tot else 'f2'
-        naive2_total += 1
-        if n2w == r['judge_winner']:
-            naive2_correct += 1
+    naive2_correct, naive2_total = (int(v) for v in acc['naive'][NAIVE_COLS.index('total_landed')])
     print(f"  Naive (more total strikes wins): {naive2_correct:,}/{naive2_total:,}  ({pct(naive2_correct, naive2_total)})")
 
     # Breakdown by era
     print()
     print("  Rules-based by era:")
-    for era_label, cutoff, direction in [
-        ('pre-2016',  '2016-01-01', False),
-        ('post-2016', '2016-01-01', True),
-    ]:
-        era = [r for r in evaluable
-               if (r.get('event_date','') >= cutoff) == direction]
-        if not era: continue
-        era_agree = sum(1 for r in era if r.get('rules_agrees') == '1')
-        print(f"    {era_label} (n={len(era):,}): {pct(era_agree, len(era))}")
-
-def feature_correlations(rows):
+    for era_label, e in ERAS:
+        n_era = int(evaluable[e])
+        if not n_era: continue
+        print(f"    {era_label} (n={n_era:,}): {pct(int(acc['rules_agree'][e]), n_era)}")
+
+def feature_correlations(acc):
     section("4. FEATURE CORRELATIONS WITH ROUND OUTCOME")
     print("  Point-biserial r: differential stat (f1-f2) vs judge winner (1=f1, 0=f2)")
     print("  Excludes draw rounds. |r| > 0.10 = meaningful signal.")
     print()
 
-    # Only non-draw rounds
-    evaluable = [r for r in rows if r['judge_winner'] in ('f1', 'f2')]
-    labels = [1 if r['judge_winner'] == 'f1' else 0 for r in evaluable]
-
     results = []
     for col in STAT_COLS:
-        f1_col = f'f1_{col}'
-        f2_col = f'f2_{col}'
-        diffs = []
-        for r in evaluable:
-            f1 = safe_float(r.get(f1_col))
-            f2 = safe_float(r.get(f2_col))
-            if f1 is not None and f2 is not None:
-                diffs.append(f1 - f2)
-            else:
-                diffs.append(None)
-        r_val = point_biserial_r(labels, diffs)
+        r_val = point_biserial_r(*acc['moments'][col])
         if r_val is not None:
             results.append((col, r_val))
 
@@ -254,58 +370,29 @@ def feature_correlations(rows):
     print()
     print("  Significance: *** >0.30  ** >0.20  * >0.10")
 
-def round_number_analysis(rows):
+def round_number_analysis(acc):
     section("5. ROUND WINNER DISTRIBUTION BY ROUND NUMBER")
-    evaluable = [r for r in rows if r['judge_winner'] in ('f1', 'f2')]
-
-    by_round = defaultdict(lambda: Counter())
-    for r in evaluable:
-        rnum = r.get('round', '?')
-        by_round[rnum][r['judge_winner']] += 1
-
     print(f"  {'Round':<8} {'f1 wins':>8} {'f2 wins':>8} {'Total':>8} {'f1%':>7} {'Draw%':>7}")
     print(f"  {'-'*8} {'-'*8} {'-'*8} {'-'*8} {'-'*7} {'-'*7}")
 
-    # Also include draws in totals
-    by_round_full = defaultdict(lambda: Counter())
-    for r in rows:
-        if r['judge_winner']:
-            by_round_full[r.get('round', '?')][r['judge_winner']] += 1
-
-    for rnum in sorted(by_round.keys(), key=lambda x: int(x) if str(x).isdigit() else 99):
-        c = by_round[rnum]
-        cf = by_round_full[rnum]
-        f1n, f2n = c['f1'], c['f2']
-        draws = cf.get('draw', 0)
+    for rnum in sorted(acc['rounds']):
+        counts = acc['rounds'][rnum]
+        f1n, f2n, draws = int(counts[F1]), int(counts[F2]), int(counts[DRAW])
+        if not f1n and not f2n:
+            continue
         tot_with_draws = f1n + f2n + draws
         tot = f1n + f2n
         print(f"  {rnum:<8} {f1n:>8,} {f2n:>8,} {tot_with_draws:>8,} {pct(f1n, tot):>7} {pct(draws, tot_with_draws):>7}")
 
-def judge_agreement(rows):
+def judge_agreement(acc):
     section("6. INTER-JUDGE AGREEMENT")
-    # Group by (fight_url, round) -> list of judge_winner values
-    fight_round_judges = defaultdict(list)
-    for r in rows:
-        if r['judge_winner']:
-            key = (r.get('fight_url', ''), r.get('round', ''))
-            fight_round_judges[key].append(r['judge_winner'])
-
-    total_rounds = 0
-    unanimous_rounds = 0
-    split_2_1 = 0
-    all_disagree = 0  # three different verdicts (rare but possible)
-
-    for key, verdicts in fight_round_judges.items():
-        if len(verdicts) < 2:
-            continue
-        total_rounds += 1
-        unique = set(verdicts)
-        if len(unique) == 1:
-            unanimous_rounds += 1
-        elif len(verdicts) == 3 and len(unique) == 2:
-            split_2_1 += 1
-        elif len(verdicts) == 3 and len(unique) == 3:
-            all_disagree += 1
+    n_judges = acc['judge_counts']
+    n_verdicts = POPCOUNT[acc['judge_masks']]
+
+    total_rounds = int(np.count_nonzero(n_judges >= 2))
+    unanimous_rounds = int(np.count_nonzero((n_judges >= 2) & (n_verdicts == 1)))
+    split_2_1 = int(np.count_nonzero((n_judges == 3) & (n_verdicts == 2)))
+    all_disagree = int(np.count_nonzero((n_judges == 3) & (n_verdicts == 3)))  # rare but possible
 
     print(f"  Rounds with 2+ judge scores: {total_rounds:,}")
     print()
@@ -316,40 +403,26 @@ def judge_agreement(rows):
     print("  Note: ML model predicts per-judge, not majority. Split rounds are")
     print("  the hardest cases — exactly where the model adds most value.")
 
-def era_shift(rows):
+def era_shift(acc):
     section("7. POST-2016 CRITERIA SHIFT — STAT DISTRIBUTION CHANGE")
     print("  Do judges weigh stats differently post-2016?")
     print("  Comparing avg stats in rounds where f1 wins vs f2 wins, pre/post 2016.")
     print()
 
-    focus_stats = ['sig_landed', 'kd', 'td_landed', 'ctrl_sec', 'sub_attempts', 'ground_landed']
-
-    for era_label, cutoff, direction in [
-        ('Pre-2016',  '2016-01-01', False),
-        ('Post-2016', '2016-01-01', True),
-    ]:
-        era_rows = [r for r in rows
-                    if r['judge_winner'] in ('f1', 'f2') and
-                    (r.get('event_date','') >= cutoff) == direction]
-        if not era_rows:
+    for era_label, e in [('Pre-2016', 0), ('Post-2016', 1)]:
+        f1_wins, f2_wins = int(acc['winners'][e, F1]), int(acc['winners'][e, F2])
+        if not f1_wins + f2_wins:
             continue
 
-        f1_wins = [r for r in era_rows if r['judge_winner'] == 'f1']
-        f2_wins = [r for r in era_rows if r['judge_winner'] == 'f2']
-
-        print(f"  {era_label}  (n={len(era_rows):,}  f1_wins={len(f1_wins):,}  f2_wins={len(f2_wins):,})")
+        print(f"  {era_label}  (n={f1_wins + f2_wins:,}  f1_wins={f1_wins:,}  f2_wins={f2_wins:,})")
         print(f"  {'Stat':<18} {'Avg winner':>12} {'Avg loser':>12} {'Diff':>10}")
         print(f"  {'-'*18} {'-'*12} {'-'*12} {'-'*10}")
 
-        for col in focus_stats:
-            winner_vals = [safe_float(r.get(f'f1_{col}')) for r in f1_wins] + \
-                          [safe_float(r.get(f'f2_{col}')) for r in f2_wins]
-            loser_vals  = [safe_float(r.get(f'f2_{col}')) for r in f1_wins] + \
-                          [safe_float(r.get(f'f1_{col}')) for r in f2_wins]
-            avg_w = mean(winner_vals)
-            avg_l = mean(loser_vals)
-            if avg_w is None or avg_l is None:
+        for j, col in enumerate(FOCUS_STATS):
+            counts = acc['era_counts'][e, j]
+            if not counts.all():
                 continue
+            avg_w, avg_l = acc['era_sums'][e, j] / counts
             diff = avg_w - avg_l
             print(f"  {col:<18} {avg_w:>12.2f} {avg_l:>12.2f} {diff:>+10.2f}")
         print()
@@ -358,18 +431,19 @@ def era_shift(rows):
 # Main
 # ---------------------------------------------------------------------------
 
-def run(csv_path):
+def run(csv_path, chunk_rows=CHUNK_ROWS):
     print(f"Loading {csv_path} ...")
-    rows = load_csv(csv_path)
-    print(f"Loaded {len(rows):,} rows.\n")
-
-    class_balance(rows)
-    ten_eight_analysis(rows)
-    baseline_comparison(rows)
-    feature_correlations(rows)
-    round_number_analysis(rows)
-    judge_agreement(rows)
-    era_shift(rows)
+    ds, tables = open_dataset(csv_path)
+    acc = stream(ds, tables, chunk_rows)
+    print(f"Loaded {acc['rows']:,} rows.\n")
+
+    class_balance(acc)
+    ten_eight_analysis(acc, tables)
+    baseline_comparison(acc)
+    feature_correlations(acc)
+    round_number_analysis(acc)
+    judge_agreement(acc)
+    era_shift(acc)
 
     print()
     print("=" * 70)
@@ -381,5 +455,7 @@ def run(csv_path):
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='EDA on UFC round scoring ML dataset.')
     parser.add_argument('--csv', default='ml_dataset.csv', help='Input CSV path')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help=f'Rows per streamed chunk (default: {CHUNK_ROWS:,})')
     args = parser.parse_args()
-    run(Path(__file__).parent / args.csv)
+    run(Path(__file__).parent / args.csv, args.chunk_rows)
@@ -0,0 +1,129 @@
+"""
+feature_cache.py — Content-hashed feature store for the scoring-model scripts.
+
+train_scoring_model, compare_models, analyze_10_8_thresholds and eda_report all start from
+the same feature matrix, labels and a handful of metadata columns. This module computes
+them once per (dataset content, feature spec) and keeps them on disk:
+
+  feature_cache/<dataset sha256[:16]>-<spec hash[:12]>/
+    X.npy              float64 (n_rows, 19) — features.feature_matrix over every row
+    y.npy              int8 — 1 = f1, 0 = f2, -1 = draw / no judge score
+    year.npy           int32 event year, -1 = no event_date
+    judge_winner, weight_class, judge, fight_url   text columns (codes + labels)
+    round, rules_agrees, is_10_8                   int16, -1 = empty
+    cache.json         keys, spec, row count, column list
+
+The dataset hash is the CSV's sha256, recorded in the columnar store's schema when the CSV
+is converted (dataset_store.py), so computing the key costs a stat + a small JSON read.
+The spec hash covers DIFF_COLS, RATIO_COLS, the post_2016 cut-off, FEATURE_NAMES and
+FEATURE_SPEC_VERSION (features.py) — editing any of them, or rebuilding the dataset, is a
+new key and the next run recomputes. Hits are memory-mapped. Only the newest MAX_ENTRIES
+entries are kept.
+
+Usage:
+  from feature_cache import load_features
+  fc = load_features('ml_dataset.csv')      # {'X', 'y', 'year', 'judge', ...}
+
+  python feature_cache.py            # list cache entries
+  python feature_cache.py --clear    # delete them all
+"""
+
+import sys
+import json
+import time
+import shutil
+import argparse
+from pathlib import Path
+
+from dataset_store import load_dataset, dataset_hash, read_arrays, write_arrays
+from features import (DIFF_COLS, RATIO_COLS, FEATURE_NAMES, FEATURE_SPEC_VERSION,
+                      POST_2016_FROM, spec_hash, feature_matrix, labels, event_years)
+
+CACHE_DIR = Path(__file__).parent / 'feature_cache'
+MANIFEST = 'cache.json'
+MAX_ENTRIES = 4
+
+# Dataset columns copied into every entry, so consumers need not open the store at all
+META_COLUMNS = ['judge_winner', 'weight_class', 'judge', 'fight_url', 'round', 'rules_agrees', 'is_10_8']
+
+
+def cache_key(csv_path):
+    return f"{dataset_hash(csv_path)[:16]}-{spec_hash()[:12]}"
+
+def _read_manifest(entry):
+    try:
+        with open(entry / MANIFEST, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def compute_features(ds):
+    """Everything a cache entry holds, computed from the columnar dataset."""
+    arrays = {
+        'X':    feature_matrix(ds),
+        'y':    labels(ds),
+        'year': event_years(ds),
+    }
+    for name in META_COLUMNS:
+        arrays[name] = ds[name]
+    return arrays
+
+def load_features(csv_path, verbose=True):
+    """{'X', 'y', 'year', *META_COLUMNS} for the dataset — memory-mapped from the cache,
+    or computed and stored on a miss."""
+    key = cache_key(csv_path)
+    entry = CACHE_DIR / key
+    manifest = _read_manifest(entry)
+    if manifest is not None:
+        t0 = time.perf_counter()
+        fc = read_arrays(entry, manifest)
+        if verbose:
+            print(f"[OK] Feature cache hit {key} ({manifest['rows']:,} rows, "
+                  f"{(time.perf_counter() - t0) * 1000:.0f} ms)")
+        return fc
+
+    t0 = time.perf_counter()
+    arrays = compute_features(load_dataset(csv_path))
+    manifest = {
+        'dataset_sha256': dataset_hash(csv_path),
+        'spec_hash': spec_hash(),
+        'spec': {'version': FEATURE_SPEC_VERSION, 'diff_cols': DIFF_COLS,
+                 'ratio_cols': RATIO_COLS, 'post_2016_from': POST_2016_FROM,
+                 'features': FEATURE_NAMES},
+        'rows': len(arrays['y']),
+        'source': str(Path(csv_path).resolve()),
+    }
+    write_arrays(entry, arrays, manifest, manifest_name=MANIFEST)
+    prune()
+    if verbose:
+        print(f"[OK] Feature cache miss {key} — computed {manifest['rows']:,} rows in "
+              f"{(time.perf_counter() - t0) * 1000:.0f} ms")
+    return read_arrays(entry, _read_manifest(entry))
+
+def entries():
+    """Cache entry dirs, newest first."""
+    if not CACHE_DIR.exists():
+        return []
+    dirs = [d for d in CACHE_DIR.iterdir() if d.is_dir() and (d / MANIFEST).exists()]
+    return sorted(dirs, key=lambda d: (d / MANIFEST).stat().st_mtime, reverse=True)
+
+def prune(keep=MAX_ENTRIES):
+    for d in entries()[keep:]:
+        shutil.rmtree(d, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    parser = argparse.ArgumentParser(description='Inspect / clear the scoring-model feature cache.')
+    parser.add_argument('--clear', action='store_true', help='Delete every cache entry')
+    args = parser.parse_args()
+
+    if args.clear:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print(f"[OK] Cleared {CACHE_DIR}")
+    else:
+        for d in entries():
+            m = _read_manifest(d)
+            size = sum(f.stat().st_size for f in d.iterdir())
+            print(f"  {d.name}  {m['rows']:>8,} rows  {size / 1e6:>7.1f} MB  {m['source']}")
+        print(f"{len(entries())} entries in {CACHE_DIR} (spec {spec_hash()[:12]})")
@@ -0,0 +1,142 @@
+"""
+features.py — Vectorized feature pipeline for the round-scoring model.
+
+Builds the 19-feature matrix (13 stat differentials, 5 ratios, post_2016 flag), the labels
+and the symmetric mirror as whole-column NumPy operations on the columnar dataset
+(dataset_store.py). Shared by train_scoring_model.py, compare_models.py and
+analyze_10_8_thresholds.py, which used to build each vector in a per-row Python loop.
+
+Bit-identical to the per-row code: every element goes through the same IEEE operations in
+the same order (f1 - f2, f1 / ((f1 + f2) + 1.0), -d, 1.0 - r), and empty / non-finite stat
+cells become 0.0 exactly like safe_float(). bench_features.py (repo root) checks this.
+
+Usage:
+  from features import feature_matrix, labels, augment
+  X = feature_matrix(ds)           # float64 (n_rows, 19)
+  y = labels(ds)                   # int8: 1 = f1, 0 = f2, -1 = draw / no score
+"""
+
+import json
+import math
+import hashlib
+
+import numpy as np
+
+from dataset_store import decode
+
+# Differential features: we compute (f1_stat - f2_stat) for each
+# Dropped: reversals (r=0.006 in EDA — zero signal)
+# Dropped: total_landed/attempted (correlated with sig_landed, adds noise to LR)
+# Dropped: sig_attempted (captured by sig_pct)
+DIFF_COLS = [
+    'kd',
+    'sig_landed',
+    'sig_pct',
+    'head_landed',
+    'body_landed',
+    'leg_landed',
+    'dist_landed',
+    'clinch_landed',
+    'ground_landed',
+    'td_landed',
+    'td_pct',
+    'ctrl_sec',
+    'sub_attempts',
+]
+
+# Ratio features: f1_stat / (f1_stat + f2_stat + 1) — bounded [0, 1]
+# Captures relative dominance independent of fight pace
+RATIO_COLS = ['sig_landed', 'head_landed', 'td_landed', 'ctrl_sec', 'ground_landed']
+
+# All feature names (in order) — used for JSON export and JS integration
+FEATURE_NAMES = (
+    [f'{c}_diff' for c in DIFF_COLS]
+    + [f'{c}_ratio' for c in RATIO_COLS]
+    + ['post_2016']
+)
+
+POST_2016_FROM = '2016-01-01'
+
+# Bump when feature_matrix / labels change in a way the constants above do not capture —
+# feature_cache.py keys cached matrices on spec_hash()
+FEATURE_SPEC_VERSION = 1
+
+def spec_hash():
+    spec = {'version': FEATURE_SPEC_VERSION, 'diff_cols': DIFF_COLS, 'ratio_cols': RATIO_COLS,
+            'post_2016_from': POST_2016_FROM, 'features': FEATURE_NAMES}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+# ---------------------------------------------------------------------------
+# Columns
+# ---------------------------------------------------------------------------
+
+def _select(arr, rows):
+    return np.asarray(arr) if rows is None else np.asarray(arr)[rows]
+
+def stat_column(ds, col, rows=None):
+    """Float stat column with empty / non-finite cells as 0.0 (safe_float semantics)."""
+    v = _select(ds[col], rows)
+    return np.where(np.isfinite(v), v, 0.0)
+
+def event_years(ds):
+    """Per-row event year, -1 where event_date is empty (decoded once per distinct date)."""
+    dates = ds['event_date']
+    label_years = np.array([int(d[:4]) if d else -1 for d in dates.labels.tolist()], dtype=np.int32)
+    return label_years[dates.codes]
+
+def post_2016(ds, rows=None):
+    dates = ds['event_date']
+    flag_by_label = np.where(np.asarray(dates.labels) >= POST_2016_FROM, 1.0, 0.0)
+    return flag_by_label[_select(dates.codes, rows)]
+
+def labels(ds, rows=None):
+    """int8 label per row: 1 = f1 won the round, 0 = f2, -1 = draw / no judge score."""
+    winner = decode(ds['judge_winner']) if rows is None else \
+        ds['judge_winner'].labels[_select(ds['judge_winner'].codes, rows)]
+    return np.where(winner == 'f1', 1, np.where(winner == 'f2', 0, -1)).astype(np.int8)
+
+# ---------------------------------------------------------------------------
+# Features
+# ---------------------------------------------------------------------------
+
+def feature_matrix(ds, rows=None):
+    """(n, len(FEATURE_NAMES)) float64 matrix for all rows, or the given row indices."""
+    n = len(_select(ds['event_date'].codes, rows))
+    X = np.empty((n, len(FEATURE_NAMES)), dtype=np.float64)
+    for j, col in enumerate(DIFF_COLS):
+        X[:, j] = stat_column(ds, f'f1_{col}', rows) - stat_column(ds, f'f2_{col}', rows)
+    base = len(DIFF_COLS)
+    for j, col in enumerate(RATIO_COLS):
+        f1 = stat_column(ds, f'f1_{col}', rows)
+        f2 = stat_column(ds, f'f2_{col}', rows)
+        X[:, base + j] = f1 / (f1 + f2 + 1.0)
+    X[:, -1] = post_2016(ds, rows)
+    return X
+
+def augment(X, y):
+    """
+    Symmetric augmentation: X stacked on its mirror — diffs negated, ratios flipped
+    (1 - ratio), post_2016 unchanged — and y on 1 - y. Originals first, then mirrors.
+    """
+    n_diff = len(DIFF_COLS)
+    n_ratio = len(RATIO_COLS)
+    X_mirror = np.empty_like(X)
+    X_mirror[:, :n_diff] = -X[:, :n_diff]
+    X_mirror[:, n_diff:n_diff + n_ratio] = 1.0 - X[:, n_diff:n_diff + n_ratio]
+    X_mirror[:, n_diff + n_ratio:] = X[:, n_diff + n_ratio:]
+    return np.vstack([X, X_mirror]), np.concatenate([y, 1 - y])
+
+# ---------------------------------------------------------------------------
+# Scoring (exported LR model)
+# ---------------------------------------------------------------------------
+
+def lr_probability(X, model):
+    """P(f1 wins) per row from scoring_model.json, accumulated in the same order as the
+    per-row Python scorer. The sigmoid uses math.exp per row — np.exp differs in the last
+    ulp for some inputs, which would move rounds across the confidence buckets."""
+    scaled = (X - np.asarray(model['scaler_mean'])) / np.asarray(model['scaler_std'])
+    logit = np.zeros(len(X))
+    for i, coef in enumerate(model['coefficients']):
+        logit = logit + coef * scaled[:, i]
+    logit = logit + model['intercept']
+    return np.array([1 / (1 + math.exp(-v)) for v in logit.tolist()])
@@ -0,0 +1,283 @@
+"""
+model_registry.py — Versioned, content-hashed store for the exported scoring model.
+
+export_model used to overwrite scoring_model.json in place, so nothing downstream could tell
+which model produced a prediction or cache-bust a stale copy. Every export is now published
+here as an immutable artifact named by its content hash:
+
+  model_registry/
+    <hash>.bin     compact binary model (below)
+    <hash>.json    manifest — features, feature spec hash, training window, metrics,
+                   dataset sha256, parent artifact, encoding
+    index.json     {"current": <hash>, "models": [summary per artifact, oldest first]}
+
+<hash> is the first HASH_CHARS hex chars of the .bin's sha256. The same files are mirrored to
+public/models/scoring/ (WEB_DIR) for the web bundle, which reads current.json there and can
+cache <hash>.bin forever (src/modelRegistry.js).
+
+Binary layout (little-endian, 16-byte header, float32 payload):
+  magic 'UFCM' | u16 FORMAT_VERSION | u16 n_features | first 8 bytes of features.spec_hash()
+  float32 coefficients[n] | float32 intercept | float32 scaler_mean[n] | float32 scaler_std[n]
+
+19 features → 248 bytes. scoring_model.json stays as the readable view of the current entry
+(publish rewrites its coefficients / scaler with the float32 values and an "artifact" key), so
+the JSON, the registry and the web copy all score identically.
+
+Loader: load_model(ref) resolves 'current' / a hash (prefix) to the artifact and parses it once
+per hash per process — batch scorers call it freely.
+
+Usage:
+  from model_registry import load_model
+  model = load_model()                        # current; model['artifact'] = hash
+
+  python model_registry.py                    # list published models
+  python model_registry.py --publish          # publish scoring_model.json as it is now
+  python model_registry.py --use <hash>       # make an older artifact current (rollback)
+"""
+
+import sys
+import os
+import json
+import struct
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from features import FEATURE_NAMES, spec_hash
+
+SCRIPT_DIR = Path(__file__).parent
+REGISTRY_DIR = SCRIPT_DIR / 'model_registry'
+WEB_DIR = SCRIPT_DIR.parent / 'public' / 'models' / 'scoring'
+JSON_VIEW = SCRIPT_DIR / 'scoring_model.json'
+INDEX = 'index.json'
+WEB_CURRENT = 'current.json'
+
+MAGIC = b'UFCM'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHH8s')
+HASH_CHARS = 16
+
+# Manifest fields copied from the export payload (training window + metrics)
+MANIFEST_FIELDS = [
+    'model_type', 'version', 'trained_at', 'training_years', 'trained_through',
+    'n_training_rows_pre_augmentation', 'holdout_years', 'holdout_accuracy', 'holdout_log_loss',
+    'reference_holdout_accuracy', 'reference_holdout_log_loss',
+    'rules_baseline_accuracy', 'naive_sig_strikes_accuracy', 'incremental_update', 'notes',
+]
+# Index summary per artifact
+SUMMARY_FIELDS = ['version', 'trained_at', 'trained_through', 'holdout_accuracy', 'published_at']
+
+_MODELS = {}  # artifact hash -> parsed model (load_model memo)
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def encode(model):
+    """Binary artifact for a model dict (coefficients, intercept, scaler_mean, scaler_std)."""
+    n = len(model['coefficients'])
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, n, bytes.fromhex(spec_hash()[:16]))
+    body = np.concatenate([model['coefficients'], [model['intercept']],
+                           model['scaler_mean'], model['scaler_std']]).astype('<f4')
+    return header + body.tobytes()
+
+def decode(raw):
+    """Model arrays (float64) from a binary artifact."""
+    magic, fmt, n, spec = HEADER.unpack_from(raw)
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        raise ValueError(f"not a format-{FORMAT_VERSION} scoring model artifact")
+    if len(raw) != HEADER.size + 4 * (3 * n + 1):
+        raise ValueError(f"artifact is {len(raw)} bytes, expected {HEADER.size + 4 * (3 * n + 1)}")
+    values = np.frombuffer(raw, dtype='<f4', offset=HEADER.size).astype(np.float64)
+    return {
+        'coefficients': values[:n],
+        'intercept':    float(values[n]),
+        'scaler_mean':  values[n + 1:2 * n + 1],
+        'scaler_std':   values[2 * n + 1:],
+        'spec_hash':    spec.hex(),
+    }
+
+def artifact_hash(raw):
+    return hashlib.sha256(raw).hexdigest()[:HASH_CHARS]
+
+# ---------------------------------------------------------------------------
+# Files
+# ---------------------------------------------------------------------------
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    if isinstance(data, bytes):
+        tmp.write_bytes(data)
+    else:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+    os.replace(tmp, path)
+
+def read_index(registry=REGISTRY_DIR):
+    try:
+        with open(Path(registry) / INDEX, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'current': None, 'models': []}
+
+def read_manifest(artifact, registry=REGISTRY_DIR):
+    with open(Path(registry) / f'{artifact}.json', encoding='utf-8') as f:
+        return json.load(f)
+
+def resolve(ref='current', registry=REGISTRY_DIR):
+    """Artifact hash for 'current', a full hash or a unique prefix."""
+    index = read_index(registry)
+    if ref == 'current':
+        if not index['current']:
+            raise FileNotFoundError(f"no model published in {registry} — "
+                                    f"run python model_registry.py --publish")
+        return index['current']
+    matches = [m['artifact'] for m in index['models'] if m['artifact'].startswith(ref)]
+    if len(matches) != 1:
+        raise KeyError(f"{ref!r} matches {len(matches)} published models")
+    return matches[0]
+
+# ---------------------------------------------------------------------------
+# Publish
+# ---------------------------------------------------------------------------
+
+def _json_view(payload, model, artifact):
+    """scoring_model.json contents for a published model: the export payload with the
+    float32-exact arrays the artifact holds, keys in export order."""
+    trailing = ['incremental_update', 'notes']
+    view = {k: payload[k] for k in MANIFEST_FIELDS if k in payload and k not in trailing}
+    view.update({
+        'features':     payload['features'],
+        'coefficients': [float(c) for c in model['coefficients']],
+        'intercept':    model['intercept'],
+        'scaler_mean':  [float(m) for m in model['scaler_mean']],
+        'scaler_std':   [float(s) for s in model['scaler_std']],
+    })
+    view.update({k: payload[k] for k in trailing if k in payload})
+    view['artifact'] = artifact
+    return view
+
+def publish(payload, dataset_sha256=None, registry=REGISTRY_DIR, web_dir=WEB_DIR,
+            json_view=JSON_VIEW, make_current=True):
+    """Store an export payload (scoring_model.json shape) as an artifact + manifest, point
+    the index (and the web copy) at it and rewrite the JSON view. Returns the hash.
+    Publishing an identical model again only moves 'current'."""
+    if payload['features'] != FEATURE_NAMES:
+        raise ValueError("payload features differ from features.FEATURE_NAMES")
+    registry = Path(registry)
+    raw = encode(payload)
+    artifact = artifact_hash(raw)
+    index = read_index(registry)
+
+    if not (registry / f'{artifact}.bin').exists():
+        manifest = {
+            'artifact':       artifact,
+            'sha256':         hashlib.sha256(raw).hexdigest(),
+            'bytes':          len(raw),
+            'encoding':       {'format': FORMAT_VERSION, 'dtype': 'float32le', 'header_bytes': HEADER.size,
+                               'layout': ['coefficients', 'intercept', 'scaler_mean', 'scaler_std']},
+            'features':       FEATURE_NAMES,
+            'spec_hash':      spec_hash(),
+            'dataset_sha256': dataset_sha256,
+            'parent':         index['current'],
+            'published_at':   datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        manifest.update({k: payload[k] for k in MANIFEST_FIELDS if k in payload})
+        _write(registry / f'{artifact}.bin', raw)
+        _write(registry / f'{artifact}.json', manifest)
+        index['models'].append({'artifact': artifact,
+                                **{k: manifest[k] for k in SUMMARY_FIELDS if k in manifest}})
+    if make_current:
+        set_current(artifact, registry, web_dir, json_view, index=index, payload=payload)
+    else:
+        _write(registry / INDEX, index)
+    return artifact
+
+def set_current(artifact, registry=REGISTRY_DIR, web_dir=WEB_DIR, json_view=JSON_VIEW,
+                index=None, payload=None):
+    """Point the index, the web copy and scoring_model.json at a published artifact."""
+    registry = Path(registry)
+    index = index or read_index(registry)
+    index['current'] = artifact
+    _write(registry / INDEX, index)
+
+    manifest = read_manifest(artifact, registry)
+    raw = (registry / f'{artifact}.bin').read_bytes()
+    if web_dir is not None:
+        web_dir = Path(web_dir)
+        if not (web_dir / f'{artifact}.bin').exists():
+            _write(web_dir / f'{artifact}.bin', raw)
+            _write(web_dir / f'{artifact}.json', manifest)
+        _write(web_dir / WEB_CURRENT, {'artifact': artifact, 'sha256': manifest['sha256'],
+                                       'version': manifest.get('version'),
+                                       'features': manifest['features']})
+    if json_view is not None:
+        if payload is None:
+            payload = {'features': manifest['features'],
+                       **{k: manifest[k] for k in MANIFEST_FIELDS if k in manifest}}
+        _write(Path(json_view), _json_view(payload, decode(raw), artifact))
+
+# ---------------------------------------------------------------------------
+# Loader
+# ---------------------------------------------------------------------------
+
+def load_model(ref='current', registry=REGISTRY_DIR):
+    """Parsed model for a registry reference — a scoring_model.json-shaped dict (features,
+    coefficients, intercept, scaler_mean, scaler_std + manifest fields) with
+    model['artifact'] = hash. Parsed once per hash per process; treat it as read-only."""
+    artifact = resolve(ref, registry)
+    model = _MODELS.get(artifact)
+    if model is not None:
+        return model
+
+    raw = (Path(registry) / f'{artifact}.bin').read_bytes()
+    manifest = read_manifest(artifact, registry)
+    if hashlib.sha256(raw).hexdigest() != manifest['sha256']:
+        raise ValueError(f"artifact {artifact} does not match its manifest sha256")
+    model = dict(manifest)
+    model.update(decode(raw))
+    if model['spec_hash'] != spec_hash()[:16] or model['features'] != FEATURE_NAMES:
+        raise ValueError(f"artifact {artifact} was trained on another feature spec — retrain first")
+    _MODELS[artifact] = model
+    return model
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def list_models(registry=REGISTRY_DIR):
+    index = read_index(registry)
+    if not index['models']:
+        print(f"[..] No models published in {registry}")
+        return
+    print(f"  {'':2}{'Artifact':<18}{'Version':<9}{'Trained at':<12}{'Through':<12}{'Holdout':>9}")
+    for m in reversed(index['models']):
+        mark = '* ' if m['artifact'] == index['current'] else '  '
+        acc = m.get('holdout_accuracy')
+        print(f"  {mark}{m['artifact']:<18}{m.get('version') or '?':<9}{m.get('trained_at') or '?':<12}"
+              f"{m.get('trained_through') or '?':<12}{f'{acc*100:.2f}%' if acc else '?':>9}")
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    parser = argparse.ArgumentParser(description='Inspect / publish / roll back scoring model artifacts.')
+    parser.add_argument('--publish', action='store_true',
+                        help='Publish scoring_model.json as it is now and make it current')
+    parser.add_argument('--use', metavar='HASH', help='Make a published artifact current')
+    args = parser.parse_args()
+
+    if args.publish:
+        with open(JSON_VIEW, encoding='utf-8') as f:
+            payload = json.load(f)
+        artifact = publish(payload)
+        print(f"[OK] Published {artifact} — current")
+    elif args.use:
+        artifact = resolve(args.use)
+        set_current(artifact)
+        print(f"[OK] {artifact} is current (scoring_model.json + web copy rewritten)")
+    list_models()
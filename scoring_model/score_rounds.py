@@ -0,0 +1,266 @@
+"""
+score_rounds.py — Batch round scoring into the round_predictions table.
+
+The exported logistic model (scoring_model.json) is otherwise evaluated one round at a time
+in the browser (FightDetailView.scoreRound). This script loads it once, pairs every
+round_fight_stats row with its opponent's through fight_meta_details (fighter1 / fighter2 on
+the same event + round — the join ml_dataset_rows and the frontend use), builds the whole
+feature matrix with features.feature_matrix and scores it with features.lr_probability:
+
+  round_predictions (fight_url, round) -> p_f1, confidence, is_10_8_predicted,
+                                          model_version, stats_at, scored_at
+
+Same semantics as scoreRound: a round is scored when either fighter has stats (missing stats
+count as 0), confidence = max(p, 1 - p), 10-8 when confidence >= TEN_EIGHT_THRESHOLD.
+The model comes from the registry (model_registry.load_model, parsed once per artifact);
+model_version is its "version" plus the artifact hash, so a retrain that forgets to bump the
+version still gets new predictions.
+
+Incremental (default): stats_at is the newest round_fight_stats.inserted_at behind each
+prediction. Rounds whose stats were inserted since the newest stats_at of the current model
+version (minus WATERMARK_OVERLAP_DAYS) are re-scored — every fight on an event that got new
+stats. No predictions for the current model version → full rescore. The master pipeline runs
+this after Phase 4.
+
+Table: supabase/migrate_round_predictions.py
+
+Usage:
+  python score_rounds.py               # incremental
+  python score_rounds.py --full        # every round (run after exporting a new model)
+  python score_rounds.py --dry-run     # score and report, write nothing
+  python score_rounds.py --model <hash> --full   # score with a specific registry artifact
+"""
+
+import sys
+import os
+import time
+import argparse
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("[ERROR] numpy is required.")
+    print("  Install: pip install numpy")
+    sys.exit(1)
+
+from dataset_store import TextColumn
+from features import DIFF_COLS, RATIO_COLS, feature_matrix, lr_probability
+import model_registry
+
+ROOT = Path(__file__).parent.parent  # ufc-web-app/
+
+# Same cut-off as FightDetailView.js scoreRound (see analyze_10_8_thresholds.py)
+TEN_EIGHT_THRESHOLD = 0.99
+
+UPSERT_BATCH = 500
+WATERMARK_OVERLAP_DAYS = 2
+
+# ml_dataset short name -> round_fight_stats column, for the stats the features read
+# (subset of build_ml_dataset.STAT_MAP)
+STAT_COLUMNS = {
+    'kd':            'kd',
+    'sig_landed':    'sig_strikes_landed',
+    'sig_pct':       'sig_strike_pct',
+    'head_landed':   'sig_strikes_head_landed',
+    'body_landed':   'sig_strikes_body_landed',
+    'leg_landed':    'sig_strikes_leg_landed',
+    'dist_landed':   'sig_strikes_distance_landed',
+    'clinch_landed': 'sig_strikes_clinch_landed',
+    'ground_landed': 'sig_strikes_ground_landed',
+    'td_landed':     'takedowns_landed',
+    'td_pct':        'takedown_pct',
+    'ctrl_sec':      'control_time_sec',
+    'sub_attempts':  'sub_attempts',
+}
+STATS_SELECT = 'event_name, fighter_name, round, inserted_at, ' + ', '.join(STAT_COLUMNS.values())
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+def load_model(ref='current'):
+    """(model dict, model_version) for a registry reference (default: the current artifact)."""
+    try:
+        model = model_registry.load_model(ref)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"[ERROR] Scoring model: {e}")
+        sys.exit(1)
+    return model, f"{model.get('version') or '0'}+{model['artifact']}"
+
+# ---------------------------------------------------------------------------
+# Pairing + scoring (no database access)
+# ---------------------------------------------------------------------------
+
+def pair_rounds(meta_rows, stats_rows, event_dates):
+    """One entry per (fight_url, round) with stats for either fighter:
+    [(fight_url, round, f1 stats row | None, f2 stats row | None, event_date)]."""
+    stats_index = {(s['event_name'], s['fighter_name'], s['round']): s for s in stats_rows}
+    rounds_by_fighter = defaultdict(set)
+    for s in stats_rows:
+        rounds_by_fighter[(s['event_name'], s['fighter_name'])].add(s['round'])
+
+    pairs = []
+    for m in meta_rows:
+        ev = m['event_name']
+        f1, f2 = m['fighter1_name'], m['fighter2_name']
+        for rnd in sorted(rounds_by_fighter.get((ev, f1), set()) | rounds_by_fighter.get((ev, f2), set())):
+            pairs.append((m['fight_url'], rnd, stats_index.get((ev, f1, rnd)),
+                          stats_index.get((ev, f2, rnd)), event_dates.get(ev) or ''))
+    return pairs
+
+def _stat_array(pairs, side, db_col):
+    """float64 column, NaN where the fighter has no stats row or the cell is empty."""
+    out = np.full(len(pairs), np.nan)
+    for i, p in enumerate(pairs):
+        s = p[side]
+        if s is not None and s.get(db_col) is not None:
+            out[i] = float(s[db_col])
+    return out
+
+def pairs_dataset(pairs):
+    """The pairs as a dataset_store-shaped dict — the columns features.feature_matrix reads."""
+    ds = {}
+    for short in set(DIFF_COLS) | set(RATIO_COLS):
+        ds[f'f1_{short}'] = _stat_array(pairs, 2, STAT_COLUMNS[short])
+        ds[f'f2_{short}'] = _stat_array(pairs, 3, STAT_COLUMNS[short])
+    labels, codes = np.unique(np.array([p[4] for p in pairs], dtype=str), return_inverse=True)
+    ds['event_date'] = TextColumn(codes.reshape(-1).astype(np.int32), labels)
+    return ds
+
+def score_pairs(pairs, model):
+    """(p_f1, confidence, is_10_8_predicted) arrays, one entry per pair."""
+    if not pairs:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=bool)
+    p_f1 = lr_probability(feature_matrix(pairs_dataset(pairs)), model)
+    confidence = np.maximum(p_f1, 1 - p_f1)
+    return p_f1, confidence, confidence >= TEN_EIGHT_THRESHOLD
+
+def prediction_rows(pairs, p_f1, confidence, is_10_8, model_version, scored_at):
+    rows = []
+    for i, (fight_url, rnd, s1, s2, _) in enumerate(pairs):
+        stamps = [s['inserted_at'] for s in (s1, s2) if s is not None and s.get('inserted_at')]
+        rows.append({
+            'fight_url':         fight_url,
+            'round':             rnd,
+            'p_f1':              float(p_f1[i]),
+            'confidence':        float(confidence[i]),
+            'is_10_8_predicted': bool(is_10_8[i]),
+            'model_version':     model_version,
+            'stats_at':          max(stamps) if stamps else None,
+            'scored_at':         scored_at,
+        })
+    return rows
+
+# ---------------------------------------------------------------------------
+# Database
+# ---------------------------------------------------------------------------
+
+def event_date_map(events):
+    """event_name -> earliest event_date (as ml_dataset_rows' DISTINCT ON picks)."""
+    dates = {}
+    for e in events:
+        d = e.get('event_date')
+        if d and (e['event_name'] not in dates or d < dates[e['event_name']]):
+            dates[e['event_name']] = d
+    return dates
+
+def _chunks(items, size=50):
+    items = sorted(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def stats_watermark(db, model_version):
+    """Newest stats_at among predictions of this model version, or None."""
+    res = (db.table('round_predictions').select('stats_at')
+           .eq('model_version', model_version).not_.is_('stats_at', 'null')
+           .order('stats_at', desc=True).limit(1).execute())
+    return res.data[0]['stats_at'] if res.data else None
+
+def load_all(db):
+    from bulk_reader import read_tables
+    print("[..] Fetching fight_meta_details, round_fight_stats, ufc_events (concurrent keyset reads) ...")
+    tables = read_tables({
+        'meta':   ('fight_meta_details', 'fight_url, event_name, fighter1_name, fighter2_name'),
+        'stats':  ('round_fight_stats', STATS_SELECT),
+        'events': ('ufc_events', 'event_name, event_date'),
+    })
+    return tables['meta'], tables['stats'], tables['events']
+
+def load_changed(db, since):
+    """Source rows for every event with round_fight_stats inserted since `since`."""
+    from bulk_reader import fetch_rows
+    events = {r['event_name'] for r in
+              fetch_rows(db, 'round_fight_stats', 'event_name', [('gte', 'inserted_at', since)])}
+    print(f"[..] {len(events):,} events with round stats inserted since {since}")
+    meta, stats, event_rows = [], [], []
+    for chunk in _chunks(events):
+        flt = [('in_', 'event_name', chunk)]
+        meta.extend(fetch_rows(db, 'fight_meta_details',
+                               'fight_url, event_name, fighter1_name, fighter2_name', flt))
+        stats.extend(fetch_rows(db, 'round_fight_stats', STATS_SELECT, flt))
+        event_rows.extend(fetch_rows(db, 'ufc_events', 'event_name, event_date', flt))
+    return meta, stats, event_rows
+
+def upsert_predictions(db, rows):
+    for i in range(0, len(rows), UPSERT_BATCH):
+        db.table('round_predictions').upsert(rows[i:i + UPSERT_BATCH], on_conflict='fight_url,round').execute()
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def run(db, full=False, dry_run=False, model_ref='current'):
+    model, model_version = load_model(model_ref)
+    print(f"[OK] Model {model_version} ({model.get('trained_at', '?')})")
+
+    since = None
+    if not full:
+        mark = stats_watermark(db, model_version)
+        if mark is None:
+            print(f"[..] No predictions for {model_version} yet — scoring every round")
+        else:
+            since = (date.fromisoformat(mark[:10]) - timedelta(days=WATERMARK_OVERLAP_DAYS)).isoformat()
+
+    meta, stats, events = load_all(db) if since is None else load_changed(db, since)
+    pairs = pair_rounds(meta, stats, event_date_map(events))
+
+    t0 = time.perf_counter()
+    p_f1, confidence, is_10_8 = score_pairs(pairs, model)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    n_10_8 = int(np.count_nonzero(is_10_8))
+    print(f"[OK] Scored {len(pairs):,} rounds in {elapsed_ms:.0f} ms — "
+          f"{n_10_8:,} predicted 10-8 (confidence >= {TEN_EIGHT_THRESHOLD})")
+
+    if dry_run or not pairs:
+        return len(pairs)
+
+    scored_at = datetime.now(timezone.utc).isoformat()
+    rows = prediction_rows(pairs, p_f1, confidence, is_10_8, model_version, scored_at)
+    t0 = time.perf_counter()
+    upsert_predictions(db, rows)
+    print(f"[OK] Upserted {len(rows):,} round_predictions rows in {time.perf_counter() - t0:.1f}s")
+    return len(rows)
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    parser = argparse.ArgumentParser(description='Score rounds with the registry model into round_predictions.')
+    parser.add_argument('--full', action='store_true', help='Re-score every round, not just new stats')
+    parser.add_argument('--dry-run', action='store_true', help='Score and report without writing')
+    parser.add_argument('--model', default='current',
+                        help='Registry artifact hash (prefix) to score with (default: current)')
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv(ROOT / '.env')
+    sys.path.insert(0, str(ROOT))
+    from bulk_reader import thread_client
+
+    if not os.environ.get('REACT_APP_SUPABASE_URL') or not os.environ.get('SUPABASE_SERVICE_KEY'):
+        print("[ERROR] Missing REACT_APP_SUPABASE_URL or SUPABASE_SERVICE_KEY in .env")
+        sys.exit(1)
+
+    run(thread_client(), full=args.full, dry_run=args.dry_run, model_ref=args.model)
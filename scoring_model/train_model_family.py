@@ -0,0 +1,408 @@
+"""
+train_model_family.py — Per-division and per-judge LR family with shrinkage to the general model.
+
+train_scoring_model.py's per_weight_class / per_judge only evaluate the general model per
+group. This trainer fits a model per division and per judge, each shrunk toward a general
+model so small groups stay close to it:
+
+  minimise  sum(log loss over the group's augmented rows) + lam / 2 * ||w - w_general||^2
+
+w = 19 coefficients + intercept, on features standardised with the exported model's scaler,
+so every family member scores the same scaled vector. w_general is not the exported model
+itself — that one may have seen the selection year or, after --incremental updates, the
+holdout. It is refit here with the exported model's penalty (C = 1, i.e. lam = 1 toward 0)
+on the augmented rows of exactly the years of each stage below. The penalty is centred on the general
+model rather than 0, which sklearn's LogisticRegression cannot express, so the fit is a few
+Newton steps in NumPy (20 parameters, exact Hessian).
+
+Groups: divisions (weight_class cleaned like the master pipeline's parse_weight_class) with
+at least MIN_DIVISION_ROUNDS training rounds, judges with at least MIN_JUDGE_ROUNDS. Every
+group is fit over the whole LAMBDAS path on a process pool (workers memory-map the feature
+cache), twice:
+
+  selection   general + groups fit on TRAIN_FROM .. train_until - 1, scored on the last
+              training year. Per level, lam is the path value with the lowest summed log
+              loss on that year; a level that cannot beat the general model there is
+              dropped (pooled fallback).
+  final       general + groups refit on TRAIN_FROM .. train_until; these weights are
+              exported (row 0 = the refit general model).
+
+The holdout (years after train_until) takes no part in either choice — it is only scored
+for the report, with the final weights.
+
+Bundle (scoring_model_family.json): one coefficient matrix, row 0 = the general model, and
+name -> row indexes per level. Serving picks judge row, else division row, else row 0 —
+two dict lookups (select_row / family_probability below).
+
+Usage:
+  python train_model_family.py
+  python train_model_family.py --train-until 2023 --jobs 4
+  python train_model_family.py --no-export      # report only
+"""
+
+import os
+import sys
+import re
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    print("[ERROR] numpy is required.")
+    print("  Install: pip install numpy")
+    sys.exit(1)
+
+from features import FEATURE_NAMES, augment
+from feature_cache import load_features
+from score_rounds import load_model
+
+SCRIPT_DIR = Path(__file__).parent
+BUNDLE_PATH = SCRIPT_DIR / 'scoring_model_family.json'
+
+TRAIN_FROM = 2013
+TRAIN_UNTIL = 2023   # inclusive; holdout = the years after
+MIN_JUDGE_ROUNDS = 50
+MIN_DIVISION_ROUNDS = 200
+
+# Shrinkage path (penalty weight; the general model is fit with C = 1, i.e. lam = 1 toward 0)
+LAMBDAS = [1.0, 3.0, 10.0, 30.0, 100.0, 300.0, 1000.0, 3000.0]   # ascending
+GENERAL_LAMBDA = 1.0   # the general model's own penalty toward 0 (C = 1)
+NEWTON_MAX_ITER = 50
+NEWTON_TOL = 1e-8
+
+LEVELS = ['division', 'judge']   # fallback order at serving time: judge, division, general
+
+# ---------------------------------------------------------------------------
+# Groups
+# ---------------------------------------------------------------------------
+
+def division(raw):
+    """'UFC Lightweight Title Bout' -> 'Lightweight' (parse_weight_class in the master pipeline)."""
+    clean = re.sub(r'\s*Bout\s*$', '', raw or '', flags=re.I)
+    clean = re.sub(r'\s*(Title|Championship)\s*$', '', clean, flags=re.I)
+    clean = re.sub(r'\s*Title\s*', ' ', clean, flags=re.I)
+    clean = re.sub(r'^UFC\s+Interim\s+', '', clean, flags=re.I)
+    clean = re.sub(r'^UFC\s+', '', clean, flags=re.I)
+    return clean.strip()
+
+def group_keys(fc, level):
+    """Per-row group name for a level ('' = no group), decoded once per distinct label."""
+    if level == 'division':
+        col = fc['weight_class']
+        names = np.array([division(l) for l in col.labels.tolist()] or [''])
+    else:
+        col = fc['judge']
+        names = np.asarray(col.labels)
+    return names[np.asarray(col.codes)]
+
+# ---------------------------------------------------------------------------
+# Shrunk LR (Newton)
+# ---------------------------------------------------------------------------
+
+def _design(X_scaled):
+    return np.hstack([X_scaled, np.ones((len(X_scaled), 1))])
+
+def log_loss_sum(A, y, w):
+    z = A @ w
+    # log(1 + e^z) - y z, overflow-safe
+    return float(np.sum(np.logaddexp(0.0, z) - y * z))
+
+def fit_shrunk(A, y, w0, lam, w_start=None):
+    """argmin_w  sum log loss(A w, y) + lam / 2 ||w - w0||^2  (A includes the intercept column).
+    Newton with backtracking: the objective is strictly convex, the line search keeps the
+    steps from overshooting on near-separable groups."""
+    def objective(w):
+        return log_loss_sum(A, y, w) + 0.5 * lam * float(np.sum((w - w0) ** 2))
+
+    w = np.array(w0 if w_start is None else w_start, dtype=np.float64)
+    eye = np.eye(len(w))
+    f = objective(w)
+    for _ in range(NEWTON_MAX_ITER):
+        p = 1.0 / (1.0 + np.exp(-np.clip(A @ w, -35, 35)))
+        grad = A.T @ (p - y) + lam * (w - w0)
+        if np.abs(grad).max() <= NEWTON_TOL * len(y):
+            break
+        hess = (A * (p * (1 - p))[:, None]).T @ A + lam * eye
+        step = np.linalg.solve(hess, grad)
+        t, decrease = 1.0, float(grad @ step)
+        while t > 1e-10:
+            f_new = objective(w - t * step)
+            if f_new <= f - 1e-4 * t * decrease:
+                break
+            t *= 0.5
+        w, f = w - t * step, f_new
+    return w
+
+# ---------------------------------------------------------------------------
+# Pool workers
+# ---------------------------------------------------------------------------
+
+_fam = None   # worker-local: raw + scaled features, labels, split masks, group keys, priors
+
+def _augmented_design(X, y, mean, std):
+    # Mirror in raw units (ratios flip to 1 - r), then standardise
+    X_aug, y_aug = augment(X, y)
+    return _design((X_aug - mean) / std), y_aug
+
+def general_priors(fc, model, train_until):
+    """(selection prior, final prior): the general LR refit on TRAIN_FROM .. train_until - 1
+    and on TRAIN_FROM .. train_until, with the exported model's scaler and objective."""
+    years, y = np.asarray(fc['year']), np.asarray(fc['y'])
+    labelled = (y >= 0) & (years >= TRAIN_FROM)
+    mean, std = np.asarray(model['scaler_mean']), np.asarray(model['scaler_std'])
+    start = np.append(model['coefficients'], model['intercept']).astype(np.float64)
+    priors = []
+    for rows in (labelled & (years < train_until), labelled & (years <= train_until)):
+        rows = np.flatnonzero(rows)
+        A, y_aug = _augmented_design(np.asarray(fc['X'])[rows], y[rows].astype(np.float64), mean, std)
+        priors.append(fit_shrunk(A, y_aug, np.zeros_like(start), GENERAL_LAMBDA, start))
+    return tuple(priors)
+
+def _family_init(csv_path, train_until, w_select, w_final):
+    global _fam
+    model, _ = load_model()
+    fc = load_features(csv_path, verbose=False)
+    years, y = np.asarray(fc['year']), np.asarray(fc['y'])
+    labelled = (y >= 0) & (years >= TRAIN_FROM)
+    mean, std = np.asarray(model['scaler_mean']), np.asarray(model['scaler_std'])
+    _fam = {
+        'A':     _design((np.asarray(fc['X']) - mean) / std),
+        'X':     fc['X'],
+        'mean':  mean,
+        'std':   std,
+        'y':     y.astype(np.float64),
+        'select': labelled & (years < train_until),
+        'val':    labelled & (years == train_until),
+        'train':  labelled & (years <= train_until),
+        'hold':   labelled & (years > train_until),
+        'keys':  {level: group_keys(fc, level) for level in LEVELS},
+        'w_select': w_select,
+        'w_final':  w_final,
+    }
+
+def _fit_path(f, rows, prior):
+    """Weights over the LAMBDAS path for augmented training rows, shrunk toward prior
+    (warm-started from the previous lam, strong -> weak shrinkage), in LAMBDAS order.
+    No rows: the prior."""
+    if len(rows) == 0:
+        return [prior] * len(LAMBDAS)
+    A, y_aug = _augmented_design(f['X'][rows], f['y'][rows], f['mean'], f['std'])
+    weights, w = [], None
+    for lam in reversed(LAMBDAS):
+        w = fit_shrunk(A, y_aug, prior, lam, w)
+        weights.append(w)
+    return weights[::-1]
+
+def _scores(f, rows, weights):
+    """(log loss sum, correct) per weight vector on un-augmented rows."""
+    A, y = f['A'][rows], f['y'][rows]
+    return ([log_loss_sum(A, y, w) for w in weights],
+            [int(np.count_nonzero((A @ w > 0) == (y == 1))) for w in weights])
+
+def _family_fit(task):
+    """Fit one group over the LAMBDAS path on the selection years and again on every training
+    year. Returns a dict: counts, last-training-year and holdout (log loss sum, correct) per
+    lam, the general model's on both, and the final weights per lam."""
+    level, name = task
+    f = _fam
+    in_group = f['keys'][level] == name
+    sel, val = np.flatnonzero(in_group & f['select']), np.flatnonzero(in_group & f['val'])
+    tr, ho = np.flatnonzero(in_group & f['train']), np.flatnonzero(in_group & f['hold'])
+
+    final = _fit_path(f, tr, f['w_final'])
+    val_loss, val_correct = _scores(f, val, _fit_path(f, sel, f['w_select']))
+    hold_loss, hold_correct = _scores(f, ho, final)
+    (base_val_loss,), (base_val_correct,) = _scores(f, val, [f['w_select']])
+    (base_hold_loss,), (base_hold_correct,) = _scores(f, ho, [f['w_final']])
+    return {
+        'level': level, 'name': name, 'n_train': len(tr), 'n_val': len(val), 'n_hold': len(ho),
+        'weights': final,
+        'val_loss': val_loss, 'val_correct': val_correct,
+        'hold_loss': hold_loss, 'hold_correct': hold_correct,
+        'base_val_loss': base_val_loss, 'base_val_correct': base_val_correct,
+        'base_hold_loss': base_hold_loss, 'base_hold_correct': base_hold_correct,
+    }
+
+# ---------------------------------------------------------------------------
+# Serving
+# ---------------------------------------------------------------------------
+
+def load_family(path=BUNDLE_PATH):
+    """Bundle with the coefficient matrix as an ndarray (row = 19 coefs + intercept)."""
+    with open(path, encoding='utf-8') as f:
+        bundle = json.load(f)
+    bundle['weights'] = np.asarray(bundle['weights'], dtype=np.float64)
+    return bundle
+
+def select_row(bundle, judge=None, weight_class=None):
+    """Row of the most specific model: judge, else division, else 0 (general)."""
+    index = bundle['index']
+    row = index['judge'].get(judge or '')
+    if row is None:
+        row = index['division'].get(division(weight_class), 0)
+    return row
+
+def family_probability(bundle, X, rows):
+    """P(f1 wins) for raw feature rows X, each scored by its own bundle row."""
+    scaled = (np.asarray(X) - np.asarray(bundle['scaler_mean'])) / np.asarray(bundle['scaler_std'])
+    W = bundle['weights'][np.asarray(rows)]
+    z = np.einsum('ij,ij->i', scaled, W[:, :-1]) + W[:, -1]
+    return 1.0 / (1.0 + np.exp(-z))
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def section(t):
+    print(f"\n{'=' * 70}\n  {t}\n{'=' * 70}")
+
+def candidate_groups(fc, train_until):
+    """[(level, name, n_train)] for groups over their level's round threshold."""
+    years, y = np.asarray(fc['year']), np.asarray(fc['y'])
+    train = (y >= 0) & (years >= TRAIN_FROM) & (years <= train_until)
+    out = []
+    for level, min_rounds in (('division', MIN_DIVISION_ROUNDS), ('judge', MIN_JUDGE_ROUNDS)):
+        names, counts = np.unique(group_keys(fc, level)[train], return_counts=True)
+        out.extend((level, str(n), int(c)) for n, c in zip(names, counts) if n and c >= min_rounds)
+    return out
+
+def run(csv_path, train_until=TRAIN_UNTIL, jobs=None, export=True):
+    model, model_version = load_model()
+    if model['features'] != FEATURE_NAMES:
+        print("[ERROR] scoring_model.json features differ from features.FEATURE_NAMES — retrain first")
+        sys.exit(1)
+    fc = load_features(csv_path)
+    groups = candidate_groups(fc, train_until)
+    tasks = [(level, name) for level, name, _ in groups]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks) or 1))
+
+    section(f"MODEL FAMILY  (train {TRAIN_FROM}-{train_until}, holdout {train_until + 1}+, "
+            f"scaler: {model_version})")
+    for level in LEVELS:
+        print(f"  {level:<9} groups: {sum(1 for l, _, _ in groups if l == level):>4}")
+
+    t0 = time.perf_counter()
+    w_select, w_final = general_priors(fc, model, train_until)
+    print(f"  General model refit on {TRAIN_FROM}-{train_until - 1} and {TRAIN_FROM}-{train_until} "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    init_args = (str(csv_path), train_until, w_select, w_final)
+    if jobs == 1:
+        _family_init(*init_args)
+        results = list(map(_family_fit, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_family_init,
+                                 initargs=init_args) as pool:
+            results = list(pool.map(_family_fit, tasks, chunksize=4))
+    print(f"  {2 * len(tasks) * len(LAMBDAS):,} fits ({len(tasks)} groups x {len(LAMBDAS)} lambdas x 2) "
+          f"on {jobs} worker process(es) in {time.perf_counter() - t0:.1f}s")
+
+    # Shrinkage + keep/drop per level: lowest summed log loss on the last training year
+    section(f"SHRINKAGE SELECTION (fit {TRAIN_FROM}-{train_until - 1}, scored on {train_until}; log loss per round)")
+    print(f"  {'Level':<9} {'lambda':>8} {'n rounds':>9} {'General':>9} {'Family':>9} {'Acc gen':>8} {'Acc fam':>8}")
+    chosen = {}
+    for level in LEVELS:
+        res = [r for r in results if r['level'] == level and r['n_val'] > 0]
+        n_val = sum(r['n_val'] for r in res)
+        if not n_val:
+            print(f"  {level:<9} {'—':>8}  no {train_until} rows — not exported")
+            continue
+        loss_by_lam = np.sum([r['val_loss'] for r in res], axis=0)
+        correct_by_lam = np.sum([r['val_correct'] for r in res], axis=0)
+        best = int(np.argmin(loss_by_lam))
+        base_loss = sum(r['base_val_loss'] for r in res)
+        base_acc = sum(r['base_val_correct'] for r in res) / n_val
+        keep = loss_by_lam[best] < base_loss
+        print(f"  {level:<9} {LAMBDAS[best]:>8g} {n_val:>9,} {base_loss / n_val:>9.4f} "
+              f"{loss_by_lam[best] / n_val:>9.4f} {base_acc*100:>7.2f}% "
+              f"{correct_by_lam[best] / n_val * 100:>7.2f}%{'' if keep else '  (no gain — general model kept)'}")
+        if keep:
+            chosen[level] = best
+
+    # Holdout: report only, final weights at the chosen lam
+    section(f"HOLDOUT {train_until + 1}+ (report only — untouched by the selection)")
+    print(f"  {'Level':<9} {'lambda':>8} {'n rounds':>9} {'General':>9} {'Family':>9} {'Acc gen':>8} {'Acc fam':>8}")
+    if not chosen:
+        print("  No level kept — the bundle is the general model only")
+    for level, best in chosen.items():
+        res = [r for r in results if r['level'] == level and r['n_hold'] > 0]
+        n_hold = sum(r['n_hold'] for r in res)
+        if not n_hold:
+            print(f"  {level:<9} {LAMBDAS[best]:>8g}  no holdout rows")
+            continue
+        print(f"  {level:<9} {LAMBDAS[best]:>8g} {n_hold:>9,} "
+              f"{sum(r['base_hold_loss'] for r in res) / n_hold:>9.4f} "
+              f"{sum(r['hold_loss'][best] for r in res) / n_hold:>9.4f} "
+              f"{sum(r['base_hold_correct'] for r in res) / n_hold * 100:>7.2f}% "
+              f"{sum(r['hold_correct'][best] for r in res) / n_hold * 100:>7.2f}%")
+
+    # Bundle: row 0 the refit general model, then every group of the kept levels
+    weights = [w_final]
+    index = {level: {} for level in LEVELS}
+    for r in results:
+        if r['level'] in chosen:
+            index[r['level']][r['name']] = len(weights)
+            weights.append(r['weights'][chosen[r['level']]])
+
+    # Serving policy (judge -> division -> general) vs the general model on the whole holdout
+    bundle = {'weights': np.array(weights), 'index': index,
+              'scaler_mean': model['scaler_mean'], 'scaler_std': model['scaler_std']}
+    years, y = np.asarray(fc['year']), np.asarray(fc['y'])
+    hold = np.flatnonzero((y >= 0) & (years > train_until))
+    if len(hold):
+        judges = group_keys(fc, 'judge')[hold]
+        divisions = group_keys(fc, 'division')[hold]
+        judge_rows = np.array([index['judge'].get(j, -1) for j in judges.tolist()])
+        div_rows = np.array([index['division'].get(d, 0) for d in divisions.tolist()])
+        rows = np.where(judge_rows >= 0, judge_rows, div_rows)
+        X_hold = np.asarray(fc['X'])[hold]
+        p_fam = family_probability(bundle, X_hold, rows)
+        p_gen = family_probability(bundle, X_hold, np.zeros(len(hold), dtype=np.int64))
+        y_hold = y[hold]
+        print(f"\n  Serving policy on {len(hold):,} holdout rounds "
+              f"({np.count_nonzero(rows):,} served by a family model):")
+        print(f"    general {np.mean((p_gen >= 0.5) == (y_hold == 1))*100:.2f}%  →  "
+              f"family {np.mean((p_fam >= 0.5) == (y_hold == 1))*100:.2f}%")
+
+    if not export:
+        return bundle
+    payload = {
+        "model_type": "logistic_regression_family",
+        "trained_at": datetime.now().strftime('%Y-%m-%d'),
+        "training_years": f"{TRAIN_FROM}-{train_until}",
+        "base_model": model_version,
+        "features": FEATURE_NAMES,
+        "scaler_mean": [float(m) for m in model['scaler_mean']],
+        "scaler_std": [float(s) for s in model['scaler_std']],
+        "shrinkage": {level: LAMBDAS[i] for level, i in chosen.items()},
+        "min_rounds": {"division": MIN_DIVISION_ROUNDS, "judge": MIN_JUDGE_ROUNDS},
+        "fallback": ["judge", "division", "general"],
+        "index": index,
+        "weights": [[round(float(v), 8) for v in w] for w in weights],   # 19 coefs + intercept
+    }
+    tmp_path = BUNDLE_PATH.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp_path, BUNDLE_PATH)
+    print(f"\n[OK] {len(weights):,} models → {BUNDLE_PATH.name} "
+          f"({BUNDLE_PATH.stat().st_size / 1024:.0f} KB)")
+    return bundle
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    parser = argparse.ArgumentParser(description='Fit the per-division / per-judge LR family.')
+    parser.add_argument('--csv', default='ml_dataset.csv', help='Input CSV (via its columnar store)')
+    parser.add_argument('--train-until', type=int, default=TRAIN_UNTIL,
+                        help=f'Last training year (default: {TRAIN_UNTIL}); later years are the holdout')
+    parser.add_argument('--jobs', type=int, default=0,
+                        help='Worker processes (default: all cores; 1 = serial)')
+    parser.add_argument('--no-export', action='store_true', help=f'Report only, do not write {BUNDLE_PATH.name}')
+    args = parser.parse_args()
+    run(SCRIPT_DIR / args.csv, args.train_until, args.jobs, export=not args.no_export)
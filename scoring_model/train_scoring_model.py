@@ -1,16 +1,26 @@
 """
 train_scoring_model.py — Phase 3c, Steps 3-7
 
-Trains a UFC round-scoring ML model on ml_dataset.csv.
+Trains a UFC round-scoring ML model on ml_dataset.csv (read through its memory-mapped
+columnar store, dataset_store.py).
 
 Steps covered:
   3. Feature engineering  — stat differentials (f1-f2) + ratio features + post_2016 flag
   4. Symmetric augmentation — mirrors every row to eliminate f1-position bias
   5. Model training       — Logistic Regression, Random Forest, XGBoost (optional)
-  6. Evaluation           — holdout accuracy, year-by-year rolling CV
+  6. Evaluation           — holdout accuracy, year-by-year rolling CV (process pool)
   7. Per-weight-class     — where does the general model struggle?
   8. Per-judge            — which judges are most/least predictable? (50+ round threshold)
-  9. Model export         — scoring_model.json (LR coefficients for client-side JS scoring)
+  9. Model export         — published to model_registry/ (model_registry.py); scoring_model.json
+                            is rewritten as the readable view of the current artifact
+
+--incremental: post-event refresh instead of a full run. Rows newer than the model's
+trained_through are scored with the current model first (neither model has seen them);
+then the exported LR is warm-started from its own coefficients (scaler statistics kept)
+and refit on every labelled row, new ones included. It is exported only if the new rows
+score in line with the last full training's holdout and a validation fit with the rolling
+HOLDOUT_DAYS window held out scores it as well as the newest published model that never saw
+it (see "Incremental update" below). Takes seconds.
 
 Design principle: the model sees ONLY stat differentials between the two fighters in a
 given round. It never sees fighter identity, record, ranking, or position. A model that
@@ -27,17 +37,20 @@ Requirements:
 Usage:
   python train_scoring_model.py
   python train_scoring_model.py --csv ml_dataset.csv --train-until 2023 --no-xgb
+  python train_scoring_model.py --jobs 4      # cap rolling-CV worker processes
+  python train_scoring_model.py --incremental            # warm-start update after an event
+  python train_scoring_model.py --incremental --dry-run  # validate only, do not export
 """
 
 import sys
 import os
-import csv
 import json
 import math
+import time
 import argparse
-from collections import defaultdict
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date, timedelta
+from concurrent.futures import ProcessPoolExecutor
 
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
@@ -49,7 +62,7 @@ try:
     from sklearn.linear_model import LogisticRegression
     from sklearn.ensemble import RandomForestClassifier
     from sklearn.preprocessing import StandardScaler
-    from sklearn.metrics import accuracy_score
+    from sklearn.metrics import accuracy_score, log_loss
 except ImportError:
     print("[ERROR] scikit-learn and numpy are required.")
     print("  Install: pip install scikit-learn numpy")
@@ -61,6 +74,11 @@ try:
 except ImportError:
     HAS_XGB = False
 
+from features import DIFF_COLS, RATIO_COLS, FEATURE_NAMES, augment
+from feature_cache import load_features
+from dataset_store import load_dataset, decode, dataset_hash
+from model_registry import publish, read_index, read_manifest, load_model
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -68,49 +86,15 @@ except ImportError:
 TRAIN_FROM_YEAR = 2013   # inclusive — drops sparse/stale pre-2013 data
 TRAIN_UNTIL_YEAR = 2023  # inclusive — 2024-2025 used as holdout
 HOLDOUT_FROM_YEAR = 2024
+SEED = 42                # random_state for every model — holdout and every CV fold
 
-# Differential features: we compute (f1_stat - f2_stat) for each
-# Dropped: reversals (r=0.006 in EDA — zero signal)
-# Dropped: total_landed/attempted (correlated with sig_landed, adds noise to LR)
-# Dropped: sig_attempted (captured by sig_pct)
-DIFF_COLS = [
-    'kd',
-    'sig_landed',
-    'sig_pct',
-    'head_landed',
-    'body_landed',
-    'leg_landed',
-    'dist_landed',
-    'clinch_landed',
-    'ground_landed',
-    'td_landed',
-    'td_pct',
-    'ctrl_sec',
-    'sub_attempts',
-]
-
-# Ratio features: f1_stat / (f1_stat + f2_stat + 1) — bounded [0, 1]
-# Captures relative dominance independent of fight pace
-RATIO_COLS = ['sig_landed', 'head_landed', 'td_landed', 'ctrl_sec', 'ground_landed']
-
-# All feature names (in order) — used for JSON export and JS integration
-FEATURE_NAMES = (
-    [f'{c}_diff' for c in DIFF_COLS]
-    + [f'{c}_ratio' for c in RATIO_COLS]
-    + ['post_2016']
-)
+# Feature spec (DIFF_COLS, RATIO_COLS, FEATURE_NAMES) lives in features.py — shared with
+# compare_models.py and analyze_10_8_thresholds.py.
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def safe_float(v, default=0.0):
-    try:
-        f = float(v)
-        return f if math.isfinite(f) else default
-    except (TypeError, ValueError):
-        return default
-
 def sigmoid(x):
     return 1.0 / (1.0 + math.exp(-max(-500, min(500, x))))
 
@@ -123,114 +107,41 @@ def section(title):
 def pct(n, total):
     return f"{n/total*100:.1f}%" if total else "n/a"
 
-# ---------------------------------------------------------------------------
-# Step 3: Feature engineering
-# ---------------------------------------------------------------------------
-
-def compute_features(row):
-    """
-    Given a CSV row, compute the full feature vector.
-    Returns (features: list[float], label: int|None, meta: dict)
-    where label=1 means f1 won, label=0 means f2 won, None means draw/unknown.
-    """
-    # Stat differentials
-    diffs = []
-    for col in DIFF_COLS:
-        f1 = safe_float(row.get(f'f1_{col}'))
-        f2 = safe_float(row.get(f'f2_{col}'))
-        diffs.append(f1 - f2)
-
-    # Ratio features
-    ratios = []
-    for col in RATIO_COLS:
-        f1 = safe_float(row.get(f'f1_{col}'))
-        f2 = safe_float(row.get(f'f2_{col}'))
-        ratios.append(f1 / (f1 + f2 + 1.0))
-
-    # Era flag
-    event_date = row.get('event_date', '')
-    post_2016 = 1.0 if event_date >= '2016-01-01' else 0.0
-
-    features = diffs + ratios + [post_2016]
-
-    # Label
-    winner = row.get('judge_winner', '')
-    label = 1 if winner == 'f1' else (0 if winner == 'f2' else None)
-
-    meta = {
-        'event_date': event_date,
-        'weight_class': row.get('weight_class', 'Unknown') or 'Unknown',
-        'judge': row.get('judge', 'Unknown') or 'Unknown',
-        'fight_url': row.get('fight_url', ''),
-        'round': row.get('round', ''),
-        'rules_agrees': row.get('rules_agrees', ''),
-    }
-
-    return features, label, meta
-
-# ---------------------------------------------------------------------------
-# Step 4: Symmetric augmentation
-# ---------------------------------------------------------------------------
+def groups(keys):
+    """Distinct keys in first-appearance order."""
+    uniq, first = np.unique(keys, return_index=True)
+    return [uniq[j].item() for j in np.argsort(first, kind='stable')]
 
-def augment(X, y):
-    """
-    For every row, add a mirrored row:
-      - all diff features negated (ratio features: 1 - ratio)
-      - post_2016 stays the same
-      - label flipped (0 → 1, 1 → 0)
-
-    This forces the training set to be exactly 50/50 and eliminates any
-    positional bias (f1-is-champion effect) from the model intercept.
-    """
-    n_diff = len(DIFF_COLS)
-    n_ratio = len(RATIO_COLS)
-
-    X_mirror = []
-    y_mirror = []
-    for feat, label in zip(X, y):
-        mirrored = (
-            [-f for f in feat[:n_diff]]           # negate diffs
-            + [1.0 - r for r in feat[n_diff:n_diff + n_ratio]]  # flip ratios
-            + [feat[-1]]                           # post_2016 unchanged
-        )
-        X_mirror.append(mirrored)
-        y_mirror.append(1 - label)
-
-    X_aug = X + X_mirror
-    y_aug = y + y_mirror
-    return X_aug, y_aug
+def text_rows(fc, col, rows, default='Unknown'):
+    """Decoded text column for the given rows, empty values replaced by default."""
+    vals = fc[col].labels[np.asarray(fc[col].codes)[rows]]
+    return np.where(vals == '', default, vals)
 
 # ---------------------------------------------------------------------------
-# Data loading
+# Data loading + Steps 3-4 (features.py)
+#
+# feature_matrix(): diffs (f1 - f2), ratios f1 / (f1 + f2 + 1), post_2016 flag, computed
+# column-wise over the whole dataset.
+# augment(): every row mirrored (diffs negated, ratios 1 - r, post_2016 kept, label
+# flipped). This forces the training set to be exactly 50/50 and eliminates any
+# positional bias (f1-is-champion effect) from the model intercept.
 # ---------------------------------------------------------------------------
 
 def load_data(csv_path):
+    """Feature matrix, labels, event year and metadata columns for every row (memory-mapped
+    from the feature cache, computed on the first run for this dataset / feature spec)."""
     print(f"Loading {csv_path} ...")
-    rows = []
-    with open(csv_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
-    print(f"Loaded {len(rows):,} rows.\n")
-    return rows
-
-def build_dataset(rows, year_from, year_until):
-    """Filter rows by year range and compute features. Returns X, y, metas."""
-    X, y, metas = [], [], []
-    for row in rows:
-        d = row.get('event_date', '')
-        if not d:
-            continue
-        year = int(d[:4])
-        if year < year_from or year > year_until:
-            continue
-        feats, label, meta = compute_features(row)
-        if label is None:
-            continue  # skip draws
-        X.append(feats)
-        y.append(label)
-        metas.append(meta)
-    return X, y, metas
+    fc = load_features(csv_path)
+    print(f"Loaded {len(fc['y']):,} rows.\n")
+    return fc
+
+def build_dataset(fc, year_from, year_until):
+    """Rows in the year range with an f1/f2 label (draws skipped). Returns X, y, rows —
+    rows are the dataset row indices, for weight class / judge / rules_agrees lookups."""
+    years = fc['year']
+    rows = np.flatnonzero((years >= 0) & (years >= year_from) & (years <= year_until))
+    rows = rows[fc['y'][rows] >= 0]
+    return fc['X'][rows], fc['y'][rows], rows
 
 # ---------------------------------------------------------------------------
 # Evaluation helpers
@@ -241,35 +152,56 @@ def evaluate(model, scaler, X_raw, y_true):
     y_pred = model.predict(X_scaled)
     return accuracy_score(y_true, y_pred)
 
-def evaluate_rules(metas, labels):
+def evaluate_rules(fc, rows):
     """Rules-based model accuracy using the pre-computed rules_agrees column."""
-    agree = sum(1 for m, l in zip(metas, labels) if m['rules_agrees'] == '1')
-    return agree / len(labels) if labels else 0.0
+    agree = int(np.count_nonzero(np.asarray(fc['rules_agrees'])[rows] == 1))
+    return agree / len(rows) if len(rows) else 0.0
+
+def evaluate_naive(fc, rows):
+    """"More sig strikes wins" accuracy over the rows where sig strikes differ.
+    sig_landed_diff = f1 - f2 exactly, so its sign is the f1 vs f2 comparison."""
+    sig_diff = np.asarray(fc['X'][rows, FEATURE_NAMES.index('sig_landed_diff')])
+    y = np.asarray(fc['y'])[rows]
+    decided = sig_diff != 0
+    total = int(np.count_nonzero(decided))
+    correct = int(np.count_nonzero(decided & ((sig_diff > 0) == (y == 1))))
+    return correct / total if total else 0.0
 
 # ---------------------------------------------------------------------------
 # Training pipeline
 # ---------------------------------------------------------------------------
 
+def make_model(name, n_jobs=-1):
+    """Fresh, unfitted model with the pipeline's hyperparameters. n_jobs only affects
+    speed — RF/XGB results depend on random_state alone."""
+    if name == 'Logistic Regression':
+        return LogisticRegression(C=1.0, max_iter=2000, solver='lbfgs', random_state=SEED)
+    if name == 'Random Forest':
+        return RandomForestClassifier(n_estimators=300, max_depth=None, min_samples_leaf=5,
+                                      n_jobs=n_jobs, random_state=SEED)
+    if name == 'XGBoost':
+        return XGBClassifier(n_estimators=300, max_depth=6, learning_rate=0.05,
+                             subsample=0.8, colsample_bytree=0.8,
+                             use_label_encoder=False, eval_metric='logloss',
+                             n_jobs=n_jobs, random_state=SEED, verbosity=0)
+    raise ValueError(f"Unknown model: {name}")
+
 def train_models(X_train_aug, y_train_aug, X_train_scaled, y_train_raw, use_xgb):
     models = {}
 
     print("  Training Logistic Regression ...")
-    lr = LogisticRegression(C=1.0, max_iter=2000, solver='lbfgs', random_state=42)
+    lr = make_model('Logistic Regression')
     lr.fit(X_train_aug, y_train_aug)
     models['Logistic Regression'] = lr
 
     print("  Training Random Forest ...")
-    rf = RandomForestClassifier(n_estimators=300, max_depth=None, min_samples_leaf=5,
-                                 n_jobs=-1, random_state=42)
+    rf = make_model('Random Forest')
     rf.fit(X_train_aug, y_train_aug)
     models['Random Forest'] = rf
 
     if use_xgb and HAS_XGB:
         print("  Training XGBoost ...")
-        xgb = XGBClassifier(n_estimators=300, max_depth=6, learning_rate=0.05,
-                             subsample=0.8, colsample_bytree=0.8,
-                             use_label_encoder=False, eval_metric='logloss',
-                             random_state=42, verbosity=0)
+        xgb = make_model('XGBoost')
         xgb.fit(X_train_aug, y_train_aug)
         models['XGBoost'] = xgb
     elif use_xgb and not HAS_XGB:
@@ -279,73 +211,99 @@ def train_models(X_train_aug, y_train_aug, X_train_scaled, y_train_raw, use_xgb)
 
 # ---------------------------------------------------------------------------
 # Year-by-year rolling cross-validation
+#
+# Every (test year, model) pair is one task on a process pool. Workers memory-map the
+# feature cache entry the parent already built (read-only, shared through the page cache),
+# rebuild the fold's augmented + scaled train set, fit with n_jobs=1 and random_state=SEED
+# and return the test accuracy. pool.map yields results in task order, so the table is the
+# same whichever worker finishes first.
 # ---------------------------------------------------------------------------
 
-def rolling_cv(rows, scaler, models, use_xgb):
+_cv_fc = None   # worker-local feature cache arrays (set by _cv_init)
+
+def _cv_init(csv_path):
+    global _cv_fc
+    _cv_fc = load_features(csv_path, verbose=False)
+
+def _cv_fit(task):
+    """Fit one model on one fold; runs in a pool worker. Returns (test_year, name, acc)."""
+    test_year, name = task
+    X_tr, y_tr, _ = build_dataset(_cv_fc, TRAIN_FROM_YEAR, test_year - 1)
+    X_te, y_te, _ = build_dataset(_cv_fc, test_year, test_year)
+    X_tr_aug, y_tr_aug = augment(X_tr, y_tr)
+    sc = StandardScaler()
+    X_tr_s = sc.fit_transform(X_tr_aug)
+    mdl = make_model(name, n_jobs=1)
+    mdl.fit(X_tr_s, y_tr_aug)
+    return test_year, name, accuracy_score(y_te, mdl.predict(sc.transform(X_te)))
+
+def rolling_cv(fc, csv_path, model_names, jobs=None):
     section("ROLLING YEAR-BY-YEAR CROSS-VALIDATION (train: all prior years, test: that year)")
 
     test_years = [2019, 2020, 2021, 2022, 2023, 2024, 2025]
 
-    header = f"  {'Year':<6} {'n':>6} {'Rules':>8}"
-    for name in models:
-        header += f"  {name[:12]:>14}"
-    print(header)
-    print("  " + "-" * (len(header) - 2))
-
+    folds = []   # (test_year, n_test, rules_acc)
+    years = fc['year']
     for test_year in test_years:
-        train_rows = [r for r in rows
-                      if r.get('event_date','') and
-                      TRAIN_FROM_YEAR <= int(r['event_date'][:4]) < test_year]
-        test_rows  = [r for r in rows
-                      if r.get('event_date','') and
-                      int(r['event_date'][:4]) == test_year]
-
-        if len(train_rows) < 100 or len(test_rows) < 50:
+        n_train_rows = int(np.count_nonzero((years >= TRAIN_FROM_YEAR) & (years < test_year)))
+        n_test_rows  = int(np.count_nonzero(years == test_year))
+
+        if n_train_rows < 100 or n_test_rows < 50:
             continue
 
-        X_tr, y_tr, _ = build_dataset(train_rows, TRAIN_FROM_YEAR, test_year - 1)
-        X_te, y_te, m_te = build_dataset(test_rows, test_year, test_year)
-        if not X_tr or not X_te:
+        _, y_tr, _ = build_dataset(fc, TRAIN_FROM_YEAR, test_year - 1)
+        _, y_te, rows_te = build_dataset(fc, test_year, test_year)
+        if not len(y_tr) or not len(y_te):
             continue
+        folds.append((test_year, len(y_te), evaluate_rules(fc, rows_te)))
 
-        X_tr_aug, y_tr_aug = augment(X_tr, y_tr)
-        sc = StandardScaler()
-        X_tr_s = sc.fit_transform(np.array(X_tr_aug))
-        X_te_s = sc.transform(np.array(X_te))
+    tasks = [(test_year, name) for test_year, _, _ in folds for name in model_names]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
 
-        # Train fresh models for this fold
-        lr_fold = LogisticRegression(C=1.0, max_iter=2000, solver='lbfgs', random_state=42)
-        lr_fold.fit(X_tr_s, y_tr_aug)
+    t0 = time.perf_counter()
+    if jobs == 1:
+        _cv_init(csv_path)
+        results = list(map(_cv_fit, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_cv_init,
+                                 initargs=(str(csv_path),)) as pool:
+            results = list(pool.map(_cv_fit, tasks))
+    acc = {(test_year, name): a for test_year, name, a in results}
 
-        rules_acc = evaluate_rules(m_te, y_te)
-        lr_acc = accuracy_score(y_te, lr_fold.predict(X_te_s))
+    header = f"  {'Year':<6} {'n':>6} {'Rules':>8}"
+    for name in model_names:
+        header += f"  {name[:12]:>14}"
+    print(header)
+    print("  " + "-" * (len(header) - 2))
 
-        line = f"  {test_year:<6} {len(X_te):>6,} {rules_acc*100:>7.1f}%  {lr_acc*100:>13.1f}%"
+    for test_year, n_test, rules_acc in folds:
+        line = f"  {test_year:<6} {n_test:>6,} {rules_acc*100:>7.1f}%"
+        for name in model_names:
+            line += f"  {acc[(test_year, name)]*100:>13.1f}%"
         print(line)
 
+    print(f"\n  {len(tasks)} fits ({len(folds)} folds x {len(model_names)} models) on "
+          f"{jobs} worker process(es) in {time.perf_counter() - t0:.1f}s")
+
 # ---------------------------------------------------------------------------
 # Per-weight-class analysis
 # ---------------------------------------------------------------------------
 
-def per_weight_class(X_holdout, y_holdout, metas_holdout, model, scaler):
+def per_weight_class(fc, X_holdout, y_holdout, rows_holdout, model, scaler):
     section("PER-WEIGHT-CLASS ACCURACY (general model on holdout 2024-2025)")
 
     # Group by weight class
-    wc_data = defaultdict(lambda: {'X': [], 'y': [], 'rules': 0})
-    for x, y, m in zip(X_holdout, y_holdout, metas_holdout):
-        wc = m['weight_class']
-        wc_data[wc]['X'].append(x)
-        wc_data[wc]['y'].append(y)
-        if m['rules_agrees'] == '1':
-            wc_data[wc]['rules'] += 1
+    wcs = text_rows(fc, 'weight_class', rows_holdout)
+    rules = np.asarray(fc['rules_agrees'])[rows_holdout] == 1
 
     results = []
-    for wc, d in wc_data.items():
-        n = len(d['y'])
+    for wc in groups(wcs):
+        mask = wcs == wc
+        n = int(np.count_nonzero(mask))
         if n < 30:
             continue
-        acc = evaluate(model, scaler, d['X'], d['y'])
-        rules_acc = d['rules'] / n
+        acc = evaluate(model, scaler, X_holdout[mask], y_holdout[mask])
+        rules_acc = int(np.count_nonzero(rules[mask])) / n
         results.append((wc, n, rules_acc, acc))
 
     results.sort(key=lambda x: x[3], reverse=True)
@@ -361,27 +319,22 @@ def per_weight_class(X_holdout, y_holdout, metas_holdout, model, scaler):
 # Per-judge analysis
 # ---------------------------------------------------------------------------
 
-def per_judge(rows_all, model, scaler):
+def per_judge(fc, model, scaler):
     section("PER-JUDGE ACCURACY (general model, min 50 rounds, all years)")
 
-    judge_data = defaultdict(lambda: {'X': [], 'y': [], 'rules': 0})
-    for row in rows_all:
-        feats, label, meta = compute_features(row)
-        if label is None:
-            continue
-        j = meta['judge']
-        judge_data[j]['X'].append(feats)
-        judge_data[j]['y'].append(label)
-        if meta['rules_agrees'] == '1':
-            judge_data[j]['rules'] += 1
+    rows = np.flatnonzero(fc['y'] >= 0)
+    X, y = fc['X'][rows], fc['y'][rows]
+    judges = text_rows(fc, 'judge', rows)
+    rules = np.asarray(fc['rules_agrees'])[rows] == 1
 
     results = []
-    for judge, d in judge_data.items():
-        n = len(d['y'])
+    for judge in groups(judges):
+        mask = judges == judge
+        n = int(np.count_nonzero(mask))
         if n < 50:
             continue
-        acc = evaluate(model, scaler, d['X'], d['y'])
-        rules_acc = d['rules'] / n
+        acc = evaluate(model, scaler, X[mask], y[mask])
+        rules_acc = int(np.count_nonzero(rules[mask])) / n
         results.append((judge, n, rules_acc, acc))
 
     results.sort(key=lambda x: x[3], reverse=True)
@@ -430,7 +383,7 @@ def feature_importance(model, scaler):
 # Model export
 # ---------------------------------------------------------------------------
 
-def export_model(model, scaler, holdout_acc, rules_acc, naive_acc, n_train, out_path):
+def export_model(model, scaler, holdout_acc, rules_acc, naive_acc, n_train, out_path, dataset_sha256=None):
     section("MODEL EXPORT")
 
     payload = {
@@ -438,6 +391,7 @@ def export_model(model, scaler, holdout_acc, rules_acc, naive_acc, n_train, out_
         "version": "1.0",
         "trained_at": datetime.now().strftime('%Y-%m-%d'),
         "training_years": f"{TRAIN_FROM_YEAR}-{TRAIN_UNTIL_YEAR}",
+        "trained_through": f"{TRAIN_UNTIL_YEAR}-12-31",
         "n_training_rows_pre_augmentation": n_train,
         "holdout_years": f"{HOLDOUT_FROM_YEAR}-2025",
         "holdout_accuracy": round(holdout_acc, 6),
@@ -463,33 +417,220 @@ def export_model(model, scaler, holdout_acc, rules_acc, naive_acc, n_train, out_
         }
     }
 
-    with open(out_path, 'w', encoding='utf-8') as f:
-        json.dump(payload, f, indent=2)
+    artifact = publish(payload, dataset_sha256=dataset_sha256, json_view=out_path)
 
-    print(f"  Exported: {out_path}")
+    print(f"  Exported: {out_path}  (artifact {artifact})")
     print(f"  Features:          {len(FEATURE_NAMES)}")
     print(f"  Holdout accuracy:  {holdout_acc*100:.2f}%")
     print(f"  Rules baseline:    {rules_acc*100:.2f}%")
     print(f"  Improvement:       {(holdout_acc - rules_acc)*100:+.2f}pp")
 
+# ---------------------------------------------------------------------------
+# Incremental update (--incremental)
+#
+# Warm start: the exported coefficients seed the same L-BFGS objective the full run fits
+# (LR, C=1.0, augmented rows), over every labelled row up to the newest event, on features
+# standardised with the exported scaler statistics. Starting at the previous optimum it
+# converges in a few iterations, so a post-event refresh takes seconds and skips the
+# rolling CV and the RF / XGB fits.
+#
+# New rows: labelled rows dated after the model's trained_through. Neither the current model
+# nor the update has seen them yet, so they are scored with the current model first — an
+# out-of-sample check that the new scrape looks like what the model expects (log loss /
+# accuracy within MAX_NEW_ROWS_LOG_LOSS_INCREASE / MAX_NEW_ROWS_ACCURACY_DROP of the last full
+# training's holdout, carried forward unchanged as reference_holdout_* by every update).
+#
+# Rolling holdout: rows from the last HOLDOUT_DAYS before the newest event. A validation
+# candidate is fit with the window held out (rows up to the cut-off) and scored on it against
+# the newest published model trained through the cut-off or earlier — both out of sample.
+# It must not lose more than MAX_LOG_LOSS_INCREASE / MAX_ACCURACY_DROP to that baseline.
+#
+# Both checks must pass; the exported update is then refit on every labelled row, new ones
+# included, so a post-event refresh learns the event it follows and trained_through moves to
+# the newest event date. The exported holdout_* metrics are the new rows' scores.
+# ---------------------------------------------------------------------------
+
+HOLDOUT_DAYS = 365
+MAX_LOG_LOSS_INCREASE = 0.002
+MAX_ACCURACY_DROP = 0.005
+MAX_NEW_ROWS_LOG_LOSS_INCREASE = 0.05
+MAX_NEW_ROWS_ACCURACY_DROP = 0.05
+
+def event_dates(csv_path):
+    """Per-row event_date strings ('' when unknown), aligned with the feature cache rows."""
+    return np.asarray(decode(load_dataset(csv_path, columns=['event_date'])['event_date']))
+
+def trained_through(exported):
+    """Last event date the exported model was fit on (older exports: end of training_years)."""
+    if exported.get('trained_through'):
+        return exported['trained_through']
+    return f"{exported['training_years'].split('-')[-1]}-12-31"
+
+def exported_lr(exported):
+    """LogisticRegression holding the exported coefficients — predicts as exported, and
+    fit() with warm_start continues from them."""
+    lr = make_model('Logistic Regression')
+    lr.set_params(warm_start=True)
+    lr.classes_ = np.array([0, 1])
+    lr.coef_ = np.array([exported['coefficients']], dtype=np.float64)
+    lr.intercept_ = np.array([exported['intercept']], dtype=np.float64)
+    return lr
+
+def window_baseline(cutoff):
+    """Newest published model fit on nothing after the cut-off (registry), or None. Models
+    trained on another feature spec are skipped."""
+    for summary in reversed(read_index()['models']):
+        if trained_through(read_manifest(summary['artifact'])) > cutoff:
+            continue
+        try:
+            return load_model(summary['artifact'])
+        except ValueError:
+            continue
+    return None
+
+def holdout_scores(lr, X_scaled, y):
+    """(log loss, accuracy) on scaled holdout rows."""
+    return log_loss(y, lr.predict_proba(X_scaled), labels=[0, 1]), accuracy_score(y, lr.predict(X_scaled))
+
+def run_incremental(csv_path, dry_run=False):
+    """Warm-start update of scoring_model.json. Returns True when a new model was exported."""
+    start = time.perf_counter()
+    model_path = Path(csv_path).parent / 'scoring_model.json'
+    with open(model_path, encoding='utf-8') as f:
+        exported = json.load(f)
+    if exported['features'] != FEATURE_NAMES:
+        print("[ERROR] scoring_model.json features differ from features.FEATURE_NAMES — "
+              "run a full training first")
+        sys.exit(1)
+
+    fc = load_data(csv_path)
+    dates = event_dates(csv_path)
+    labelled = (np.asarray(fc['year']) >= TRAIN_FROM_YEAR) & (np.asarray(fc['y']) >= 0) & (dates != '')
+    if not labelled.any():
+        print("[ERROR] No dated, labelled rows in the dataset")
+        sys.exit(1)
+    newest = max(dates[labelled].tolist())
+    cutoff = (date.fromisoformat(newest) - timedelta(days=HOLDOUT_DAYS)).isoformat()
+    previous = trained_through(exported)
+
+    section(f"INCREMENTAL UPDATE  (trained through {previous}  |  new rows: {previous} < date <= {newest})")
+    train_rows  = np.flatnonzero(labelled)
+    new_rows    = np.flatnonzero(labelled & (dates > previous))
+    window_rows = np.flatnonzero(labelled & (dates > cutoff))
+    print(f"  Training rows (pre-augmentation):  {len(train_rows):,}  ({len(new_rows):,} new)")
+    print(f"  Rolling window rows:               {len(window_rows):,}  ({cutoff} < date <= {newest})")
+    if len(new_rows) == 0:
+        print(f"\n  [OK] No labelled rows after {previous} — model unchanged.")
+        return False
+
+    mean = np.asarray(exported['scaler_mean'])
+    std  = np.asarray(exported['scaler_std'])
+    current = exported_lr(exported)
+
+    # New rows first: the current model has not seen them and the update has not been fit yet
+    new_loss, new_acc = holdout_scores(current, (fc['X'][new_rows] - mean) / std, fc['y'][new_rows])
+    ref_loss = exported.get('reference_holdout_log_loss', exported.get('holdout_log_loss'))
+    ref_acc  = exported.get('reference_holdout_accuracy', exported['holdout_accuracy'])
+    new_ok = ((ref_loss is None or new_loss <= ref_loss + MAX_NEW_ROWS_LOG_LOSS_INCREASE)
+              and new_acc >= ref_acc - MAX_NEW_ROWS_ACCURACY_DROP)
+
+    # Rolling holdout: validation candidate and baseline have both never seen the window
+    baseline = window_baseline(cutoff)
+    y_win = fc['y'][window_rows]
+    t0 = time.perf_counter()
+    if baseline is None:
+        window_ok = False
+    else:
+        base_mean, base_std = baseline['scaler_mean'], baseline['scaler_std']
+        base_loss, base_acc = holdout_scores(exported_lr(baseline), (fc['X'][window_rows] - base_mean) / base_std, y_win)
+        fit_rows = np.flatnonzero(labelled & (dates <= cutoff))
+        X_aug, y_aug = augment(fc['X'][fit_rows], fc['y'][fit_rows])
+        same_scaler = np.array_equal(base_mean, mean) and np.array_equal(base_std, std)
+        validation = (exported_lr(baseline) if same_scaler else make_model('Logistic Regression'))
+        validation.fit((X_aug - mean) / std, y_aug)
+        val_loss, val_acc = holdout_scores(validation, (fc['X'][window_rows] - mean) / std, y_win)
+        window_ok = (val_loss <= base_loss + MAX_LOG_LOSS_INCREASE
+                     and val_acc >= base_acc - MAX_ACCURACY_DROP)
+
+    # Export candidate: every labelled row, new ones included
+    X_aug, y_aug = augment(fc['X'][train_rows], fc['y'][train_rows])
+    candidate = exported_lr(exported).fit((X_aug - mean) / std, y_aug)
+    fit_s = time.perf_counter() - t0
+
+    print(f"\n  {'Check':<44} {'Log loss':>9} {'Accuracy':>10}")
+    print(f"  {'-'*44} {'-'*9} {'-'*10}")
+    ref_loss_txt = '—' if ref_loss is None else f"{ref_loss:.4f}"
+    print(f"  {'Full-training holdout (reference)':<44} {ref_loss_txt:>9} {ref_acc*100:>9.2f}%")
+    print(f"  {'New rows, current model (unseen)':<44} {new_loss:>9.4f} {new_acc*100:>9.2f}%")
+    if baseline is not None:
+        print(f"  {'Window, ' + baseline['artifact'] + ' (baseline, unseen)':<44} "
+              f"{base_loss:>9.4f} {base_acc*100:>9.2f}%")
+        print(f"  {'Window, validation fit (window held out)':<44} {val_loss:>9.4f} {val_acc*100:>9.2f}%")
+    print(f"\n  L-BFGS iterations (export fit): {int(candidate.n_iter_[0])}  ({fit_s:.2f}s for both fits)")
+
+    holds = new_ok and window_ok
+    if not new_ok:
+        print(f"  [WARN] New rows score well below the exported holdout (log loss "
+              f"+{MAX_NEW_ROWS_LOG_LOSS_INCREASE}, accuracy -{MAX_NEW_ROWS_ACCURACY_DROP*100:.0f}pp) — "
+              f"check the new scorecards or run a full training; keeping the current model.")
+    if baseline is None:
+        print(f"  [WARN] No published model was trained through {cutoff} or earlier — nothing to validate "
+              f"the window against; run a full training. Keeping the current model.")
+    elif not window_ok:
+        print(f"  [WARN] Held-out window metrics regressed beyond tolerance (log loss +{MAX_LOG_LOSS_INCREASE}, "
+              f"accuracy -{MAX_ACCURACY_DROP*100:.1f}pp) — keeping the current model.")
+    if holds and dry_run:
+        print("  [OK] Checks pass — not exported (--dry-run).")
+    elif holds:
+        payload = dict(exported)
+        payload.update({
+            "trained_at": datetime.now().strftime('%Y-%m-%d'),
+            "training_years": f"{TRAIN_FROM_YEAR}-{newest[:4]}",
+            "trained_through": newest,
+            "n_training_rows_pre_augmentation": int(len(train_rows)),
+            "holdout_years": f"{previous[:4]}-{newest[:4]} (new rows, scored before the update)",
+            "holdout_accuracy": round(new_acc, 6),
+            "holdout_log_loss": round(new_loss, 6),
+            "reference_holdout_accuracy": ref_acc,
+            "reference_holdout_log_loss": ref_loss,
+            "rules_baseline_accuracy": round(evaluate_rules(fc, new_rows), 6),
+            "naive_sig_strikes_accuracy": round(evaluate_naive(fc, new_rows), 6),
+            "coefficients": [round(float(c), 8) for c in candidate.coef_[0]],
+            "intercept": round(float(candidate.intercept_[0]), 8),
+            "incremental_update": {
+                "from_trained_through": previous,
+                "new_rows": int(len(new_rows)),
+                "holdout_window_days": HOLDOUT_DAYS,
+                "window_baseline": baseline['artifact'],
+                "window_log_loss": round(val_loss, 6),
+                "window_accuracy": round(val_acc, 6),
+                "lbfgs_iterations": int(candidate.n_iter_[0]),
+            },
+        })
+        artifact = publish(payload, dataset_sha256=dataset_hash(csv_path), json_view=model_path)
+        print(f"  [OK] Exported {model_path}  (artifact {artifact})")
+
+    print(f"\n  Incremental update finished in {time.perf_counter() - start:.1f}s")
+    return holds and not dry_run
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def run(csv_path, use_xgb, train_until):
+def run(csv_path, use_xgb, train_until, jobs=None):
     global TRAIN_UNTIL_YEAR, HOLDOUT_FROM_YEAR
     TRAIN_UNTIL_YEAR = train_until
     HOLDOUT_FROM_YEAR = train_until + 1
 
-    rows_all = load_data(csv_path)
+    fc = load_data(csv_path)
 
     # -----------------------------------------------------------------------
     # Step 3: Build features
     # -----------------------------------------------------------------------
     section(f"STEP 3: FEATURE ENGINEERING  (train: {TRAIN_FROM_YEAR}-{TRAIN_UNTIL_YEAR}  |  holdout: {HOLDOUT_FROM_YEAR}-2025)")
 
-    X_train, y_train, m_train = build_dataset(rows_all, TRAIN_FROM_YEAR, TRAIN_UNTIL_YEAR)
-    X_hold,  y_hold,  m_hold  = build_dataset(rows_all, HOLDOUT_FROM_YEAR, 9999)
+    X_train, y_train, _         = build_dataset(fc, TRAIN_FROM_YEAR, TRAIN_UNTIL_YEAR)
+    X_hold,  y_hold,  rows_hold = build_dataset(fc, HOLDOUT_FROM_YEAR, 9999)
 
     print(f"  Training rows (pre-augmentation):  {len(X_train):,}")
     print(f"  Holdout rows:                      {len(X_hold):,}")
@@ -503,8 +644,8 @@ def run(csv_path, use_xgb, train_until):
     section("STEP 4: SYMMETRIC AUGMENTATION")
 
     X_train_aug, y_train_aug = augment(X_train, y_train)
-    f1_rate_before = sum(y_train) / len(y_train) * 100
-    f1_rate_after  = sum(y_train_aug) / len(y_train_aug) * 100
+    f1_rate_before = np.count_nonzero(y_train) / len(y_train) * 100
+    f1_rate_after  = np.count_nonzero(y_train_aug) / len(y_train_aug) * 100
 
     print(f"  Pre-augmentation:  {len(X_train):,} rows  |  f1 win rate: {f1_rate_before:.1f}%")
     print(f"  Post-augmentation: {len(X_train_aug):,} rows  |  f1 win rate: {f1_rate_after:.1f}%")
@@ -527,25 +668,9 @@ def run(csv_path, use_xgb, train_until):
     # -----------------------------------------------------------------------
     section(f"HOLDOUT EVALUATION ({HOLDOUT_FROM_YEAR}-2025, n={len(X_hold):,} rounds)")
 
-    rules_acc_hold = evaluate_rules(m_hold, y_hold)
+    rules_acc_hold = evaluate_rules(fc, rows_hold)
 
-    # Naive baseline on holdout
-    naive_correct = naive_total = 0
-    for row in rows_all:
-        d = row.get('event_date', '')
-        if not d or int(d[:4]) < HOLDOUT_FROM_YEAR:
-            continue
-        if row.get('judge_winner') not in ('f1', 'f2'):
-            continue
-        f1_sig = safe_float(row.get('f1_sig_landed'))
-        f2_sig = safe_float(row.get('f2_sig_landed'))
-        if f1_sig == f2_sig:
-            continue
-        naive_winner = 'f1' if f1_sig > f2_sig else 'f2'
-        naive_total += 1
-        if naive_winner == row['judge_winner']:
-            naive_correct += 1
-    naive_acc = naive_correct / naive_total if naive_total else 0.0
+    naive_acc = evaluate_naive(fc, rows_hold)
 
     print(f"  {'Model':<25} {'Accuracy':>10}")
     print(f"  {'-'*25} {'-'*10}")
@@ -571,7 +696,7 @@ def run(csv_path, use_xgb, train_until):
     # -----------------------------------------------------------------------
     # Step 6: Rolling year-by-year CV
     # -----------------------------------------------------------------------
-    rolling_cv(rows_all, scaler, models, use_xgb)
+    rolling_cv(fc, csv_path, list(models), jobs)
 
     # -----------------------------------------------------------------------
     # Step 7a: Feature importance (LR)
@@ -596,12 +721,12 @@ def run(csv_path, use_xgb, train_until):
     # Step 7b: Per-weight-class analysis
     # -----------------------------------------------------------------------
     best_for_wc = lr_model if lr_model else list(models.values())[0]
-    per_weight_class(X_hold, y_hold, m_hold, best_for_wc, scaler)
+    per_weight_class(fc, X_hold, y_hold, rows_hold, best_for_wc, scaler)
 
     # -----------------------------------------------------------------------
     # Step 7c: Per-judge analysis
     # -----------------------------------------------------------------------
-    per_judge(rows_all, best_for_wc, scaler)
+    per_judge(fc, best_for_wc, scaler)
 
     # -----------------------------------------------------------------------
     # Model export
@@ -610,7 +735,8 @@ def run(csv_path, use_xgb, train_until):
         out_path = Path(csv_path).parent / 'scoring_model.json'
         export_model(lr_model, scaler, best_acc if best_name == 'Logistic Regression' else
                      evaluate(lr_model, scaler, X_hold, y_hold),
-                     rules_acc_hold, naive_acc, len(X_train), out_path)
+                     rules_acc_hold, naive_acc, len(X_train), out_path,
+                     dataset_sha256=dataset_hash(csv_path))
     else:
         print("\n[WARN] No logistic regression model available for export.")
 
@@ -622,14 +748,26 @@ def run(csv_path, use_xgb, train_until):
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Train UFC round scoring ML model.')
-    parser.add_argument('--csv', default='ml_dataset.csv', help='Input CSV')
+    parser.add_argument('--csv', default='ml_dataset.csv',
+                        help='Input CSV (read via its ml_dataset.cols/ columnar store)')
     parser.add_argument('--train-until', type=int, default=TRAIN_UNTIL_YEAR,
                         help=f'Last year of training data (default: {TRAIN_UNTIL_YEAR})')
     parser.add_argument('--no-xgb', action='store_true', help='Skip XGBoost even if installed')
+    parser.add_argument('--jobs', type=int, default=0,
+                        help='Worker processes for rolling CV (default: all cores; 1 = serial)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Warm-start the exported LR on rows that left the rolling holdout')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='With --incremental: validate the update without exporting it')
     args = parser.parse_args()
 
+    if args.incremental:
+        run_incremental(Path(__file__).parent / args.csv, dry_run=args.dry_run)
+        sys.exit(0)
+
     run(
         csv_path=Path(__file__).parent / args.csv,
         use_xgb=not args.no_xgb,
         train_until=args.train_until,
+        jobs=args.jobs,
     )
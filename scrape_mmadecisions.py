@@ -1,18 +1,27 @@
 import os
 import sys
+import json
 import time
+import re
 import random
+import hashlib
 import logging
 import argparse
 import threading
+import unicodedata
+from collections import Counter, defaultdict
+from html.parser import HTMLParser
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+from datetime import datetime, date
 from pathlib import Path
 from dotenv import load_dotenv
 import requests
 from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
 from supabase import create_client, Client
 
+import retry_queue
+
 # Force stdout/stderr to UTF-8 so Windows charmap never chokes on emoji in print()
 if hasattr(sys.stdout, 'reconfigure'):
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -29,6 +38,16 @@ BASE_SLEEP   = 0.75  # seconds between requests (was 1.5)
 MAX_RETRIES  = 3
 BACKOFF_BASE = 2     # exponential backoff: 2s, 4s, 8s on retries
 
+DECISIONS_INDEX_URL = "http://mmadecisions.com/decisions-by-event/"
+MMADECISIONS_BASE_URL = "http://mmadecisions.com/"
+
+# Local record of every decision URL already handled — consulted before any network/DB call
+MANIFEST_PATH = Path(__file__).parent / 'mmadecisions_manifest.json'
+MANIFEST_SKIP_STATUSES = ('scraped', 'in_db')  # 'empty' / 'failed' / 'missing' are retried
+
+# Fingerprinted copies of the index, year and event pages (parsed link lists, not raw HTML)
+INDEX_CACHE_PATH = Path(__file__).parent / 'mmadecisions_index_cache.json'
+EVENT_REFRESH_DAYS = 21  # event pages re-fetched until this many days after the event; cached after
 
 url = os.environ.get("REACT_APP_SUPABASE_URL")
 key = os.environ.get("SUPABASE_SERVICE_KEY")
@@ -43,6 +62,13 @@ logging.basicConfig(filename=str(Path(__file__).parent / 'scrape_errors.log'), l
 
 _thread_local = threading.local()
 
+def take_last_error():
+    """Pop the exception behind this thread's most recent fetch/upsert failure (None if no failure).
+    Lets callers tell a transient error (queued for retry) from a page with nothing to insert."""
+    err = getattr(_thread_local, 'last_error', None)
+    _thread_local.last_error = None
+    return err
+
 def get_thread_db():
     """Return a thread-local Supabase client. Creates one on first call per thread."""
     if not hasattr(_thread_local, 'db'):
@@ -63,11 +89,61 @@ def clean_string(text):
     # 3. Remove leading/trailing whitespace
     return text.replace(' vs. ', ' vs ').replace('\xa0', ' ').strip()
 
+def url_to_bout(href):
+    """Bout name derived from a decision URL slug — matches what extract_fight_data stores
+    (event page uses "X def. Y" format, never "X vs Y", so bout_display never has " vs "
+    and the URL-fallback path always runs)."""
+    return href.strip().split('/')[-1].replace('-', ' ')
+
+# --- MANIFEST (decision URL -> status, row count, content hash, scrape time) ---
+
+_manifest = {}
+_manifest_lock = threading.Lock()
+
+def load_manifest():
+    global _manifest
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            _manifest = json.load(f)
+    except FileNotFoundError:
+        _manifest = {}
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Could not read manifest, starting empty: {e!r}")
+        _manifest = {}
+    return _manifest
+
+def save_manifest():
+    """Write via temp file + rename so an interrupted run never leaves a truncated manifest."""
+    tmp_path = MANIFEST_PATH.with_suffix('.json.tmp')
+    with _manifest_lock:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, MANIFEST_PATH)
+
+def record_manifest(fight_url, status, rows=0, content_hash=None):
+    with _manifest_lock:
+        _manifest[fight_url] = {
+            'status': status,
+            'rows': rows,
+            'hash': content_hash,
+            'scraped_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+def manifest_status(fight_url):
+    entry = _manifest.get(fight_url)
+    return entry['status'] if entry else None
+
+def content_hash(rows):
+    """Stable hash of the extracted scorecard rows (ignores page chrome that changes between fetches)."""
+    payload = json.dumps(rows, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
 def fetch_page(url, session=None):
     """Fetch a URL with retry + exponential backoff.
     Pass a requests.Session for thread-local HTTP keep-alive reuse.
     """
     getter = session.get if session else requests.get
+    _thread_local.last_error = None
     for attempt in range(1, MAX_RETRIES + 1):
         try:
             response = getter(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=15)
@@ -75,6 +151,7 @@ def fetch_page(url, session=None):
             time.sleep(BASE_SLEEP)
             return response.text
         except requests.exceptions.HTTPError as e:
+            _thread_local.last_error = e
             if e.response is not None and e.response.status_code == 429:
                 wait = BACKOFF_BASE ** attempt + random.uniform(0, 1)
                 print(f"  429 rate-limited. Waiting {wait:.1f}s before retry {attempt}...")
@@ -85,23 +162,179 @@ def fetch_page(url, session=None):
             else:
                 time.sleep(BACKOFF_BASE ** attempt)
         except Exception as e:
+            _thread_local.last_error = e
             if attempt == MAX_RETRIES:
                 logging.error(f"Failed to fetch {url} after {MAX_RETRIES} attempts: {e}")
                 return None
             time.sleep(BACKOFF_BASE ** attempt)
     return None
 
+# --- DECISION PAGE EXTRACTOR ---
+# extract_fight_data only needs the decision header cells and the three judge tables, so
+# instead of building a full BeautifulSoup tree it streams the page through html.parser and
+# keeps text for just those elements. Open/close handling mirrors BeautifulSoup's html.parser
+# tree builder (void tags, unmatched end tags, whitespace collapsing, script/style strings),
+# so output is identical to the soup-based parser — see bench_extract_fight_data.py.
+
+JUDGE_TABLE_STYLE = "border-spacing: 1px; width: 100%"
+
+# BeautifulSoup HTMLTreeBuilder.empty_element_tags
+_VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid', 'spacer',
+])
+# Strings inside these are not returned by .text / get_text()
+_NON_TEXT_CONTAINERS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+_PRESERVE_WHITESPACE_TAGS = frozenset(['pre', 'textarea'])
+_ASCII_SPACES = str.maketrans('', '', '\x20\x0a\x09\x0c\x0d')
+
+def _has_class(attrs, cls):
+    value = attrs.get('class') or ''
+    return value == cls or cls in value.split()
+
+class _DecisionPageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack = []              # (tag, text captures, judge table, decision row)
+        self.open_counts = Counter()
+        self.captures = []           # string lists currently receiving text
+        self.pending = []
+        self.event_strings = None
+        self.referee_strings = None
+        self.tables = []             # {'judge': [strings] | None, 'rows': [[col strings, ...], ...]}
+        self.open_tables = []
+        self.open_rows = []
+
+    # -- text --
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_charref(self, name):
+        if name.startswith(('x', 'X')):
+            code = int(name[1:], 16)
+        else:
+            code = int(name)
+        data = None
+        if code < 256:
+            try:
+                data = bytearray([code]).decode('windows-1252')
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self.pending.append(data or '\N{REPLACEMENT CHARACTER}')
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.pending.append(character if character is not None else f"&{name}")
+
+    def _flush(self):
+        if not self.pending:
+            return
+        text = ''.join(self.pending)
+        self.pending = []
+        if any(self.open_counts[t] for t in _NON_TEXT_CONTAINERS):
+            return
+        if text.translate(_ASCII_SPACES) == '' and \
+                not any(self.open_counts[t] for t in _PRESERVE_WHITESPACE_TAGS):
+            text = '\n' if '\n' in text else ' '
+        for strings in self.captures:
+            strings.append(text)
+
+    def handle_comment(self, data): self._flush()
+    def handle_decl(self, decl): self._flush()
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith('CDATA['):   # CDATA sections count as text
+            self.pending.append(data[len('CDATA['):])
+            self._flush()
+    def handle_pi(self, data): self._flush()
+
+    # -- structure --
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in _VOID_TAGS:
+            return
+        attrs = {k: (v if v is not None else '') for k, v in attrs}
+        captures, table, row = [], None, None
+        if tag == 'td':
+            if self.event_strings is None and _has_class(attrs, 'decision-top2'):
+                self.event_strings = []
+                captures.append(self.event_strings)
+            if self.referee_strings is None and _has_class(attrs, 'decision-bottom2'):
+                self.referee_strings = []
+                captures.append(self.referee_strings)
+            if self.open_rows and _has_class(attrs, 'list'):
+                col = []
+                for open_row in self.open_rows:
+                    open_row.append(col)
+                captures.append(col)
+        elif tag == 'table' and attrs.get('style') == JUDGE_TABLE_STYLE:
+            table = {'judge': None, 'rows': []}
+            self.tables.append(table)
+            self.open_tables.append(table)
+        elif tag == 'tr' and self.open_tables and _has_class(attrs, 'decision'):
+            row = []
+            for open_table in self.open_tables:
+                open_table['rows'].append(row)
+            self.open_rows.append(row)
+        elif tag == 'a':
+            judge = None
+            for open_table in self.open_tables:
+                if open_table['judge'] is None:
+                    if judge is None:
+                        judge = []
+                        captures.append(judge)
+                    open_table['judge'] = judge
+        self.stack.append((tag, captures, table, row))
+        self.open_counts[tag] += 1
+        self.captures.extend(captures)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in _VOID_TAGS or not self.open_counts[tag]:
+            return
+        while self.stack:
+            name, captures, table, row = self.stack.pop()
+            self.open_counts[name] -= 1
+            # Captures, tables and rows are opened in stack order, so they close from the end
+            if captures:
+                del self.captures[-len(captures):]
+            if table is not None:
+                self.open_tables.pop()
+            if row is not None:
+                self.open_rows.pop()
+            if name == tag:
+                break
+
+    def close(self):
+        super().close()
+        self._flush()
+
 def extract_fight_data(html_content, url, bout_display=None):
     if not html_content: return None
-    soup = BeautifulSoup(html_content, "html.parser")
+    page = _DecisionPageParser()
+    page.feed(html_content)
+    page.close()
 
-    event_block = soup.find("td", class_="decision-top2")
-    event_lines = [line.strip() for line in event_block.text.splitlines() if line.strip()] if event_block else []
+    event_text = ''.join(page.event_strings) if page.event_strings is not None else None
+    event_lines = [line.strip() for line in event_text.splitlines() if line.strip()] if event_text is not None else []
     event = event_lines[0] if event_lines else 'N/A'
     date = event_lines[1] if len(event_lines) > 1 else 'N/A'
 
-    referee_block = soup.find("td", class_="decision-bottom2")
-    referee = referee_block.get_text(strip=True).replace('REFEREE:', '').strip() if referee_block else 'N/A'
+    if page.referee_strings is not None:
+        referee = ''.join(t.strip() for t in page.referee_strings).replace('REFEREE:', '').strip()
+    else:
+        referee = 'N/A'
 
     # Use display name from the event page link (properly cased) when available.
     # Fallback to URL slug only if display name wasn't passed in.
@@ -115,15 +348,13 @@ def extract_fight_data(html_content, url, bout_display=None):
             f1_name = f2_name = 'Unknown'
 
     data = []
-    judge_tables = soup.find_all("table", style="border-spacing: 1px; width: 100%")
-    for table in judge_tables:
-        try:
-            judge = table.find("a").get_text(strip=True).replace("\xa0", " ").strip()
-        except AttributeError: continue
+    for table in page.tables:
+        if table['judge'] is None: continue
+        judge = ''.join(t.strip() for t in table['judge']).replace("\xa0", " ").strip()
 
-        for round_row in table.find_all("tr", class_="decision"):
-            cols = round_row.find_all("td", class_="list")
-            if len(cols) < 3 or not cols[1].text.strip() or cols[1].text.strip() == "-": continue
+        for round_row in table['rows']:
+            cols = [''.join(strings) for strings in round_row]
+            if len(cols) < 3 or not cols[1].strip() or cols[1].strip() == "-": continue
 
             bout_name = f"{f1_name} vs {f2_name}"
             common_fields = {
@@ -131,13 +362,13 @@ def extract_fight_data(html_content, url, bout_display=None):
                 'bout': bout_name,
                 'date': date.strip(),
                 'judge': judge,
-                'round': int(cols[0].text.strip()),
+                'round': int(cols[0].strip()),
                 'referee': referee
             }
             # Row for Fighter 1
-            data.append({**common_fields, 'fighter': f1_name, 'score': cols[1].text.strip()})
+            data.append({**common_fields, 'fighter': f1_name, 'score': cols[1].strip()})
             # Row for Fighter 2
-            data.append({**common_fields, 'fighter': f2_name, 'score': cols[2].text.strip()})
+            data.append({**common_fields, 'fighter': f2_name, 'score': cols[2].strip()})
 
     return {'data': data} if data else None
 
@@ -158,15 +389,34 @@ def fetch_fight_page_and_insert(args):
     fight_url = base_url + b_link.strip()
     html = fetch_page(fight_url, session=_thread_local.http_session)
     if not html:
+        record_manifest(fight_url, 'failed')
+        retry_queue.record_failure('judge_fight', fight_url, take_last_error() or 'FetchFailed',
+                                   payload={'link': b_link.strip(), 'name': b_name})
         return False
 
     res = extract_fight_data(html, fight_url, b_name)
     if res and res.get('data'):
-        insert_judge_data_supabase(res['data'], db=get_thread_db())
-        return True
+        _thread_local.last_error = None
+        n_rows = insert_judge_data_supabase(res['data'], db=get_thread_db())
+        if n_rows:
+            record_manifest(fight_url, 'scraped', rows=n_rows, content_hash=content_hash(res['data']))
+            retry_queue.record_success('judge_fight', fight_url)
+            return True
+        record_manifest(fight_url, 'failed')
+        err = take_last_error()
+        if err:
+            retry_queue.record_failure('judge_fight', fight_url, err,
+                                       payload={'link': b_link.strip(), 'name': b_name})
+        else:
+            # Nothing insertable (e.g. every score was a DQ/NC marker) — retrying won't help
+            retry_queue.record_success('judge_fight', fight_url)
+        return False
+    record_manifest(fight_url, 'empty')
+    retry_queue.record_success('judge_fight', fight_url)
     return False
 
 def insert_judge_data_supabase(raw_data, db=None):
+    """Upsert scorecard rows. Returns the number of rows written (0 on failure)."""
     if db is None:
         db = supabase_db
     clean_rows = []
@@ -208,20 +458,267 @@ def insert_judge_data_supabase(raw_data, db=None):
                 on_conflict='bout,date,judge,fighter,round'
             ).execute()
             print(f"[OK] Processed {len(clean_rows)} scorecard rows.")
+            return len(clean_rows)
         except Exception as e:
+            _thread_local.last_error = e
             print(f"[ERROR] Supabase Sync Error: {e}")
             logging.error(f"UPSERT failed: {e}")
+    return 0
+
+# --- 4. PAGE PARSING + WORKER POOL (shared by full scan and gap-fill) ---
+
+def is_ufc_event(name):
+    # TUF Finale events are listed without "UFC" on mmadecisions.com
+    return 'UFC' in name or 'TUF' in name or 'The Ultimate Fighter' in name
+
+def parse_event_bouts(event_html):
+    """Return [(href, display_text)] for every decision link on an event page.
+    Display text has proper fighter name casing."""
+    bout_soup = BeautifulSoup(event_html, 'html.parser')
+    return [
+        (a.get('href'), clean_string(a.get_text(strip=True)))
+        for a in bout_soup.find_all('a')
+        if 'decision/' in a.get('href', '') and a.get_text(strip=True)
+    ]
+
+_ROW_DATE_PATTERNS = [
+    (re.compile(r'\b(\d{1,2}/\d{1,2}/\d{4})\b'), ('%m/%d/%Y',)),
+    (re.compile(r'\b(\d{4}-\d{2}-\d{2})\b'), ('%Y-%m-%d',)),
+    (re.compile(r'\b([A-Z][a-z]{2,8}\.? \d{1,2}, \d{4})\b'), ('%B %d, %Y', '%b %d, %Y')),
+]
+
+def parse_row_date(text):
+    """First date found in a year-page table row, or None."""
+    for pattern, formats in _ROW_DATE_PATTERNS:
+        m = pattern.search(text or '')
+        if not m:
+            continue
+        raw = m.group(1).replace('.', '')
+        for fmt in formats:
+            try:
+                return datetime.strptime(raw, fmt).date()
+            except ValueError:
+                pass
+    return None
 
-# --- 4. MAIN ORCHESTRATOR (OPTIMIZED) ---
-
-def scrapeDataFunction(start_year, end_year):
-    url = "http://mmadecisions.com/decisions-by-event/"
-    base_url = "http://mmadecisions.com/"
-    
-    main_html = fetch_page(url)
-    if not main_html: return
+def parse_year_events(year_html):
+    """Return [(href, event_name, event_date|None)] for UFC events on a year page."""
+    year_soup = BeautifulSoup(year_html, 'html.parser')
+    events = []
+    for a in year_soup.find_all('a'):
+        if not is_ufc_event(a.text):
+            continue
+        row = a.find_parent('tr')
+        events.append((a.get('href'), a.text.strip(), parse_row_date(row.get_text(' ')) if row else None))
+    return events
+
+def run_bout_workers(new_bouts):
+    """Fetch + insert decision pages on the bounded worker pool. Returns count of bouts inserted."""
+    inserted = 0
+    if not new_bouts:
+        return inserted
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_fight_page_and_insert, args): args
+            for args in new_bouts
+        }
+        for future in as_completed(futures):
+            try:
+                if future.result():
+                    inserted += 1
+            except Exception as e:
+                logging.error(f"Worker exception for {futures[future][1]}: {e}")
+    return inserted
+
+def fetch_event_page(e_link, e_name):
+    """Fetch an event page; a failure is queued as a 'judge_event' work item."""
+    event_url = MMADECISIONS_BASE_URL + e_link.strip()
+    event_html = fetch_page(event_url)
+    if event_html:
+        retry_queue.record_success('judge_event', event_url)
+    else:
+        retry_queue.record_failure('judge_event', event_url, take_last_error() or 'FetchFailed',
+                                   payload={'link': e_link.strip(), 'name': e_name})
+    return event_html
+
+def filter_new_bouts(bouts):
+    """Drop bouts already scraped, returning worker args for the rest."""
+    base_url = MMADECISIONS_BASE_URL
+
+    # MANIFEST CHECK: decision URLs already scraped (or confirmed in DB) on a
+    # previous run are skipped without touching the network or the database
+    unknown_bouts = []
+    for b_link, b_name in bouts:
+        if manifest_status(base_url + b_link.strip()) in MANIFEST_SKIP_STATUSES:
+            print(f"  [skip] {b_name}")
+        else:
+            unknown_bouts.append((b_link, b_name))
+
+    # QUICK CHECK: only bouts the manifest doesn't know about hit judge_scores
+    url_bout_names = [url_to_bout(b_link) for b_link, _ in unknown_bouts]
+    if url_bout_names:
+        existing_res = supabase_db.table("judge_scores").select("bout").in_("bout", url_bout_names).execute()
+        existing_rows = Counter(row['bout'] for row in existing_res.data)
+    else:
+        existing_rows = Counter()
+
+    new_bouts = []
+    for b_link, b_name in unknown_bouts:
+        n_existing = existing_rows.get(url_to_bout(b_link), 0)
+        if n_existing:
+            print(f"  [skip] {b_name}")
+            record_manifest(base_url + b_link.strip(), 'in_db', rows=n_existing)
+        else:
+            new_bouts.append((base_url, b_link, b_name))
+    return new_bouts
+
+# --- INDEX CACHE (staleness-aware year / event page refresh) ---
+# Year list:    cached; the index is only re-fetched when forced or the current year is new.
+# Year pages:   the current year is always fetched; past years only when forced or never seen.
+# Event pages:  fetched until EVENT_REFRESH_DAYS after the event, then the cached bout list is
+#               reused — the manifest / judge_scores checks still run on it, only the page
+#               request is skipped. Fingerprints (hash of the parsed link list) report changes.
+
+_index_cache = {'years': [], 'year_events': {}, 'events': {}}
+_index_stats = Counter()
+
+def load_index_cache():
+    global _index_cache
+    try:
+        with open(INDEX_CACHE_PATH, encoding='utf-8') as f:
+            _index_cache = json.load(f)
+    except FileNotFoundError:
+        _index_cache = {'years': [], 'year_events': {}, 'events': {}}
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Could not read index cache, starting empty: {e!r}")
+        _index_cache = {'years': [], 'year_events': {}, 'events': {}}
+    _index_stats.clear()
+    return _index_cache
+
+def save_index_cache():
+    tmp_path = INDEX_CACHE_PATH.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(_index_cache, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, INDEX_CACHE_PATH)
+
+def fingerprint(links):
+    return hashlib.sha1(json.dumps(links, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def get_years(force=False):
+    """Year strings listed on decisions-by-event/, from cache unless forced or a new year has started."""
+    cached = _index_cache.get('years') or []
+    if cached and not force and str(CURRENT_YEAR) in cached:
+        _index_stats['cached'] += 1
+        return cached
+    main_html = fetch_page(DECISIONS_INDEX_URL)
+    _index_stats['fetched'] += 1
+    if not main_html:
+        return cached
     soup = BeautifulSoup(main_html, 'html.parser')
-    year_cells = [y.text for y in soup.find('table', width="100%").find_all('td') if y.text.isdigit()]
+    years = [y.text for y in soup.find('table', width="100%").find_all('td') if y.text.isdigit()]
+    _index_cache['years'] = years
+    return years
+
+def get_year_events(year, force=False):
+    """[(href, event_name, event_date|None)] for a year page — past years served from cache."""
+    year = str(year)
+    cached = _index_cache['year_events'].get(year)
+    if cached and not force and int(year) != CURRENT_YEAR:
+        _index_stats['cached'] += 1
+        return [(h, n, date.fromisoformat(d) if d else None) for h, n, d in cached['events']]
+
+    year_html = fetch_page(f"{DECISIONS_INDEX_URL}{year}/")
+    _index_stats['fetched'] += 1
+    if not year_html:
+        return [(h, n, date.fromisoformat(d) if d else None) for h, n, d in cached['events']] if cached else None
+    events = parse_year_events(year_html)
+    stored = [[h, n, d.isoformat() if d else None] for h, n, d in events]
+    fp = fingerprint(stored)
+    if cached:
+        print(f"  Year page {year}: {'unchanged' if cached['fingerprint'] == fp else 'changed'}")
+    _index_cache['year_events'][year] = {
+        'fingerprint': fp,
+        'events': stored,
+        'fetched_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    return events
+
+def _event_is_settled(entry, e_date):
+    """True once an event is old enough that mmadecisions has stopped adding decisions to it."""
+    anchor = e_date or date.fromisoformat(entry['first_seen'][:10])
+    return (date.today() - anchor).days > EVENT_REFRESH_DAYS
+
+def get_event_bouts(e_link, e_name, e_date=None, force=False):
+    """[(href, display_text)] decision links for an event, or None if the page couldn't be fetched.
+
+    Settled events are served from the cached bout list without a request."""
+    event_url = MMADECISIONS_BASE_URL + e_link.strip()
+    cached = _index_cache['events'].get(event_url)
+    if cached and not force and _event_is_settled(cached, e_date):
+        _index_stats['cached'] += 1
+        print(f"  [cached] settled event, {len(cached['bouts'])} decisions")
+        return [tuple(b) for b in cached['bouts']]
+
+    event_html = fetch_event_page(e_link, e_name)
+    _index_stats['fetched'] += 1
+    if not event_html:
+        return None
+    bouts = parse_event_bouts(event_html)
+    fp = fingerprint(bouts)
+    if cached and cached['fingerprint'] != fp:
+        print(f"  [changed] bout list: {len(cached['bouts'])} -> {len(bouts)} decisions")
+    _index_cache['events'][event_url] = {
+        'fingerprint': fp,
+        'bouts': [list(b) for b in bouts],
+        'fetched_at': datetime.now().isoformat(timespec='seconds'),
+        'first_seen': cached['first_seen'] if cached else datetime.now().isoformat(timespec='seconds'),
+    }
+    return bouts
+
+# --- 5. DEAD-LETTER RETRY (runs before any discovery) ---
+
+def retry_failed_items():
+    """Retry event and decision pages that failed on earlier runs and whose backoff has elapsed."""
+    load_manifest()
+    load_index_cache()
+    retry_queue.load_queue()
+    event_items = retry_queue.due_items('judge_event')
+    fight_items = retry_queue.due_items('judge_fight')
+    if not event_items and not fight_items:
+        print(f"Retry queue: nothing due — {retry_queue.summarize(('judge_event', 'judge_fight'))}")
+        return
+    print(f"\n--- Retrying {len(event_items)} event pages, {len(fight_items)} decision pages from the retry queue ---")
+
+    retry_bouts = [(MMADECISIONS_BASE_URL, item['payload']['link'], item['payload']['name'])
+                   for item in fight_items]
+    for item in event_items:
+        print(f"\nRetrying Event: {item['payload']['name']}  (attempt {item['attempts'] + 1}, last error {item['error']})")
+        bouts = get_event_bouts(item['payload']['link'], item['payload']['name'], force=True)
+        if bouts is not None:
+            retry_bouts.extend(filter_new_bouts(bouts))
+
+    inserted = run_bout_workers(list(dict.fromkeys(retry_bouts)))
+    save_manifest()
+    save_index_cache()
+    retry_queue.save_queue()
+    print(f"Retry pass: {inserted:,} bouts inserted — {retry_queue.summarize(('judge_event', 'judge_fight'))}")
+
+# --- 6. MAIN ORCHESTRATOR (OPTIMIZED) ---
+
+def scrapeDataFunction(start_year, end_year, force_refresh=False):
+    load_manifest()
+    load_index_cache()
+    print(f"Manifest: {len(_manifest):,} decision URLs known ({MANIFEST_PATH.name})")
+    try:
+        _scan_years(start_year, end_year, force_refresh)
+    finally:
+        save_index_cache()
+        print(f"\nIndex pages: {_index_stats['fetched']:,} fetched, {_index_stats['cached']:,} served from cache "
+              f"({INDEX_CACHE_PATH.name})")
+
+def _scan_years(start_year, end_year, force_refresh):
+    year_cells = get_years(force=force_refresh)
+    if not year_cells: return
     years_to_process = sorted([y for y in year_cells if start_year <= int(y) <= end_year], reverse=True)
 
     events_skipped_in_a_row = 0
@@ -229,61 +726,16 @@ def scrapeDataFunction(start_year, end_year):
     for y in years_to_process:
         year_start = time.time()
         print(f"\n--- Processing Year: {y} ---")
-        year_html = fetch_page(f"{url}{y}/")
-        if not year_html: continue
-        year_soup = BeautifulSoup(year_html, 'html.parser')
-        
-        # Get all links and their text (Event Names)
-        links = year_soup.find_all('a')
-        ufc_events = [(a.get('href'), a.text.strip()) for a in links
-                      if 'UFC' in a.text or 'TUF' in a.text or 'The Ultimate Fighter' in a.text]
-        
-        for e_link, e_name in ufc_events:
-            print(f"\nChecking Event: {e_name}")
+        ufc_events = get_year_events(y, force=force_refresh)
+        if ufc_events is None: continue
 
-            event_html = fetch_page(base_url + e_link)
-            if not event_html: continue
-            bout_soup = BeautifulSoup(event_html, 'html.parser')
-            # Capture (href, display_text) — display text has proper fighter name casing
-            bouts = [
-                (a.get('href'), clean_string(a.get_text(strip=True)))
-                for a in bout_soup.find_all('a')
-                if 'decision/' in a.get('href', '') and a.get_text(strip=True)
-            ]
+        for e_link, e_name, e_date in ufc_events:
+            print(f"\nChecking Event: {e_name}")
 
-            # QUICK CHECK: derive expected bout name from URL slug, which matches
-            # what extract_fight_data stores (event page uses "X def. Y" format, never "X vs Y",
-            # so bout_display never has " vs " and the URL-fallback path always runs)
-            def url_to_bout(href):
-                return href.strip().split('/')[-1].replace('-', ' ')
+            bouts = get_event_bouts(e_link, e_name, e_date, force=force_refresh)
+            if bouts is None: continue
 
-            url_bout_names = [url_to_bout(b_link) for b_link, _ in bouts]
-            if url_bout_names:
-                existing_res = supabase_db.table("judge_scores").select("bout").in_("bout", url_bout_names).execute()
-                existing_bouts = set(row['bout'] for row in existing_res.data)
-            else:
-                existing_bouts = set()
-
-            new_fights_processed = 0
-            new_bouts = []
-            for b_link, b_name in bouts:
-                if url_to_bout(b_link) in existing_bouts:
-                    print(f"  [skip] {b_name}")
-                else:
-                    new_bouts.append((base_url, b_link, b_name))
-
-            if new_bouts:
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures = {
-                        executor.submit(fetch_fight_page_and_insert, args): args
-                        for args in new_bouts
-                    }
-                    for future in as_completed(futures):
-                        try:
-                            if future.result():
-                                new_fights_processed += 1
-                        except Exception as e:
-                            logging.error(f"Worker exception for {futures[future][1]}: {e}")
+            new_fights_processed = run_bout_workers(filter_new_bouts(bouts))
 
             # Update skip logic
             if new_fights_processed == 0 and len(bouts) > 0:
@@ -292,6 +744,9 @@ def scrapeDataFunction(start_year, end_year):
             elif new_fights_processed > 0:
                 events_skipped_in_a_row = 0 
 
+            save_manifest()
+            retry_queue.save_queue()
+
             # If we hit the threshold, it means we are deep into "already scraped" territory
             if events_skipped_in_a_row >= STOP_THRESHOLD:
                 print(f"\nReached {STOP_THRESHOLD} consecutive existing events. Stopping scraper.")
@@ -300,6 +755,164 @@ def scrapeDataFunction(start_year, end_year):
         elapsed = time.time() - year_start
         print(f"\n--- Year {y} complete in {elapsed:.1f}s ---")
 
+# --- 7. COVERAGE-DRIVEN GAP-FILL ---
+# Reads judge_scores_coverage (missing / partial fights) and fetches only the year, event and
+# decision pages those fights map to — cost scales with the number of gaps, not years scanned.
+
+def _norm(text):
+    # NFKD before the strip so accented chars keep their base letter (ñ→n, ä→a)
+    s = unicodedata.normalize('NFKD', (text or '').lower())
+    s = re.sub(r'[^a-z0-9\s]', '', s)
+    return re.sub(r'\s+', ' ', s).strip()
+
+def _event_names_match(mmd_name, ufcstats_name):
+    """Fallback when the year page row carries no date: numbered events match on their
+    prefix ("UFC 296"), Fight Nights on a shared headliner word."""
+    mmd_prefix, _, mmd_rest = mmd_name.partition(':')
+    ufc_prefix, _, ufc_rest = ufcstats_name.partition(':')
+    mmd_prefix, ufc_prefix = _norm(mmd_prefix), _norm(ufc_prefix)
+    if mmd_prefix == ufc_prefix and any(c.isdigit() for c in mmd_prefix):
+        return True
+    mmd_words = {w for w in _norm(mmd_rest).split() if len(w) > 3}
+    ufc_words = {w for w in _norm(ufc_rest).split() if len(w) > 3}
+    return mmd_prefix == ufc_prefix and bool(mmd_words & ufc_words)
+
+def _fighter_in_slug(name, slug_words, slug_collapsed):
+    words = _norm(name).split()
+    if not words:
+        return False
+    return words[-1] in slug_words or ''.join(words) in slug_collapsed
+
+def load_coverage_gaps(start_year, end_year):
+    rows, page_size, offset = [], 1000, 0
+    while True:
+        res = supabase_db.table("judge_scores_coverage")\
+            .select("event_date, event_name, fighter1_name, fighter2_name, coverage_status")\
+            .in_("coverage_status", ["missing", "partial"])\
+            .gte("event_date", f"{start_year}-01-01")\
+            .lte("event_date", f"{end_year}-12-31")\
+            .range(offset, offset + page_size - 1)\
+            .execute()
+        batch = res.data or []
+        rows.extend(batch)
+        if len(batch) < page_size:
+            break
+        offset += page_size
+    return rows
+
+def gap_fill(start_year, end_year, force_refresh=False):
+    base_url = MMADECISIONS_BASE_URL
+    load_manifest()
+    load_index_cache()
+
+    gaps = load_coverage_gaps(start_year, end_year)
+    print(f"Coverage gaps {start_year}-{end_year}: {len(gaps):,} fights "
+          f"({sum(1 for g in gaps if g['coverage_status'] == 'missing'):,} missing, "
+          f"{sum(1 for g in gaps if g['coverage_status'] == 'partial'):,} partial)")
+    if not gaps:
+        return
+
+    # year -> ufcstats event_name -> {'date': date, 'fights': [gap rows]}
+    gaps_by_year = defaultdict(dict)
+    for g in gaps:
+        ev_date = date.fromisoformat(g['event_date'])
+        event = gaps_by_year[ev_date.year].setdefault(g['event_name'], {'date': ev_date, 'fights': []})
+        event['fights'].append(g)
+
+    decision_pages = 0
+    total_inserted = 0
+    for y in sorted(gaps_by_year, reverse=True):
+        gap_events = gaps_by_year[y]
+        print(f"\n--- Gap-fill Year: {y} ({len(gap_events)} events with gaps) ---")
+        year_events = get_year_events(y, force=force_refresh)
+        if year_events is None:
+            continue
+
+        for e_link, e_name, e_date in year_events:
+            matched = [
+                ev for ev_name, ev in gap_events.items()
+                if (abs((ev['date'] - e_date).days) <= 1 if e_date else _event_names_match(e_name, ev_name))
+            ]
+            if not matched:
+                continue
+            gap_fights = [f for ev in matched for f in ev['fights']]
+            print(f"\nChecking Event: {e_name}  ({len(gap_fights)} gap fights)")
+
+            bouts = get_event_bouts(e_link, e_name, e_date, force=force_refresh)
+            if bouts is None:
+                continue
+
+            new_bouts = []
+            for b_link, b_name in bouts:
+                slug = _norm(url_to_bout(b_link))
+                slug_words, slug_collapsed = set(slug.split()), slug.replace(' ', '')
+                if not any(_fighter_in_slug(f['fighter1_name'], slug_words, slug_collapsed) and
+                           _fighter_in_slug(f['fighter2_name'], slug_words, slug_collapsed)
+                           for f in gap_fights):
+                    continue
+                if manifest_status(base_url + b_link.strip()) == 'scraped':
+                    print(f"  [skip] {b_name} (already scraped — coverage gap is a name-match artefact)")
+                    continue
+                new_bouts.append((base_url, b_link, b_name))
+
+            decision_pages += len(new_bouts)
+            total_inserted += run_bout_workers(new_bouts)
+            save_manifest()
+            save_index_cache()
+            retry_queue.save_queue()
+
+    pages_fetched = _index_stats['fetched'] + decision_pages
+    print(f"\nGap-fill complete: {total_inserted:,} bouts inserted, {pages_fetched:,} pages requested "
+          f"({_index_stats['cached']:,} index pages served from cache).")
+
+def reconcile_manifest():
+    """Sync the local manifest against judge_scores.
+
+    Entries whose bout has vanished from the DB are marked 'missing' (re-scraped next run);
+    row counts are refreshed for the rest. DB bouts the manifest has never seen are only
+    reported — their decision URL can't be rebuilt from the bout name, and the next normal
+    run records them as 'in_db' when it meets them on an event page.
+    """
+    load_manifest()
+    print(f"Reconciling {len(_manifest):,} manifest entries against judge_scores ...")
+
+    db_rows = Counter()
+    page_size, offset = 1000, 0
+    while True:
+        res = supabase_db.table("judge_scores").select("bout").range(offset, offset + page_size - 1).execute()
+        batch = res.data or []
+        db_rows.update(row['bout'] for row in batch)
+        if len(batch) < page_size:
+            break
+        offset += page_size
+    print(f"  judge_scores: {sum(db_rows.values()):,} rows across {len(db_rows):,} bouts")
+
+    n_verified = n_missing = n_updated = 0
+    manifest_bouts = set()
+    for fight_url, entry in _manifest.items():
+        bout = url_to_bout(fight_url)
+        manifest_bouts.add(bout)
+        n_db = db_rows.get(bout, 0)
+        if n_db == 0:
+            if entry['status'] in MANIFEST_SKIP_STATUSES:
+                entry['status'] = 'missing'
+                entry['rows'] = 0
+                n_missing += 1
+        elif entry['status'] not in MANIFEST_SKIP_STATUSES or entry['rows'] != n_db:
+            if entry['status'] not in MANIFEST_SKIP_STATUSES:
+                entry['status'] = 'in_db'
+            entry['rows'] = n_db
+            n_updated += 1
+        else:
+            n_verified += 1
+
+    save_manifest()
+    untracked = len(set(db_rows) - manifest_bouts)
+    print(f"  Verified:               {n_verified:,}")
+    print(f"  Row counts updated:     {n_updated:,}")
+    print(f"  Marked missing:         {n_missing:,}")
+    print(f"  DB bouts not in manifest: {untracked:,}")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--start", type=int, default=DEFAULT_START_YEAR)
@@ -308,14 +921,29 @@ if __name__ == "__main__":
                         help="Disable early-stop threshold (use for targeted gap-fill runs)")
     parser.add_argument("--yes", "-y", action="store_true",
                         help="Skip confirmation prompt")
+    parser.add_argument("--gap-fill", action="store_true",
+                        help="Fetch only fights listed as missing/partial in judge_scores_coverage")
+    parser.add_argument("--refresh-index", action="store_true",
+                        help="Re-fetch past year pages and settled event pages instead of using the index cache")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="Sync the local decision-URL manifest against judge_scores, then exit")
     args = parser.parse_args()
 
+    if args.reconcile:
+        reconcile_manifest()
+        sys.exit(0)
+
     if args.no_stop:
         STOP_THRESHOLD = 999999
 
     if args.yes:
         confirm = 'yes'
     else:
-        confirm = input(f"Start incremental judge scrape from {args.start} to {args.end}? (yes/no): ")
+        mode = "gap-fill" if args.gap_fill else "incremental"
+        confirm = input(f"Start {mode} judge scrape from {args.start} to {args.end}? (yes/no): ")
     if confirm.lower() == 'yes':
-        scrapeDataFunction(args.start, args.end)
\ No newline at end of file
+        retry_failed_items()
+        if args.gap_fill:
+            gap_fill(args.start, args.end, force_refresh=args.refresh_index)
+        else:
+            scrapeDataFunction(args.start, args.end, force_refresh=args.refresh_index)
\ No newline at end of file
@@ -5,38 +5,15 @@ import { supabase } from '../supabaseClient';
 import RoundScoringPanel from './RoundScoringPanel';
 import ScorecardComparison from './ScorecardComparison';
 import * as guestStorage from '../guestStorage';
+import { loadScoringModel } from '../modelRegistry';
 
-// --- SCORING MODEL (Logistic Regression, 82.50% holdout accuracy) ---
-// Feature order and scaler values from scoring_model/scoring_model.json
-
-const MODEL_COEFFICIENTS = [
-  0.5984894,   // kd_diff
-  0.49823478,  // sig_landed_diff
-  -0.04311526, // sig_pct_diff
-  0.60252248,  // head_landed_diff
-  0.06992616,  // body_landed_diff
-  -0.01308783, // leg_landed_diff
-  0.3025662,   // dist_landed_diff
-  0.18665426,  // clinch_landed_diff
-  0.50149266,  // ground_landed_diff
-  0.44193818,  // td_landed_diff
-  0.13082277,  // td_pct_diff
-  1.00686459,  // ctrl_sec_diff  ← #1 feature
-  0.44003705,  // sub_attempts_diff
-  0.50136414,  // sig_landed_ratio
-  0.0610226,   // head_landed_ratio
-  -0.28223356, // td_landed_ratio
-  -0.04561826, // ctrl_sec_ratio
-  0.0333875,   // ground_landed_ratio
-  -0.0,        // post_2016
-];
-const MODEL_INTERCEPT = -0.0;
-const SCALER_MEAN = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.5, 0.5, 0.5, 0.5, 0.5, 0.77731692];
-const SCALER_STD  = [0.29094502, 12.68527486, 21.57676883, 10.05561868, 4.61613633, 4.68220269, 9.50068422, 3.8118023, 5.45206403, 1.2199469, 53.55316046, 116.89020126, 0.50086893, 0.1769014, 0.21193544, 0.41433619, 0.40837406, 0.43765438, 0.41604726];
+// --- SCORING MODEL (Logistic Regression) ---
+// Coefficients and scaler come from the current registry artifact (loadScoringModel), in the
+// feature order of scoring_model/features.py
 
 function sigmoid(x) { return 1 / (1 + Math.exp(-x)); }
 
-function scoreRound(f1Stats, f2Stats, eventYear) {
+function scoreRound(f1Stats, f2Stats, eventYear, model) {
   // No stats available — skip model
   if (!f1Stats && !f2Stats) return { f1Score: 10, f2Score: 10, winner: 'draw', confidence: null };
 
@@ -76,9 +53,9 @@ function scoreRound(f1Stats, f2Stats, eventYear) {
   const features = [...diffs, ...ratios, post2016];
 
   const score = features.reduce((sum, f, i) => {
-    const scaled = (f - SCALER_MEAN[i]) / SCALER_STD[i];
-    return sum + MODEL_COEFFICIENTS[i] * scaled;
-  }, MODEL_INTERCEPT);
+    const scaled = (f - model.scalerMean[i]) / model.scalerStd[i];
+    return sum + model.coefficients[i] * scaled;
+  }, model.intercept);
 
   const p = sigmoid(score); // P(f1 wins round)
   const winner = p >= 0.5 ? 'f1' : 'f2';
@@ -148,7 +125,16 @@ function boutMatchesComp(bout, comp) {
   return compNames.some(n => matchesFighter(n, parts[0])) && compNames.some(n => matchesFighter(n, parts[1]));
 }
 
-function buildRoundData(meta, roundStats, judgeScores, eventYear) {
+function buildRoundData(meta, roundStats, judgeScores, eventYear, judgeLink, scoringModel) {
+  // Linked fights: judgeScores is already this bout's scorecard and fight_judge_links gives
+  // the exact mmadecisions spelling of each fighter. Otherwise fall back to name matching.
+  const isF1 = judgeLink
+    ? js => js.fighter === judgeLink.f1_js_name
+    : js => matchesFighter(js.fighter, meta.fighter1_name);
+  const isF2 = judgeLink
+    ? js => js.fighter === judgeLink.f2_js_name
+    : js => matchesFighter(js.fighter, meta.fighter2_name);
+
   const roundsFought = parseInt((meta.round || '').split(' ')[0]) || 0;
   if (roundsFought === 0) return [];
 
@@ -156,17 +142,14 @@ function buildRoundData(meta, roundStats, judgeScores, eventYear) {
     const r = i + 1;
     const f1Stats = roundStats.find(s => s.fighter_name === meta.fighter1_name && s.round === r) || null;
     const f2Stats = roundStats.find(s => s.fighter_name === meta.fighter2_name && s.round === r) || null;
-    const model = scoreRound(f1Stats, f2Stats, eventYear);
+    const model = scoreRound(f1Stats, f2Stats, eventYear, scoringModel);
 
     // Filter judge rows for this round that belong to this fight's fighters
-    const roundJudgeRows = judgeScores.filter(js =>
-      js.round === r &&
-      (matchesFighter(js.fighter, meta.fighter1_name) || matchesFighter(js.fighter, meta.fighter2_name))
-    );
+    const roundJudgeRows = judgeScores.filter(js => js.round === r && (isF1(js) || isF2(js)));
     const judgeNames = [...new Set(roundJudgeRows.map(js => js.judge))];
     const judges = judgeNames.map(judgeName => {
-      const f1Row = roundJudgeRows.find(js => js.judge === judgeName && matchesFighter(js.fighter, meta.fighter1_name));
-      const f2Row = roundJudgeRows.find(js => js.judge === judgeName && matchesFighter(js.fighter, meta.fighter2_name));
+      const f1Row = roundJudgeRows.find(js => js.judge === judgeName && isF1(js));
+      const f2Row = roundJudgeRows.find(js => js.judge === judgeName && isF2(js));
       // Require both sides — a judge with only one fighter is a cross-fight name collision
       if (!f1Row || !f2Row) return null;
       const f1Score = f1Row.score;
@@ -200,6 +183,11 @@ const FightDetailView = ({ fight, currentTheme, onBack, isGuest = false }) => {
   const [meta, setMeta] = useState(null);
   const [rounds, setRounds] = useState([]);
   const [error, setError] = useState(null);
+  const [fightDetail, setFightDetail] = useState(null);    // getFightDetail result + eventYear
+  const [scoringModel, setScoringModel] = useState(null);
+  const [modelError, setModelError] = useState(null);
+  const busy = loading || (!scoringModel && !modelError);
+  const shownError = error || modelError;
   const [detailTab, setDetailTab] = useState('overview');
 
   // Whether the current user has submitted any scores for this fight
@@ -377,7 +365,7 @@ const FightDetailView = ({ fight, currentTheme, onBack, isGuest = false }) => {
       setLoading(true);
       setError(null);
       try {
-        const { meta: m, roundStats, judgeScores } = await dataService.getFightDetail(
+        const { meta: m, roundStats, judgeScores, judgeLink } = await dataService.getFightDetail(
           fight.fight_url,
           fight.event_name,
           fight.event_date
@@ -394,8 +382,7 @@ const FightDetailView = ({ fight, currentTheme, onBack, isGuest = false }) => {
           console.log(`[FightDetail] normName f1="${normName(m.fighter1_name)}" f2="${normName(m.fighter2_name)}"`);
         }
         const eventYear = fight.event_date ? new Date(fight.event_date).getFullYear() : new Date().getFullYear();
-        const roundData = buildRoundData(m, roundStats, judgeScores, eventYear);
-        setRounds(roundData);
+        setFightDetail({ meta: m, roundStats, judgeScores, judgeLink, eventYear });
       } catch (err) {
         console.error('FightDetailView load error:', err);
         setError('Failed to load fight details.');
@@ -406,6 +393,25 @@ const FightDetailView = ({ fight, currentTheme, onBack, isGuest = false }) => {
     load();
   }, [fight.fight_url, fight.event_name, fight.event_date]);
 
+  // Scoring model: current registry artifact, fetched in parallel with the fight detail
+  // (modelRegistry.js decodes each artifact once per page)
+  useEffect(() => {
+    let cancelled = false;
+    loadScoringModel()
+      .then(model => { if (!cancelled) setScoringModel(model); })
+      .catch(err => {
+        console.error('FightDetailView scoring model error:', err);
+        if (!cancelled) setModelError('Failed to load the scoring model.');
+      });
+    return () => { cancelled = true; };
+  }, []);
+
+  useEffect(() => {
+    if (!fightDetail || !scoringModel) return;
+    const { meta: m, roundStats, judgeScores, judgeLink, eventYear } = fightDetail;
+    setRounds(buildRoundData(m, roundStats, judgeScores, eventYear, judgeLink, scoringModel));
+  }, [fightDetail, scoringModel]);
+
   if (!fight) return null;
 
   const STATS_ROWS = (rd) => [
@@ -546,21 +552,21 @@ const FightDetailView = ({ fight, currentTheme, onBack, isGuest = false }) => {
       </button>
 
       {/* LOADING */}
-      {loading && (
+      {busy && (
         <div className="flex items-center justify-center py-24">
           <div className="w-8 h-8 border-2 border-pulse-red border-t-transparent rounded-full animate-spin" />
         </div>
       )}
 
       {/* ERROR */}
-      {!loading && error && (
+      {!busy && shownError && (
         <div className="bg-pulse-surface border border-white/[0.06] rounded-fight p-6 text-center">
           <p className="text-sm text-pulse-text-3 uppercase tracking-widest">{error}</p>
         </div>
       )}
 
       {/* CONTENT */}
-      {!loading && !error && (
+      {!busy && !shownError && (
         <>
           {/* FIGHT HEADER — two-column avatar layout */}
           <div className="bg-pulse-surface border border-white/[0.06] rounded-fight p-5 mb-3">
@@ -107,24 +107,39 @@ export const dataService = {
 
   // --- FIGHT DETAIL (meta + round stats + judge scores) ---
   async getFightDetail(fightUrl, eventName, eventDate) {
-    const { data: meta, error: metaErr } = await supabase
-      .from('fight_meta_details')
-      .select('*')
-      .eq('fight_url', fightUrl)
-      .single();
+    const [{ data: meta, error: metaErr }, { data: judgeLink }] = await Promise.all([
+      supabase
+        .from('fight_meta_details')
+        .select('*')
+        .eq('fight_url', fightUrl)
+        .single(),
+      // Persisted fight ↔ scorecard pairing (judge_links.py) — null until the next Phase 6 sync
+      supabase
+        .from('fight_judge_links')
+        .select('js_bout, js_date, f1_js_name, f2_js_name')
+        .eq('fight_url', fightUrl)
+        .maybeSingle()
+    ]);
 
     if (metaErr || !meta) {
       if (metaErr) console.error('getFightDetail meta error:', metaErr);
-      return { meta: null, roundStats: [], judgeScores: [] };
+      return { meta: null, roundStats: [], judgeScores: [], judgeLink: null };
     }
 
     const fighters = [meta.fighter1_name, meta.fighter2_name];
 
-    // Widen the date window by ±1 day to handle international events (e.g. Australia)
-    // where mmadecisions.com records the local date, which is 1 day ahead of ufc_events.
-    const d = new Date(eventDate);
-    const dateMinus1 = new Date(d.getTime() - 86400000).toISOString().split('T')[0];
-    const datePlus1  = new Date(d.getTime() + 86400000).toISOString().split('T')[0];
+    let judgeQuery = supabase.from('judge_scores').select('*');
+    if (judgeLink) {
+      judgeQuery = judgeQuery.eq('bout', judgeLink.js_bout).eq('date', judgeLink.js_date);
+    } else {
+      // Not linked yet: widen the date window by ±1 day to handle international events
+      // (e.g. Australia) where mmadecisions.com records the local date, which is 1 day
+      // ahead of ufc_events. buildRoundData name-matches the rows.
+      const d = new Date(eventDate);
+      const dateMinus1 = new Date(d.getTime() - 86400000).toISOString().split('T')[0];
+      const datePlus1  = new Date(d.getTime() + 86400000).toISOString().split('T')[0];
+      judgeQuery = judgeQuery.gte('date', dateMinus1).lte('date', datePlus1);
+    }
 
     const [{ data: roundStats, error: statsErr }, { data: judgeScores, error: scoresErr }] = await Promise.all([
       supabase
@@ -133,18 +148,13 @@ export const dataService = {
         .eq('event_name', eventName)
         .in('fighter_name', fighters)
         .order('round', { ascending: true }),
-      supabase
-        .from('judge_scores')
-        .select('*')
-        .gte('date', dateMinus1)
-        .lte('date', datePlus1)
-        .order('round', { ascending: true })
+      judgeQuery.order('round', { ascending: true })
     ]);
 
     if (statsErr) console.error('round_fight_stats error:', statsErr);
     if (scoresErr) console.error('judge_scores error:', scoresErr);
 
-    return { meta, roundStats: roundStats || [], judgeScores: judgeScores || [] };
+    return { meta, roundStats: roundStats || [], judgeScores: judgeScores || [], judgeLink: judgeLink || null };
   },
 
   // --- USER ROUND SCORING ---
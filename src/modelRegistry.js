@@ -0,0 +1,49 @@
+// Scoring model artifacts published by scoring_model/model_registry.py into public/models/scoring/.
+// current.json names the current artifact (fetched without cache); <hash>.bin is immutable, so it is
+// fetched with the browser cache and parsed once per hash for the lifetime of the page.
+const BASE = `${process.env.PUBLIC_URL || ''}/models/scoring`;
+const HEADER_BYTES = 16;  // 'UFCM' | u16 format | u16 n_features | 8-byte feature spec hash
+const FORMAT_VERSION = 1;
+
+const models = new Map();  // artifact hash -> Promise<model>
+
+function decodeModel(buffer, artifact) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  const format = view.getUint16(4, true);
+  const n = view.getUint16(6, true);
+  if (magic !== 'UFCM' || format !== FORMAT_VERSION || buffer.byteLength !== HEADER_BYTES + 4 * (3 * n + 1)) {
+    throw new Error(`Scoring model ${artifact}: unsupported artifact`);
+  }
+  const floats = i => view.getFloat32(HEADER_BYTES + 4 * i, true);
+  const range = (from, len) => Array.from({ length: len }, (_, i) => floats(from + i));
+  return {
+    artifact,
+    coefficients: range(0, n),
+    intercept:    floats(n),
+    scalerMean:   range(n + 1, n),
+    scalerStd:    range(2 * n + 1, n),
+  };
+}
+
+export async function currentArtifact() {
+  const res = await fetch(`${BASE}/current.json`, { cache: 'no-cache' });
+  if (!res.ok) throw new Error(`Scoring model index: HTTP ${res.status}`);
+  return res.json();  // { artifact, sha256, version, features }
+}
+
+// Model for an artifact hash (default: current) — { artifact, coefficients, intercept, scalerMean, scalerStd }
+export function loadScoringModel(artifact) {
+  if (!artifact) return currentArtifact().then(cur => loadScoringModel(cur.artifact));
+  if (!models.has(artifact)) {
+    const pending = fetch(`${BASE}/${artifact}.bin`)
+      .then(res => {
+        if (!res.ok) throw new Error(`Scoring model ${artifact}: HTTP ${res.status}`);
+        return res.arrayBuffer();
+      })
+      .then(buffer => decodeModel(buffer, artifact));
+    pending.catch(() => models.delete(artifact));  // let a failed fetch be retried
+    models.set(artifact, pending);
+  }
+  return models.get(artifact);
+}
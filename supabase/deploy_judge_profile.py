@@ -135,39 +135,23 @@ BEGIN
       WHERE rv.judge_count >= 2
     ),
 
-    -- 8. Match each (bout, date) to fight_meta_details for weight class + fighter names.
-    unique_bouts AS (
-      SELECT DISTINCT
-        bout,
-        date,
-        TRIM(SPLIT_PART(bout, ' vs ', 1)) AS js_f1,
-        TRIM(SPLIT_PART(bout, ' vs ', 2)) AS js_f2
-      FROM judge_decisions
-    ),
-
+    -- 8. Resolve each (bout, date) to fight_meta_details via the persisted link table
+    --    (judge_links.py) for weight class + fighter names.
     bout_fmd AS (
-      SELECT DISTINCT ON (ub.bout, ub.date)
-        ub.bout  AS js_bout,
-        ub.date  AS js_date,
+      SELECT
+        l.js_bout,
+        l.js_date,
         fmd.event_name AS fmd_event_name,
         fmd.bout       AS fmd_bout,
         fmd.fight_url,
         fmd.fighter1_name,
         fmd.fighter2_name,
         COALESCE(fmd.weight_class_clean, fmd.weight_class) AS weight_class_clean
-      FROM unique_bouts ub
-      JOIN ufc_events ue
-        ON  ue.event_date BETWEEN ub.date - INTERVAL '1 day' AND ub.date + INTERVAL '1 day'
-      JOIN fight_meta_details fmd
-        ON  fmd.event_name = ue.event_name
-        AND (
-          (   lower(split_part(ub.js_f1, ' ', -1)) = lower(split_part(fmd.fighter1_name, ' ', -1))
-          AND lower(split_part(ub.js_f2, ' ', -1)) = lower(split_part(fmd.fighter2_name, ' ', -1)))
-          OR
-          (   lower(split_part(ub.js_f1, ' ', -1)) = lower(split_part(fmd.fighter2_name, ' ', -1))
-          AND lower(split_part(ub.js_f2, ' ', -1)) = lower(split_part(fmd.fighter1_name, ' ', -1)))
-        )
-      ORDER BY ub.bout, ub.date
+      FROM judge_bouts jb
+      JOIN fight_judge_links l
+        ON  l.js_bout = jb.bout
+        AND l.js_date = jb.date
+      JOIN fight_meta_details fmd ON fmd.fight_url = l.fight_url
     ),
 
     -- 9. Join decisions to fight meta (LEFT: rounds without meta still included in basic stats).
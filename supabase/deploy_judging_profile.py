@@ -62,8 +62,9 @@ BEGIN
         AND fmd.fighter2_name IS NOT NULL
     ),
 
-    -- 2. Fetch all judge_scores rows (one row per fighter per judge per round)
-    --    within ±1 day of the fight date that name-match either fighter.
+    -- 2. Fetch the judge_scores rows linked to each fight (one row per fighter per judge
+    --    per round). fight_judge_links holds the (bout, date) pairing + fighter orientation
+    --    computed once by judge_links.py, so this is a plain equi-join.
     judge_rows AS (
       SELECT
         ur.fight_id,
@@ -71,19 +72,17 @@ BEGIN
         ur.user_f1,
         ur.user_f2,
         ur.weight_class_clean,
-        ur.fighter1_name,
-        ur.fighter2_name,
+        l.f1_js_name,
+        l.f2_js_name,
         js.judge,
         js.fighter  AS js_fighter,
         js.score
       FROM user_rounds ur
+      JOIN fight_judge_links l ON l.fight_url = ur.fight_url
       JOIN judge_scores js
-        ON  js.date  BETWEEN ur.event_date - INTERVAL '1 day' AND ur.event_date + INTERVAL '1 day'
+        ON  js.bout  = l.js_bout
+        AND js.date  = l.js_date
         AND js.round = ur.round
-        AND (
-          lower(split_part(ur.fighter1_name, ' ', -1)) = lower(split_part(js.fighter, ' ', -1))
-          OR lower(split_part(ur.fighter2_name, ' ', -1)) = lower(split_part(js.fighter, ' ', -1))
-        )
     ),
 
     -- 3. Pivot to one row per (fight, round, judge) with f1/f2 scores.
@@ -96,14 +95,10 @@ BEGIN
         user_f2,
         weight_class_clean,
         judge,
-        MAX(CASE
-          WHEN lower(split_part(fighter1_name, ' ', -1)) = lower(split_part(js_fighter, ' ', -1))
-          THEN score END) AS judge_f1_score,
-        MAX(CASE
-          WHEN lower(split_part(fighter2_name, ' ', -1)) = lower(split_part(js_fighter, ' ', -1))
-          THEN score END) AS judge_f2_score
+        MAX(CASE WHEN js_fighter = f1_js_name THEN score END) AS judge_f1_score,
+        MAX(CASE WHEN js_fighter = f2_js_name THEN score END) AS judge_f2_score
       FROM judge_rows
-      GROUP BY fight_id, round, user_f1, user_f2, weight_class_clean, judge, fighter1_name, fighter2_name
+      GROUP BY fight_id, round, user_f1, user_f2, weight_class_clean, judge
     ),
 
     complete_judges AS (
@@ -60,7 +60,7 @@ BEGIN
         AND fmd.fighter2_name IS NOT NULL
     ),
 
-    -- 2. Judge's scores for the same fights, matched by date ±1 day + last-name
+    -- 2. Judge's scores for the same fights, via the persisted fight ↔ scorecard link
     judge_rows AS (
       SELECT
         ur.fight_id,
@@ -68,19 +68,17 @@ BEGIN
         ur.user_f1,
         ur.user_f2,
         ur.weight_class_clean,
-        ur.fighter1_name,
-        ur.fighter2_name,
+        l.f1_js_name,
+        l.f2_js_name,
         js.fighter AS js_fighter,
         js.score
       FROM user_rounds ur
+      JOIN fight_judge_links l ON l.fight_url = ur.fight_url
       JOIN judge_scores js
-        ON  js.date  BETWEEN ur.event_date - INTERVAL '1 day' AND ur.event_date + INTERVAL '1 day'
+        ON  js.bout  = l.js_bout
+        AND js.date  = l.js_date
         AND js.round = ur.round
         AND js.judge = p_judge
-        AND (
-          lower(split_part(ur.fighter1_name, ' ', -1)) = lower(split_part(js.fighter, ' ', -1))
-          OR lower(split_part(ur.fighter2_name, ' ', -1)) = lower(split_part(js.fighter, ' ', -1))
-        )
     ),
 
     -- 3. Pivot to one row per (fight_id, round) with judge's f1/f2 scores
@@ -91,10 +89,10 @@ BEGIN
         user_f1,
         user_f2,
         weight_class_clean,
-        MAX(CASE WHEN lower(split_part(fighter1_name, ' ', -1)) = lower(split_part(js_fighter, ' ', -1)) THEN score END) AS judge_f1,
-        MAX(CASE WHEN lower(split_part(fighter2_name, ' ', -1)) = lower(split_part(js_fighter, ' ', -1)) THEN score END) AS judge_f2
+        MAX(CASE WHEN js_fighter = f1_js_name THEN score END) AS judge_f1,
+        MAX(CASE WHEN js_fighter = f2_js_name THEN score END) AS judge_f2
       FROM judge_rows
-      GROUP BY fight_id, round, user_f1, user_f2, weight_class_clean, fighter1_name, fighter2_name
+      GROUP BY fight_id, round, user_f1, user_f2, weight_class_clean
     ),
 
     -- 4. Shared rounds with both sides' winners (exclude 10-10 draws from either)
@@ -0,0 +1,81 @@
+"""
+migrate_fight_decision_probabilities.py — Create the fight_decision_probabilities table.
+
+fight_decision_probabilities: one row per decision fight — the exact distribution of one
+judge's scorecard under the round model (round_predictions + a calibrated 10-8 rate),
+combined over three independent cards into P(fighter1 wins the decision), P(draw),
+P(fighter2 wins), the official result and upset_index = 1 - P(official result). Written by scoring_model/decision_probability.py
+(the master pipeline runs it after score_rounds.py). Populate with:
+    python scoring_model/decision_probability.py --full
+
+Run once:
+    python supabase/migrate_fight_decision_probabilities.py
+"""
+
+import sys
+import os
+import requests
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+
+supabase_url = os.environ.get("REACT_APP_SUPABASE_URL", "")
+mgmt_key = os.environ.get("SUPABASE_MANAGEMENT_KEY", "")
+
+if not supabase_url or not mgmt_key:
+    raise SystemExit("Missing REACT_APP_SUPABASE_URL or SUPABASE_MANAGEMENT_KEY in .env")
+
+project_ref = supabase_url.replace("https://", "").split(".")[0]
+MGMT_QUERY_URL = f"https://api.supabase.com/v1/projects/{project_ref}/database/query"
+HEADERS = {"Authorization": f"Bearer {mgmt_key}", "Content-Type": "application/json"}
+
+
+def run_sql(sql, label):
+    r = requests.post(MGMT_QUERY_URL, headers=HEADERS, json={"query": sql})
+    if r.ok:
+        print(f"✅ {label}")
+        return r.json()
+    else:
+        print(f"❌ {label}: {r.status_code} {r.text}")
+        return None
+
+
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS fight_decision_probabilities (
+  fight_url      text PRIMARY KEY,             -- fight_meta_details.fight_url
+  rounds         integer NOT NULL,             -- rounds on the card (3 or 5)
+  p_f1_win       double precision NOT NULL,    -- P(fighter1 wins the decision, 2+ of 3 cards)
+  p_draw         double precision NOT NULL,    -- P(majority / split / unanimous draw)
+  p_f2_win       double precision NOT NULL,
+  official       text NOT NULL CHECK (official IN ('f1', 'f2', 'draw')),
+  p_official     double precision NOT NULL,    -- probability of the recorded result
+  upset_index    double precision NOT NULL,    -- 1 - p_official
+  model_version  text NOT NULL,                -- round_predictions.model_version used
+  computed_at    timestamptz DEFAULT now()
+);
+-- "biggest robberies" lists
+CREATE INDEX IF NOT EXISTS fight_decision_probabilities_upset_idx
+  ON fight_decision_probabilities (upset_index DESC);
+
+ALTER TABLE fight_decision_probabilities ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "fight_decision_probabilities readable" ON fight_decision_probabilities;
+CREATE POLICY "fight_decision_probabilities readable" ON fight_decision_probabilities FOR SELECT USING (true);
+"""
+
+VERIFY_SQL = """
+SELECT
+  COUNT(*)                                    AS fights,
+  COUNT(*) FILTER (WHERE upset_index >= 0.5)  AS upsets,
+  ROUND(AVG(upset_index)::numeric, 3)         AS mean_upset
+FROM fight_decision_probabilities;
+"""
+
+run_sql(MIGRATION_SQL, "Create fight_decision_probabilities")
+result = run_sql(VERIFY_SQL, "Verify")
+
+if result:
+    print(f"  fights: {result[0].get('fights')}  upset_index >= 0.5: {result[0].get('upsets')}  "
+          f"mean: {result[0].get('mean_upset')}")
@@ -0,0 +1,93 @@
+"""
+migrate_fight_judge_links.py — Create the fight_judge_links table.
+
+fight_judge_links: one row per judge_scores (bout, date) group, pointing at the
+fight_meta_details row it was scored for, and at most one row per fight_url (the app reads a
+fight's link with maybeSingle()). Consumers join
+
+    judge_scores js
+    JOIN fight_judge_links l ON l.js_bout = js.bout AND l.js_date = js.date
+
+and orient scores with js.fighter = l.f1_js_name / l.f2_js_name, instead of a ±1 day
+date window + last-name comparisons. Populate with:
+    python judge_links.py --full
+
+Run once:
+    python supabase/migrate_fight_judge_links.py
+"""
+
+import sys
+import os
+import requests
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+
+supabase_url = os.environ.get("REACT_APP_SUPABASE_URL", "")
+mgmt_key = os.environ.get("SUPABASE_MANAGEMENT_KEY", "")
+
+if not supabase_url or not mgmt_key:
+    raise SystemExit("Missing REACT_APP_SUPABASE_URL or SUPABASE_MANAGEMENT_KEY in .env")
+
+project_ref = supabase_url.replace("https://", "").split(".")[0]
+MGMT_QUERY_URL = f"https://api.supabase.com/v1/projects/{project_ref}/database/query"
+HEADERS = {"Authorization": f"Bearer {mgmt_key}", "Content-Type": "application/json"}
+
+
+def run_sql(sql, label):
+    r = requests.post(MGMT_QUERY_URL, headers=HEADERS, json={"query": sql})
+    if r.ok:
+        print(f"✅ {label}")
+        return r.json()
+    else:
+        print(f"❌ {label}: {r.status_code} {r.text}")
+        return None
+
+
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS fight_judge_links (
+  js_bout        text NOT NULL,   -- judge_scores.bout
+  js_date        date NOT NULL,   -- judge_scores.date
+  fight_url      text NOT NULL,   -- fight_meta_details.fight_url / fights.fight_url
+  f1_js_name     text NOT NULL,   -- judge_scores.fighter spelling of fight_meta_details.fighter1_name
+  f2_js_name     text NOT NULL,   -- judge_scores.fighter spelling of fight_meta_details.fighter2_name
+  match_strategy text NOT NULL,   -- weaker of the two name matches: 'exact' .. 'word_subset'
+  created_at     timestamptz DEFAULT now(),
+  PRIMARY KEY (js_bout, js_date)
+);
+
+-- One link per fight: drop any duplicates from before the constraint (keep the oldest link)
+DELETE FROM fight_judge_links WHERE (js_bout, js_date) IN (
+  SELECT js_bout, js_date FROM (
+    SELECT js_bout, js_date, row_number() OVER (
+      PARTITION BY fight_url ORDER BY created_at NULLS LAST, js_bout, js_date) AS n
+    FROM fight_judge_links) d
+  WHERE n > 1);
+DROP INDEX IF EXISTS fight_judge_links_fight_url_idx;
+CREATE UNIQUE INDEX IF NOT EXISTS fight_judge_links_fight_url_key ON fight_judge_links (fight_url);
+CREATE INDEX IF NOT EXISTS fight_judge_links_created_at_idx ON fight_judge_links (created_at);
+
+-- judge_scores side of the join needs no new index: its unique constraint
+-- (bout, date, judge, fighter, round) already leads with (bout, date).
+
+ALTER TABLE fight_judge_links ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "fight_judge_links readable" ON fight_judge_links;
+CREATE POLICY "fight_judge_links readable" ON fight_judge_links FOR SELECT USING (true);
+"""
+
+VERIFY_SQL = """
+SELECT
+  (SELECT COUNT(*) FROM fight_judge_links)                            AS links,
+  (SELECT COUNT(DISTINCT (bout, date)) FROM judge_scores)             AS judge_groups,
+  (SELECT COUNT(*) FROM fight_judge_links WHERE match_strategy <> 'exact') AS fuzzy_links;
+"""
+
+run_sql(MIGRATION_SQL, "Create fight_judge_links")
+result = run_sql(VERIFY_SQL, "Verify")
+
+if result:
+    print(f"  links: {result[0].get('links')}  judge groups: {result[0].get('judge_groups')}  "
+          f"non-exact: {result[0].get('fuzzy_links')}")
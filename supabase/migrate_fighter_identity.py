@@ -0,0 +1,91 @@
+"""
+migrate_fighter_identity.py — Create the fighters + fighter_aliases identity tables.
+
+fighters:        one row per person, canonical (UFCStats) spelling + normalized match keys.
+fighter_aliases: one row per raw spelling seen in any source (UFCStats, mmadecisions, ESPN),
+                 pointing at its fighters row. Join on `alias` = raw source name.
+
+Keys are computed in Python (fighter_identity.norm_name — NFKD, lowercase, alphanumerics +
+single spaces) so SQL never has to re-normalize. Populate with:
+    python fighter_identity.py --full
+
+Run once:
+    python supabase/migrate_fighter_identity.py
+"""
+
+import sys
+import os
+import requests
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+
+supabase_url = os.environ.get("REACT_APP_SUPABASE_URL", "")
+mgmt_key = os.environ.get("SUPABASE_MANAGEMENT_KEY", "")
+
+if not supabase_url or not mgmt_key:
+    raise SystemExit("Missing REACT_APP_SUPABASE_URL or SUPABASE_MANAGEMENT_KEY in .env")
+
+project_ref = supabase_url.replace("https://", "").split(".")[0]
+MGMT_QUERY_URL = f"https://api.supabase.com/v1/projects/{project_ref}/database/query"
+HEADERS = {"Authorization": f"Bearer {mgmt_key}", "Content-Type": "application/json"}
+
+
+def run_sql(sql, label):
+    r = requests.post(MGMT_QUERY_URL, headers=HEADERS, json={"query": sql})
+    if r.ok:
+        print(f"✅ {label}")
+        return r.json()
+    else:
+        print(f"❌ {label}: {r.status_code} {r.text}")
+        return None
+
+
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS fighters (
+  id             bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  canonical_name text NOT NULL,
+  name_key       text NOT NULL UNIQUE,
+  collapsed_key  text NOT NULL,
+  sorted_key     text NOT NULL,
+  last_key       text NOT NULL,
+  created_at     timestamptz DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS fighters_collapsed_key_idx ON fighters (collapsed_key);
+CREATE INDEX IF NOT EXISTS fighters_sorted_key_idx    ON fighters (sorted_key);
+CREATE INDEX IF NOT EXISTS fighters_last_key_idx      ON fighters (last_key);
+
+CREATE TABLE IF NOT EXISTS fighter_aliases (
+  alias          text PRIMARY KEY,
+  name_key       text NOT NULL,
+  fighter_id     bigint NOT NULL REFERENCES fighters(id) ON DELETE CASCADE,
+  source         text NOT NULL,   -- 'ufcstats' | 'round_stats' | 'mmadecisions' | 'espn'
+  match_strategy text NOT NULL,   -- 'exact' | 'collapsed' | 'anagram' | 'last_name' | 'word_subset' | 'bout_context'
+  created_at     timestamptz DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS fighter_aliases_fighter_id_idx ON fighter_aliases (fighter_id);
+CREATE INDEX IF NOT EXISTS fighter_aliases_name_key_idx   ON fighter_aliases (name_key);
+CREATE INDEX IF NOT EXISTS fighter_aliases_created_at_idx ON fighter_aliases (created_at);
+
+ALTER TABLE fighters        ENABLE ROW LEVEL SECURITY;
+ALTER TABLE fighter_aliases ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "fighters readable" ON fighters;
+CREATE POLICY "fighters readable" ON fighters FOR SELECT USING (true);
+DROP POLICY IF EXISTS "fighter_aliases readable" ON fighter_aliases;
+CREATE POLICY "fighter_aliases readable" ON fighter_aliases FOR SELECT USING (true);
+"""
+
+VERIFY_SQL = """
+SELECT
+  (SELECT COUNT(*) FROM fighters)        AS fighters,
+  (SELECT COUNT(*) FROM fighter_aliases) AS aliases;
+"""
+
+run_sql(MIGRATION_SQL, "Create fighters + fighter_aliases")
+result = run_sql(VERIFY_SQL, "Verify")
+
+if result:
+    print(f"  fighters: {result[0].get('fighters')}  aliases: {result[0].get('aliases')}")
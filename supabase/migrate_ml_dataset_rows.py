@@ -0,0 +1,200 @@
+"""
+migrate_ml_dataset_rows.py — Create the ml_dataset_rows materialized view + refresh RPC.
+
+ml_dataset_rows: the scoring-model training set, one row per (fight, round, judge) with both
+fighters' round stats and the judge's f1/f2 scores — the join build_ml_dataset.py used to do in
+Python after pulling ufc_events, fight_meta_details, round_fight_stats and judge_scores in full.
+judge_scores groups reach their fight through fight_judge_links; stats join on
+(fight_meta_details.event_name, fighter name, round). Rounds with no stats for either fighter
+are dropped here, as the Python join did.
+
+Column names are the ml_dataset.csv names (STAT_MAP short names in build_ml_dataset.py —
+keep the two in sync; the script checks the columns before writing). row_key is the keyset
+for paging: a uuid hashed from the natural key (js_bout, js_date, round, judge), so a row keeps
+its key across refreshes — a row_number() key shifted whenever older scorecards were
+back-filled — and the keys spread evenly over bulk_reader's uuid key ranges.
+
+refresh_ml_dataset_rows(): REFRESH MATERIALIZED VIEW CONCURRENTLY, then stamps
+ml_dataset_refresh.refreshed_at (caps the --incremental watermarks); called by the master
+pipeline after Phase 6b and by `build_ml_dataset.py --refresh`.
+
+Run once (re-run after changing STAT_MAP):
+    python supabase/migrate_ml_dataset_rows.py
+"""
+
+import sys
+import os
+import requests
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+
+supabase_url = os.environ.get("REACT_APP_SUPABASE_URL", "")
+mgmt_key = os.environ.get("SUPABASE_MANAGEMENT_KEY", "")
+
+if not supabase_url or not mgmt_key:
+    raise SystemExit("Missing REACT_APP_SUPABASE_URL or SUPABASE_MANAGEMENT_KEY in .env")
+
+project_ref = supabase_url.replace("https://", "").split(".")[0]
+MGMT_QUERY_URL = f"https://api.supabase.com/v1/projects/{project_ref}/database/query"
+HEADERS = {"Authorization": f"Bearer {mgmt_key}", "Content-Type": "application/json"}
+
+
+def run_sql(sql, label):
+    r = requests.post(MGMT_QUERY_URL, headers=HEADERS, json={"query": sql})
+    if r.ok:
+        print(f"✅ {label}")
+        return r.json()
+    else:
+        print(f"❌ {label}: {r.status_code} {r.text}")
+        return None
+
+
+MIGRATION_SQL = """
+DROP MATERIALIZED VIEW IF EXISTS ml_dataset_rows;
+
+CREATE MATERIALIZED VIEW ml_dataset_rows AS
+WITH judge_rounds AS (
+  -- One row per (link, round, judge); a link is one judge_scores (bout, date) group
+  SELECT
+    l.fight_url,
+    l.js_bout,
+    l.js_date,
+    js.round,
+    js.judge,
+    MAX(CASE WHEN js.fighter = l.f1_js_name THEN js.score END) AS judge_f1_score,
+    MAX(CASE WHEN js.fighter = l.f2_js_name THEN js.score END) AS judge_f2_score
+  FROM fight_judge_links l
+  JOIN judge_scores js ON js.bout = l.js_bout AND js.date = l.js_date
+  GROUP BY l.fight_url, l.js_bout, l.js_date, js.round, js.judge
+)
+SELECT
+  md5(concat_ws(E'\\x1f', jr.js_bout, to_char(jr.js_date, 'YYYY-MM-DD'), jr.round, jr.judge))::uuid AS row_key,
+  fmd.fight_url,
+  fmd.event_name,
+  ue.event_date,
+  fmd.weight_class,
+  jr.round,
+  jr.judge,
+  fmd.fighter1_name AS f1_name,
+  fmd.fighter2_name AS f2_name,
+  s1.kd                             AS f1_kd,
+  s1.sig_strikes_landed             AS f1_sig_landed,
+  s1.sig_strikes_attempted          AS f1_sig_attempted,
+  s1.sig_strike_pct                 AS f1_sig_pct,
+  s1.total_strikes_landed           AS f1_total_landed,
+  s1.total_strikes_attempted        AS f1_total_attempted,
+  s1.takedowns_landed               AS f1_td_landed,
+  s1.takedowns_attempted            AS f1_td_attempted,
+  s1.takedown_pct                   AS f1_td_pct,
+  s1.sub_attempts                   AS f1_sub_attempts,
+  s1.reversals                      AS f1_reversals,
+  s1.control_time_sec               AS f1_ctrl_sec,
+  s1.sig_strikes_head_landed        AS f1_head_landed,
+  s1.sig_strikes_head_attempted     AS f1_head_attempted,
+  s1.sig_strikes_body_landed        AS f1_body_landed,
+  s1.sig_strikes_body_attempted     AS f1_body_attempted,
+  s1.sig_strikes_leg_landed         AS f1_leg_landed,
+  s1.sig_strikes_leg_attempted      AS f1_leg_attempted,
+  s1.sig_strikes_distance_landed    AS f1_dist_landed,
+  s1.sig_strikes_distance_attempted AS f1_dist_attempted,
+  s1.sig_strikes_clinch_landed      AS f1_clinch_landed,
+  s1.sig_strikes_clinch_attempted   AS f1_clinch_attempted,
+  s1.sig_strikes_ground_landed      AS f1_ground_landed,
+  s1.sig_strikes_ground_attempted   AS f1_ground_attempted,
+  s2.kd                             AS f2_kd,
+  s2.sig_strikes_landed             AS f2_sig_landed,
+  s2.sig_strikes_attempted          AS f2_sig_attempted,
+  s2.sig_strike_pct                 AS f2_sig_pct,
+  s2.total_strikes_landed           AS f2_total_landed,
+  s2.total_strikes_attempted        AS f2_total_attempted,
+  s2.takedowns_landed               AS f2_td_landed,
+  s2.takedowns_attempted            AS f2_td_attempted,
+  s2.takedown_pct                   AS f2_td_pct,
+  s2.sub_attempts                   AS f2_sub_attempts,
+  s2.reversals                      AS f2_reversals,
+  s2.control_time_sec               AS f2_ctrl_sec,
+  s2.sig_strikes_head_landed        AS f2_head_landed,
+  s2.sig_strikes_head_attempted     AS f2_head_attempted,
+  s2.sig_strikes_body_landed        AS f2_body_landed,
+  s2.sig_strikes_body_attempted     AS f2_body_attempted,
+  s2.sig_strikes_leg_landed         AS f2_leg_landed,
+  s2.sig_strikes_leg_attempted      AS f2_leg_attempted,
+  s2.sig_strikes_distance_landed    AS f2_dist_landed,
+  s2.sig_strikes_distance_attempted AS f2_dist_attempted,
+  s2.sig_strikes_clinch_landed      AS f2_clinch_landed,
+  s2.sig_strikes_clinch_attempted   AS f2_clinch_attempted,
+  s2.sig_strikes_ground_landed      AS f2_ground_landed,
+  s2.sig_strikes_ground_attempted   AS f2_ground_attempted,
+  jr.judge_f1_score,
+  jr.judge_f2_score,
+  CASE WHEN s1.id IS NOT NULL AND s2.id IS NOT NULL THEN 'both' ELSE 'one' END AS stats_coverage
+FROM judge_rounds jr
+JOIN fight_meta_details fmd ON fmd.fight_url = jr.fight_url
+LEFT JOIN (
+  SELECT DISTINCT ON (event_name) event_name, event_date FROM ufc_events ORDER BY event_name, event_date
+) ue ON ue.event_name = fmd.event_name
+LEFT JOIN round_fight_stats s1
+  ON  s1.event_name   = fmd.event_name
+  AND s1.fighter_name = fmd.fighter1_name
+  AND s1.round        = jr.round
+LEFT JOIN round_fight_stats s2
+  ON  s2.event_name   = fmd.event_name
+  AND s2.fighter_name = fmd.fighter2_name
+  AND s2.round        = jr.round
+WHERE jr.judge_f1_score IS NOT NULL
+  AND jr.judge_f2_score IS NOT NULL
+  AND (s1.id IS NOT NULL OR s2.id IS NOT NULL);
+
+-- Unique index: keyset paging + REFRESH ... CONCURRENTLY. row_key hashes the natural key
+-- (one fight_judge_links row per (js_bout, js_date), so one row per round + judge)
+CREATE UNIQUE INDEX ml_dataset_rows_row_key_idx ON ml_dataset_rows (row_key);
+-- build_ml_dataset.py --incremental re-reads changed fights by fight_url
+CREATE INDEX ml_dataset_rows_fight_url_idx ON ml_dataset_rows (fight_url);
+
+-- When ml_dataset_rows was last refreshed: --incremental caps its watermarks here so rows
+-- inserted after the refresh are picked up by the next build, not skipped.
+DROP MATERIALIZED VIEW IF EXISTS ml_dataset_refresh;
+CREATE MATERIALIZED VIEW ml_dataset_refresh AS SELECT now() AS refreshed_at;
+
+-- Watermark lookups for --incremental (max / >= since)
+CREATE INDEX IF NOT EXISTS judge_scores_created_at_idx       ON judge_scores (created_at);
+CREATE INDEX IF NOT EXISTS round_fight_stats_inserted_at_idx ON round_fight_stats (inserted_at);
+
+-- Materialized views have no RLS — service role only
+REVOKE ALL ON ml_dataset_rows, ml_dataset_refresh FROM anon, authenticated;
+GRANT SELECT ON ml_dataset_rows, ml_dataset_refresh TO service_role;
+
+CREATE OR REPLACE FUNCTION refresh_ml_dataset_rows()
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET statement_timeout = '300s'
+AS $$
+BEGIN
+  REFRESH MATERIALIZED VIEW CONCURRENTLY ml_dataset_rows;
+  REFRESH MATERIALIZED VIEW ml_dataset_refresh;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION refresh_ml_dataset_rows() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_ml_dataset_rows() TO service_role;
+"""
+
+VERIFY_SQL = """
+SELECT
+  COUNT(*)                                          AS rows,
+  COUNT(DISTINCT fight_url)                         AS fights,
+  COUNT(*) FILTER (WHERE stats_coverage = 'one')    AS one_side_stats
+FROM ml_dataset_rows;
+"""
+
+run_sql(MIGRATION_SQL, "Create ml_dataset_rows + refresh_ml_dataset_rows()")
+result = run_sql(VERIFY_SQL, "Verify")
+
+if result:
+    print(f"  rows: {result[0].get('rows')}  fights: {result[0].get('fights')}  "
+          f"one-side stats: {result[0].get('one_side_stats')}")
@@ -0,0 +1,85 @@
+"""
+migrate_round_predictions.py — Create the round_predictions table.
+
+round_predictions: one row per (fight_url, round) scored by the exported logistic model —
+P(f1 wins the round), confidence = max(p, 1 - p) and the 10-8 call at the app's cut-off —
+written in batch by scoring_model/score_rounds.py (the master pipeline runs it after Phase 4)
+instead of being recomputed per round in the browser.
+
+model_version is scoring_model.json's version + content hash. stats_at is the newest
+round_fight_stats.inserted_at behind the prediction — score_rounds.py's incremental
+watermark. Populate with:
+    python scoring_model/score_rounds.py --full
+
+Run once:
+    python supabase/migrate_round_predictions.py
+"""
+
+import sys
+import os
+import requests
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+load_dotenv(dotenv_path=Path(__file__).parent.parent / '.env')
+
+supabase_url = os.environ.get("REACT_APP_SUPABASE_URL", "")
+mgmt_key = os.environ.get("SUPABASE_MANAGEMENT_KEY", "")
+
+if not supabase_url or not mgmt_key:
+    raise SystemExit("Missing REACT_APP_SUPABASE_URL or SUPABASE_MANAGEMENT_KEY in .env")
+
+project_ref = supabase_url.replace("https://", "").split(".")[0]
+MGMT_QUERY_URL = f"https://api.supabase.com/v1/projects/{project_ref}/database/query"
+HEADERS = {"Authorization": f"Bearer {mgmt_key}", "Content-Type": "application/json"}
+
+
+def run_sql(sql, label):
+    r = requests.post(MGMT_QUERY_URL, headers=HEADERS, json={"query": sql})
+    if r.ok:
+        print(f"✅ {label}")
+        return r.json()
+    else:
+        print(f"❌ {label}: {r.status_code} {r.text}")
+        return None
+
+
+MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS round_predictions (
+  fight_url          text NOT NULL,              -- fight_meta_details.fight_url
+  round              integer NOT NULL,
+  p_f1               double precision NOT NULL,  -- P(fighter1 wins the round)
+  confidence         double precision NOT NULL,  -- max(p_f1, 1 - p_f1)
+  is_10_8_predicted  boolean NOT NULL,
+  model_version      text NOT NULL,              -- scoring_model.json version + hash
+  stats_at           timestamptz,                -- newest source round_fight_stats.inserted_at
+  scored_at          timestamptz DEFAULT now(),
+  PRIMARY KEY (fight_url, round)
+);
+-- score_rounds.py watermark: newest stats_at for the current model version
+CREATE INDEX IF NOT EXISTS round_predictions_version_stats_at_idx
+  ON round_predictions (model_version, stats_at DESC);
+
+ALTER TABLE round_predictions ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "round_predictions readable" ON round_predictions;
+CREATE POLICY "round_predictions readable" ON round_predictions FOR SELECT USING (true);
+"""
+
+VERIFY_SQL = """
+SELECT
+  COUNT(*)                                        AS rounds,
+  COUNT(DISTINCT fight_url)                       AS fights,
+  COUNT(*) FILTER (WHERE is_10_8_predicted)       AS predicted_10_8,
+  COUNT(DISTINCT model_version)                   AS model_versions
+FROM round_predictions;
+"""
+
+run_sql(MIGRATION_SQL, "Create round_predictions")
+result = run_sql(VERIFY_SQL, "Verify")
+
+if result:
+    print(f"  rounds: {result[0].get('rounds')}  fights: {result[0].get('fights')}  "
+          f"predicted 10-8: {result[0].get('predicted_10_8')}  "
+          f"model versions: {result[0].get('model_versions')}")
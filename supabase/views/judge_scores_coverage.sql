@@ -3,16 +3,19 @@
 -- fights that went past round 1, where judges may have scored partial rounds).
 --
 -- coverage_status:
---   'missing'  = 0 rows in judge_scores for this fight's event date (±1 day)
+--   'missing'  = no fight_judge_links row for this fight, or 0 linked judge_scores rows
 --   'partial'  = some rows but fewer than expected (rounds × 2 fighters × 3 judges)
---                NOTE: 'partial' is often a name-matching artefact in SQL — the frontend's
---                matchesFighter() resolves most of these via last-name / word-subset strategies
 --   'complete' = row count meets or exceeds expected
 --
--- Uses ±1 day date window to handle international events (Australia, Fight Island,
--- Abu Dhabi) where judge_scores.date is +1 day vs ufc_events.event_date.
+-- Rows are counted through fight_judge_links (judge_links.py, run after Phase 6), which
+-- pairs each judge_scores (bout, date) group with its fight once — so the count is this
+-- fight's scorecard rows only, not every row on the card date. 'missing' therefore also
+-- covers scorecards that exist but did not name-match; `python judge_links.py --full`
+-- retries those.
 
-CREATE OR REPLACE VIEW judge_scores_coverage AS
+-- Dropped first: the count column was renamed (score_rows_on_date -> score_rows).
+DROP VIEW IF EXISTS judge_scores_coverage;
+CREATE VIEW judge_scores_coverage AS
 SELECT
     ue.event_date,
     ue.event_name,
@@ -22,7 +25,7 @@ SELECT
     fmd.method,
     fmd.round  AS rounds_fought,
     CAST(SUBSTRING(fmd.round FROM 1 FOR 1) AS INTEGER) * 6 AS expected_rows,
-    COUNT(js.id) AS score_rows_on_date,
+    COUNT(js.id) AS score_rows,
     CASE
         WHEN COUNT(js.id) = 0                                                              THEN 'missing'
         WHEN COUNT(js.id) < CAST(SUBSTRING(fmd.round FROM 1 FOR 1) AS INTEGER) * 6        THEN 'partial'
@@ -30,8 +33,10 @@ SELECT
     END AS coverage_status
 FROM fight_meta_details fmd
 JOIN ufc_events ue ON fmd.event_name = ue.event_name
+LEFT JOIN fight_judge_links l ON l.fight_url = fmd.fight_url
 LEFT JOIN judge_scores js
-    ON js.date BETWEEN ue.event_date - INTERVAL '1 day' AND ue.event_date + INTERVAL '1 day'
+    ON  js.bout = l.js_bout
+    AND js.date = l.js_date
 WHERE (
     fmd.method ILIKE '%decision%'
     OR (
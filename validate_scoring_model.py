@@ -27,7 +27,7 @@ sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
 load_dotenv(Path(__file__).parent / '.env')
 
-from supabase import create_client
+from bulk_reader import read_tables
 
 SUPABASE_URL = os.environ.get('REACT_APP_SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')
@@ -36,8 +36,6 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     print("[ERROR] Missing REACT_APP_SUPABASE_URL or SUPABASE_SERVICE_KEY in .env")
     sys.exit(1)
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 # --- SCORING MODEL (mirrors FightDetailView.js logic) ---
 
 WEIGHTS = {
@@ -71,71 +69,34 @@ def score_round(f1_stats, f2_stats):
 
 # --- DATA FETCH ---
 
-def fetch_all_round_stats():
-    print("[..] Fetching round_fight_stats...")
-    rows = []
-    page_size = 1000
-    offset = 0
-    while True:
-        res = supabase.from_('round_fight_stats').select(
-            'event_name, bout, fighter_name, round, kd, sig_strikes_landed, '
-            'sig_strikes_attempted, takedowns_landed, takedowns_attempted, '
-            'sub_attempts, control_time_sec'
-        ).range(offset, offset + page_size - 1).execute()
-        batch = res.data or []
-        rows.extend(batch)
-        if len(batch) < page_size:
-            break
-        offset += page_size
-    print(f"[OK] {len(rows):,} round_fight_stats rows loaded")
-    return rows
-
-def fetch_all_judge_scores():
-    print("[..] Fetching judge_scores...")
-    rows = []
-    page_size = 1000
-    offset = 0
-    while True:
-        res = supabase.from_('judge_scores').select(
-            'event_name, bout, fighter, judge, round, score'
-        ).range(offset, offset + page_size - 1).execute()
-        batch = res.data or []
-        rows.extend(batch)
-        if len(batch) < page_size:
-            break
-        offset += page_size
-    print(f"[OK] {len(rows):,} judge_scores rows loaded")
-    return rows
-
-def fetch_fight_meta():
+def load_source_tables():
+    """round_fight_stats, judge_scores and fight_meta_details in one concurrent keyset read."""
+    print("[..] Fetching round_fight_stats, judge_scores, fight_meta_details...")
+    tables = read_tables({
+        'round_fight_stats': ('round_fight_stats',
+                              'event_name, bout, fighter_name, round, kd, sig_strikes_landed, '
+                              'sig_strikes_attempted, takedowns_landed, takedowns_attempted, '
+                              'sub_attempts, control_time_sec'),
+        'judge_scores': ('judge_scores', 'event_name, bout, fighter, judge, round, score'),
+        'fight_meta_details': ('fight_meta_details', 'event_name, fighter1_name, fighter2_name, weight_class'),
+    })
+    for name, rows in tables.items():
+        print(f"[OK] {len(rows):,} {name} rows loaded")
+    return tables['round_fight_stats'], tables['judge_scores'], index_fight_meta(tables['fight_meta_details'])
+
+def index_fight_meta(rows):
     """Returns a dict keyed by (event_name, fighter1_name, fighter2_name) -> weight_class."""
-    print("[..] Fetching fight_meta_details for weight class lookup...")
-    rows = []
-    page_size = 1000
-    offset = 0
-    while True:
-        res = supabase.from_('fight_meta_details').select(
-            'event_name, fighter1_name, fighter2_name, weight_class'
-        ).range(offset, offset + page_size - 1).execute()
-        batch = res.data or []
-        rows.extend(batch)
-        if len(batch) < page_size:
-            break
-        offset += page_size
     # Index by (event_name, frozenset of fighter names) -> weight_class
     meta = {}
     for r in rows:
         key = (r['event_name'], frozenset([r['fighter1_name'], r['fighter2_name']]))
         meta[key] = r.get('weight_class') or 'Unknown'
-    print(f"[OK] {len(rows):,} fight_meta_details rows loaded")
     return meta
 
 # --- ANALYSIS ---
 
 def run_analysis(args):
-    round_stats_rows = fetch_all_round_stats()
-    judge_scores_rows = fetch_all_judge_scores()
-    meta_map = fetch_fight_meta()
+    round_stats_rows, judge_scores_rows, meta_map = load_source_tables()
 
     # Index round_stats by (event_name, fighter_name, round)
     stats_index = {}